@@ -0,0 +1,20 @@
+-- Migration to add a unique key to venue_recommendations
+-- get_venue_recommendations writes new venues with one bulk upsert on (artist_id, city, venue_name)
+
+-- First, remove duplicate recommendations, keeping the earliest row of each group
+DELETE FROM venue_recommendations a
+USING venue_recommendations b
+WHERE a.artist_id = b.artist_id
+  AND a.city = b.city
+  AND a.venue_name = b.venue_name
+  AND a.ctid > b.ctid;
+
+-- Add the unique constraint used as the upsert conflict target
+ALTER TABLE venue_recommendations DROP CONSTRAINT IF EXISTS venue_recommendations_artist_city_venue_key;
+ALTER TABLE venue_recommendations ADD CONSTRAINT venue_recommendations_artist_city_venue_key
+UNIQUE (artist_id, city, venue_name);
+
+-- Verify the change
+SELECT conname, pg_get_constraintdef(oid)
+FROM pg_constraint
+WHERE conrelid = 'venue_recommendations'::regclass AND contype = 'u';
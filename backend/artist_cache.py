@@ -0,0 +1,146 @@
+"""
+Artist Metadata Cache for MusiStash
+Spotify artist objects and top tracks behind a memory LRU and the SQLite disk tier
+"""
+
+import os
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from cache_service import TieredCache
+from spotify_service import SpotifyClient
+
+ARTIST_CACHE_TTL = float(os.getenv("ARTIST_CACHE_TTL_SECONDS", str(6 * 3600)))
+ARTIST_CACHE_STALE_TTL = float(os.getenv("ARTIST_CACHE_STALE_SECONDS", str(7 * 24 * 3600)))
+TOP_TRACKS_CACHE_TTL = float(os.getenv("TOP_TRACKS_CACHE_TTL_SECONDS", str(24 * 3600)))
+ARTIST_NAME_CACHE_TTL = float(os.getenv("ARTIST_NAME_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+ARTIST_NOT_FOUND_TTL = float(os.getenv("ARTIST_NOT_FOUND_TTL_SECONDS", "3600"))
+ARTIST_CACHE_MAX_ENTRIES = int(os.getenv("ARTIST_CACHE_MAX_ENTRIES", "5000"))
+ARTIST_CACHE_PERSIST = os.getenv("ARTIST_CACHE_PERSIST", "true").lower() == "true"
+WARM_TOP_TRACKS_CONCURRENCY = int(os.getenv("ARTIST_CACHE_WARM_CONCURRENCY", "4"))
+
+def normalize_artist_name(name: str) -> str:
+    return " ".join((name or "").lower().split())
+
+class ArtistMetadataCache:
+    """
+    Cached Spotify lookups for the artist endpoints
+
+    Artist objects are keyed by Spotify id; a separate index maps normalized
+    artist names to ids, so name searches and id lookups share one entry.
+    Expired entries are served while a background refresh runs, and the
+    whole cache can be warmed in bulk from ``artist_profiles`` rows.
+    """
+
+    def __init__(self, spotify_client: SpotifyClient):
+        self.spotify = spotify_client
+        self.artists = TieredCache("spotify_artists", max_entries=ARTIST_CACHE_MAX_ENTRIES, default_ttl=ARTIST_CACHE_TTL,
+                                   stale_ttl=ARTIST_CACHE_STALE_TTL, persist=ARTIST_CACHE_PERSIST)
+        self.names = TieredCache("spotify_artist_names", max_entries=ARTIST_CACHE_MAX_ENTRIES,
+                                 default_ttl=ARTIST_NAME_CACHE_TTL, stale_ttl=ARTIST_NAME_CACHE_TTL,
+                                 persist=ARTIST_CACHE_PERSIST)
+        self.top_tracks = TieredCache("spotify_top_tracks", max_entries=ARTIST_CACHE_MAX_ENTRIES,
+                                      default_ttl=TOP_TRACKS_CACHE_TTL, stale_ttl=ARTIST_CACHE_STALE_TTL,
+                                      persist=ARTIST_CACHE_PERSIST)
+
+    def _store_artist(self, artist: Dict[str, Any], *names: str):
+        self.artists.set(artist["id"], artist)
+        for name in (artist.get("name"), *names):
+            if name:
+                self.names.set(normalize_artist_name(name), artist["id"])
+
+    async def artist(self, artist_id: str) -> Optional[Dict[str, Any]]:
+        return await self.artists.get_or_load(artist_id, lambda: self.spotify.artist(artist_id),
+                                              negative_ttl=ARTIST_NOT_FOUND_TTL)
+
+    async def search_artist(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Best Spotify match for an artist name, searched as ``artist:<name>``
+        """
+        async def load_id() -> Optional[str]:
+            artist = await self.spotify.search_artist(f"artist:{name}")
+            if artist is None:
+                return None
+            self._store_artist(artist, name)
+            return artist["id"]
+
+        artist_id = await self.names.get_or_load(normalize_artist_name(name), load_id, negative_ttl=ARTIST_NOT_FOUND_TTL)
+        return await self.artist(artist_id) if artist_id else None
+
+    async def artist_top_tracks(self, artist_id: str, country: str = "US") -> List[Dict[str, Any]]:
+        return await self.top_tracks.get_or_load(f"{artist_id}:{country}",
+                                                 lambda: self.spotify.artist_top_tracks(artist_id, country))
+
+    async def warm(self, profiles: List[Dict[str, Any]], include_top_tracks: bool = False) -> Dict[str, int]:
+        """
+        Load every ``artist_profiles`` row (``spotify_id`` and ``name``) into the cache
+
+        Artists that are not already fresh are fetched through the client's
+        batched lookups, 50 ids per ``artists?ids=`` request; an id Spotify
+        rejects fails on its own instead of failing the warm. Rows with a name
+        but no ``spotify_id`` are matched through the name index, or searched
+        when the name is new. Top tracks have no bulk endpoint, so they are only
+        warmed on request, a few artists at a time.
+        """
+        names_by_id: Dict[str, Optional[str]] = {}
+        unmatched_names: List[str] = []
+        for row in profiles:
+            if row.get("spotify_id"):
+                names_by_id[row["spotify_id"]] = row.get("name")
+            elif row.get("name"):
+                artist_id = await self.names.aget(normalize_artist_name(row["name"]))
+                if artist_id:
+                    names_by_id.setdefault(artist_id, row["name"])
+                else:
+                    unmatched_names.append(row["name"])
+
+        missing = [artist_id for artist_id in names_by_id if await self.artists.aget(artist_id) is None]
+        already_cached = len(names_by_id) - len(missing)
+        warmed = failed = 0
+        results = await asyncio.gather(*[self.spotify.artist(artist_id) for artist_id in missing], return_exceptions=True)
+        for artist_id, artist in zip(missing, results):
+            if isinstance(artist, Exception):
+                failed += 1
+                print(f"⚠️  Could not warm artist {artist_id}: {artist}")
+            elif artist:
+                self._store_artist(artist, names_by_id[artist_id])
+                warmed += 1
+
+        semaphore = asyncio.Semaphore(WARM_TOP_TRACKS_CONCURRENCY)
+
+        async def search(name: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    artist = await self.search_artist(name)
+                except Exception as e:
+                    print(f"⚠️  Could not find artist {name}: {e}")
+                    return None
+            return artist["id"] if artist else None
+
+        searched_ids = [artist_id for artist_id in await asyncio.gather(*[search(name) for name in unmatched_names])
+                        if artist_id]
+        for artist_id in searched_ids:
+            names_by_id.setdefault(artist_id, None)
+
+        tracks_warmed = 0
+        if include_top_tracks:
+            async def warm_tracks(artist_id: str) -> bool:
+                async with semaphore:
+                    try:
+                        await self.artist_top_tracks(artist_id)
+                        return True
+                    except Exception as e:
+                        print(f"⚠️  Could not warm top tracks for {artist_id}: {e}")
+                        return False
+
+            tracks_warmed = sum(await asyncio.gather(*[warm_tracks(artist_id) for artist_id in names_by_id]))
+
+        return {
+            "profiles": len(profiles),
+            "already_cached": already_cached,
+            "artists_warmed": warmed,
+            "artists_failed": failed,
+            "found_by_name": len(searched_ids),
+            "not_found_by_name": len(unmatched_names) - len(searched_ids),
+            "top_tracks_warmed": tracks_warmed
+        }
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+ML Service Benchmark Suite
+Measures training, inference and memory for ml_service.py and model_analysis.py
+
+Runs fully offline on synthetic artist profiles and writes a JSON report so
+results can be compared between commits:
+
+    python benchmark_ml.py                                  # writes benchmark_results/ml_<commit>.json
+    python benchmark_ml.py --compare benchmark_results/ml_abc1234.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from joblib.externals.loky import get_reusable_executor
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ml_service import MusiStashMLPredictor
+from model_analysis import MusiStashModelAnalyzer
+
+# Metrics where a larger value is an improvement; everything else is "lower is better"
+HIGHER_IS_BETTER = ('r2_score', 'cv_score', 'throughput')
+
+
+def make_synthetic_profiles(n_profiles: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """
+    Create artist profiles shaped like the Supabase rows ml_service consumes
+    """
+    rng = np.random.RandomState(seed)
+    genre_pool = ['pop', 'hip-hop', 'r&b', 'rock', 'indie', 'electronic', 'country', 'latin']
+
+    profiles = []
+    for i in range(n_profiles):
+        followers = int(rng.lognormal(12, 2))
+        genres = list(rng.choice(genre_pool, size=rng.randint(0, 4), replace=False))
+        profiles.append({
+            'name': f'Synthetic Artist {i}',
+            'followers': followers,
+            'spotify_followers': followers,
+            'popularity': int(rng.randint(10, 100)),
+            'spotify_popularity': int(rng.randint(10, 100)),
+            'genres': genres,
+            'youtube_subscribers': int(rng.lognormal(10, 2)),
+            'instagram_followers': int(rng.lognormal(11, 2)),
+            'net_worth_millions': float(rng.exponential(5)),
+            'monthly_streams_millions': float(rng.exponential(3)),
+            'audio_energy': float(rng.beta(2, 2)),
+            'audio_danceability': float(rng.beta(2, 2)),
+            'audio_valence': float(rng.beta(1.5, 1.5)),
+            'audio_acousticness': float(rng.beta(1, 3)),
+            'audio_instrumentalness': float(rng.beta(1, 4)),
+            'tier_score': float(rng.uniform(0, 250)),
+            'billboard_chart_performance_score': float(rng.uniform(0, 100)),
+            'social_engagement_rate': float(rng.uniform(0, 0.3)),
+            'genius_mainstream_appeal': float(rng.uniform(0, 100)),
+            'genius_emotional_resonance': float(rng.uniform(0, 100)),
+            'youtube_engagement_rate': float(rng.uniform(0, 10)),
+        })
+
+    return profiles
+
+
+def summarize_latencies(samples: List[float]) -> Dict[str, float]:
+    """
+    Latency summary in milliseconds
+    """
+    ordered = sorted(samples)
+    return {
+        'mean_ms': statistics.mean(ordered) * 1000,
+        'p50_ms': ordered[len(ordered) // 2] * 1000,
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        'min_ms': ordered[0] * 1000,
+        'runs': len(ordered)
+    }
+
+
+def time_repeated(fn: Callable[[], Any], repeats: int, warmup: int = 3) -> List[float]:
+    """
+    Wall time of each call after a few warmup calls
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """
+    High-water resident set size of this process and its joblib workers
+    """
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {
+        'self_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        'children_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    }
+
+
+def benchmark_cold_start(profiles: List[Dict], comparable: Dict, runs: int = 5) -> Dict[str, Any]:
+    """
+    Load a saved model into a fresh predictor and serve the first prediction
+
+    Each step happens once per predictor, so the medians of a few runs are reported.
+    """
+    train_times, load_times, first_prediction_times = [], [], []
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        for _ in range(runs):
+            trainer = MusiStashMLPredictor()
+            trainer.model_path = os.path.join(model_dir, 'xgboost_resonance_model.json')
+            trainer.scaler_path = os.path.join(model_dir, 'feature_scaler.pkl')
+
+            start = time.perf_counter()
+            trainer.train_model_on_current_data(profiles[0], comparable)
+            train_times.append(time.perf_counter() - start)
+            trainer.save_model()
+
+            predictor = MusiStashMLPredictor()
+            predictor.model_path = trainer.model_path
+            predictor.scaler_path = trainer.scaler_path
+
+            start = time.perf_counter()
+            predictor.load_model()
+            load_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            predictor.predict_resonance(profiles[0], comparable)
+            first_prediction_times.append(time.perf_counter() - start)
+
+    load_ms = statistics.median(load_times) * 1000
+    first_prediction_ms = statistics.median(first_prediction_times) * 1000
+    return {
+        'on_demand_train_ms': statistics.median(train_times) * 1000,
+        'model_load_ms': load_ms,
+        'first_prediction_ms': first_prediction_ms,
+        'cold_start_total_ms': load_ms + first_prediction_ms
+    }
+
+
+def benchmark_inference(profiles: List[Dict], comparable: Dict, repeats: int,
+                        batch_sizes: List[int]) -> Dict[str, Any]:
+    """
+    Single and batch prediction latency plus generate_insights overhead
+    """
+    predictor = MusiStashMLPredictor()
+    predictor.train_model_on_current_data(profiles[0], comparable)
+
+    results = {
+        'single_prediction': summarize_latencies(
+            time_repeated(lambda: predictor.predict_resonance(profiles[1], comparable), repeats)
+        ),
+        'batch_prediction': {}
+    }
+
+    for batch_size in batch_sizes:
+        batch = (profiles * (batch_size // len(profiles) + 1))[:batch_size]
+        summary = summarize_latencies(
+            time_repeated(lambda: predictor.predict_resonance_batch(batch, comparable), max(10, repeats // 5))
+        )
+        summary['per_row_ms'] = summary['mean_ms'] / batch_size
+        summary['throughput'] = batch_size / (summary['mean_ms'] / 1000)
+        results['batch_prediction'][str(batch_size)] = summary
+
+    # generate_insights on its own, with the model outputs precomputed
+    features = predictor.prepare_features(profiles[1], comparable)
+    predictions, contributions = predictor.predict_with_contributions(predictor.scaler.transform(features))
+    feature_importance = dict(zip(predictor.feature_names, predictor.model.feature_importances_))
+
+    insights = summarize_latencies(time_repeated(
+        lambda: predictor.generate_insights(features[0], feature_importance, predictions[0], profiles[1],
+                                            comparable, contributions=contributions[0]),
+        repeats
+    ))
+    insights['share_of_single_prediction'] = insights['mean_ms'] / results['single_prediction']['mean_ms']
+    results['generate_insights'] = insights
+
+    return results
+
+
+def benchmark_training(n_samples: int, n_jobs: int) -> Dict[str, Any]:
+    """
+    train_ensemble_models wall time, then a traced rerun for peak memory
+
+    tracemalloc only sees this process, while ``n_jobs`` fits run in loky
+    worker processes, so worker memory is reported separately as the largest
+    worker's peak RSS.
+    """
+    analyzer = MusiStashModelAnalyzer(n_jobs=n_jobs)
+    X, y = analyzer.create_synthetic_training_data(n_samples)
+
+    start = time.perf_counter()
+    training = analyzer.train_ensemble_models(X, y)
+    wall_seconds = time.perf_counter() - start
+
+    X_test, y_test = training['test_data']
+    optimization = analyzer.optimize_ensemble_weights(X_test, y_test)
+    optimize_seconds = statistics.median(
+        time_repeated(lambda: analyzer.optimize_ensemble_weights(X_test, y_test), repeats=5, warmup=0)
+    )
+
+    # Tracing slows allocation-heavy code, so memory is measured on a separate run
+    tracemalloc.start()
+    MusiStashModelAnalyzer(n_jobs=n_jobs).train_ensemble_models(X, y)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Workers only count towards RUSAGE_CHILDREN once they have exited and been reaped
+    get_reusable_executor().shutdown(wait=True)
+    peak_rss = peak_rss_mb()
+
+    return {
+        'n_samples': n_samples,
+        'n_jobs': n_jobs,
+        'train_ensemble_wall_s': wall_seconds,
+        'optimize_weights_ms': optimize_seconds * 1000,
+        'ensemble_r2_score': optimization['best_r2_score'],
+        'parent_python_heap_peak_mb': peak_bytes / (1024 * 1024),
+        'worker_peak_rss_mb': peak_rss['children_mb'],
+        'peak_rss': peak_rss,
+        'models': {
+            name: {'r2_score': metrics['r2_score'], 'cv_score': metrics['cv_score']}
+            for name, metrics in training['performance'].items()
+        }
+    }
+
+
+def get_git_commit() -> str:
+    """
+    Short hash of the checked-out commit, or "unknown" outside a git checkout
+    """
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def collect_metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Environment details needed to compare two reports fairly
+    """
+    import sklearn
+    import xgboost
+
+    return {
+        'git_commit': get_git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'scikit_learn': sklearn.__version__,
+        'xgboost': xgboost.__version__,
+        'settings': {
+            'profiles': args.profiles,
+            'repeats': args.repeats,
+            'batch_sizes': args.batch_sizes,
+            'train_samples': args.train_samples,
+            'n_jobs': args.n_jobs
+        }
+    }
+
+
+def flatten_metrics(data: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """
+    Flatten nested results into dotted metric names
+    """
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten_metrics(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Relative change of every timing/memory metric present in both reports
+    """
+    current_metrics = flatten_metrics(current['results'])
+    baseline_metrics = flatten_metrics(baseline['results'])
+
+    changes = []
+    for name, value in current_metrics.items():
+        base = baseline_metrics.get(name)
+        if base is None or base == 0 or name.endswith(('runs', 'n_samples', 'n_jobs')):
+            continue
+
+        change = (value - base) / abs(base)
+        worse = change < -threshold if name.endswith(HIGHER_IS_BETTER) else change > threshold
+        changes.append({'metric': name, 'baseline': base, 'current': value, 'change': change, 'regression': worse})
+
+    return changes
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run every benchmark section and assemble the report
+    """
+    profiles = make_synthetic_profiles(args.profiles)
+    comparable = make_synthetic_profiles(1, seed=99)[0]
+
+    print("🧊 Benchmarking cold-start model load...")
+    cold_start = benchmark_cold_start(profiles, comparable)
+
+    print("⚡ Benchmarking single and batch prediction...")
+    inference = benchmark_inference(profiles, comparable, args.repeats, args.batch_sizes)
+
+    print(f"🏋️  Benchmarking train_ensemble_models on {args.train_samples} samples...")
+    training = benchmark_training(args.train_samples, args.n_jobs)
+
+    return {
+        'metadata': collect_metadata(args),
+        'results': {
+            'cold_start': cold_start,
+            'inference': inference,
+            'training': training
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark for the MusiStash ML services")
+    parser.add_argument('--profiles', type=int, default=50, help="Synthetic artist profiles to generate")
+    parser.add_argument('--repeats', type=int, default=100, help="Timed runs per latency measurement")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[10, 100], help="Batch sizes for batch prediction")
+    parser.add_argument('--train-samples', type=int, default=5000, help="Synthetic rows for train_ensemble_models")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Worker count for ensemble training")
+    parser.add_argument('--output', help="Report path (default: benchmark_results/ml_<commit>.json)")
+    parser.add_argument('--compare', help="Baseline report to compare against")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Relative change counted as a regression")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args)
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'benchmark_results',
+        f"ml_{report['metadata']['git_commit']}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    results = report['results']
+    print("\n📊 Results")
+    print("-" * 40)
+    print(f"   Cold start: {results['cold_start']['cold_start_total_ms']:.1f} ms")
+    print(f"   Single prediction p50: {results['inference']['single_prediction']['p50_ms']:.2f} ms")
+    for batch_size, summary in results['inference']['batch_prediction'].items():
+        print(f"   Batch {batch_size}: {summary['per_row_ms']:.3f} ms/row")
+    print(f"   generate_insights p50: {results['inference']['generate_insights']['p50_ms']:.3f} ms")
+    print(f"   train_ensemble_models: {results['training']['train_ensemble_wall_s']:.2f} s, "
+          f"parent heap peak {results['training']['parent_python_heap_peak_mb']:.1f} MB, "
+          f"worker RSS peak {results['training']['worker_peak_rss_mb']:.1f} MB")
+    print(f"\n💾 Report written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        changes = compare_reports(report, baseline, args.threshold)
+        regressions = [c for c in changes if c['regression']]
+
+        print(f"\n🔍 Compared with {baseline['metadata'].get('git_commit', args.compare)}")
+        for change in changes:
+            marker = "❌" if change['regression'] else "  "
+            print(f" {marker} {change['metric']}: {change['baseline']:.3f} -> {change['current']:.3f} ({change['change']:+.1%})")
+
+        if regressions:
+            print(f"\n❌ {len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions beyond threshold")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,24 +3,141 @@ Billboard Chart Service for MusiStash
 Fetches chart performance data for artists
 """
 
+import os
 import asyncio
-from typing import Dict, Optional, List
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, List
 from billboard import ChartData
 import re
 
+from cache_service import TieredCache
+
+# New charts are published on Tuesdays; a snapshot is reused until the next release
+CHART_RELEASE_WEEKDAY = 1  # Monday is 0
+CHART_RELEASE_HOUR_UTC = int(os.getenv("BILLBOARD_CHART_RELEASE_HOUR_UTC", "17"))
+# Last week's snapshot keeps being served while the new one is fetched, or if fetching fails
+CHART_SNAPSHOT_STALE_TTL = float(os.getenv("BILLBOARD_CHART_STALE_SECONDS", str(7 * 24 * 3600)))
+# How soon to check again when a new week has started but Billboard still serves last week's chart
+CHART_NOT_PUBLISHED_RETRY_SECONDS = float(os.getenv("BILLBOARD_CHART_RETRY_SECONDS", "1800"))
+
+def current_chart_week_start(now: Optional[datetime] = None) -> datetime:
+    """
+    Release time of the chart week that ``now`` falls in
+    """
+    now = now or datetime.now(timezone.utc)
+    release = now.replace(hour=CHART_RELEASE_HOUR_UTC, minute=0, second=0, microsecond=0)
+    release -= timedelta(days=(now.weekday() - CHART_RELEASE_WEEKDAY) % 7)
+    if release > now:
+        release -= timedelta(days=7)
+    return release
+
+def seconds_until_next_chart_week(now: Optional[datetime] = None) -> float:
+    now = now or datetime.now(timezone.utc)
+    return (current_chart_week_start(now) + timedelta(days=7) - now).total_seconds()
+
+class ChartSnapshotStore:
+    """
+    One parsed copy of each chart per chart week, in memory and on disk
+
+    ``ChartData`` downloads and parses the whole chart page, so every chart is
+    fetched once per week and all artist lookups search the stored entries.
+    Concurrent lookups share a single download, which runs in a worker thread
+    because ``ChartData`` is blocking. Snapshots are searched in place and only
+    matching entries are copied out.
+
+    The week boundary is an estimate of Billboard's release time. If a new
+    week's fetch returns the same chart date as the previous snapshot, the
+    chart has not been published yet; it is kept as last week's snapshot and
+    fetched again every ``CHART_NOT_PUBLISHED_RETRY_SECONDS`` until the date changes.
+    """
+
+    def __init__(self):
+        self.cache = TieredCache("billboard_charts", max_entries=32, default_ttl=7 * 24 * 3600,
+                                 stale_ttl=CHART_SNAPSHOT_STALE_TTL)
+        self._loading: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _fetch(chart_name: str) -> Dict[str, Any]:
+        chart = ChartData(chart_name)
+        return {
+            'chart_name': chart_name,
+            'chart_date': chart.date,
+            'week_of': current_chart_week_start().isoformat(),
+            'entries': [
+                {
+                    'title': entry.title,
+                    'artist': entry.artist,
+                    'rank': entry.rank,
+                    'peak_position': entry.peakPos,
+                    'weeks_on_chart': entry.weeks,
+                    'last_week_position': entry.lastWeek
+                }
+                for entry in chart
+            ]
+        }
+
+    async def _load(self, chart_name: str, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        snapshot = await asyncio.to_thread(self._fetch, chart_name)
+        ttl = seconds_until_next_chart_week()
+        if (previous is not None and snapshot['chart_date'] == previous['chart_date']
+                and previous['week_of'] != snapshot['week_of']):
+            # Billboard is late: still last week's chart, so keep checking until the date changes
+            snapshot['week_of'] = previous['week_of']
+            ttl = min(ttl, CHART_NOT_PUBLISHED_RETRY_SECONDS)
+        self.cache.set(chart_name, snapshot, ttl=ttl)
+        return snapshot
+
+    def _start_load(self, chart_name: str, previous: Optional[Dict[str, Any]]) -> asyncio.Task:
+        task = self._loading.get(chart_name)
+        if task is None:
+            task = asyncio.ensure_future(self._load(chart_name, previous))
+            self._loading[chart_name] = task
+            task.add_done_callback(lambda _: self._loading.pop(chart_name, None))
+        return task
+
+    async def _snapshot(self, chart_name: str) -> Dict[str, Any]:
+        """
+        Stored snapshot for ``chart_name``, shared and not copied; callers must not modify it
+        """
+        entry = await self.cache.aget_entry(chart_name)
+        if entry is None:
+            return await asyncio.shield(self._start_load(chart_name, None))
+
+        if not entry.is_fresh and chart_name not in self._loading:
+            # Serve the stale snapshot while the next one loads
+            self._start_load(chart_name, entry.value).add_done_callback(self._log_refresh_failure)
+        return entry.value
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️  Refreshing Billboard chart failed, serving last snapshot: {task.exception()}")
+
+    async def search(self, chart_name: str, matches: Callable[[str], bool]) -> List[Dict[str, Any]]:
+        """
+        Copies of this week's entries whose artist satisfies ``matches``
+        """
+        snapshot = await self._snapshot(chart_name)
+        return [dict(entry) for entry in snapshot['entries'] if matches(entry['artist'])]
+
+    async def top(self, chart_name: str, limit: int) -> List[Dict[str, Any]]:
+        snapshot = await self._snapshot(chart_name)
+        return [dict(entry) for entry in snapshot['entries'][:limit]]
+
 class BillboardService:
     def __init__(self):
         self.charts = ['hot-100', 'billboard-200', 'artist-100']
+        self.snapshots = ChartSnapshotStore()
     
     async def get_artist_billboard_data(self, artist_name: str) -> Dict:
         """
         Get comprehensive Billboard data for an artist
         """
         try:
-            # Search across multiple charts
-            hot_100_data = await self._search_chart('hot-100', artist_name)
-            billboard_200_data = await self._search_chart('billboard-200', artist_name)
-            artist_100_data = await self._search_chart('artist-100', artist_name)
+            # Search across multiple charts; each is read from this week's snapshot
+            hot_100_data, billboard_200_data, artist_100_data = await asyncio.gather(
+                *[self._search_chart(chart_name, artist_name) for chart_name in self.charts]
+            )
             
             # Combine results
             combined_data = {
@@ -70,23 +187,20 @@ class BillboardService:
         Search for artist in a specific chart
         """
         try:
-            # Get current chart
-            chart = ChartData(chart_name)
-            
-            # Search for artist in chart entries
+            # Search this week's chart snapshot for the artist
             entries = []
-            for entry in chart:
-                if self._artist_name_matches(entry.artist, artist_name):
-                    entry_data = {
-                        'title': entry.title,
-                        'artist': entry.artist,
-                        'current_position': entry.rank,
-                        'peak_position': entry.peakPos,
-                        'weeks_on_chart': entry.weeks,
-                        'last_week_position': entry.lastWeek,
-                        'chart_name': chart_name
-                    }
-                    entries.append(entry_data)
+            matches = lambda chart_artist: self._artist_name_matches(chart_artist, artist_name)
+            for entry in await self.snapshots.search(chart_name, matches):
+                entry_data = {
+                    'title': entry['title'],
+                    'artist': entry['artist'],
+                    'current_position': entry['rank'],
+                    'peak_position': entry['peak_position'],
+                    'weeks_on_chart': entry['weeks_on_chart'],
+                    'last_week_position': entry['last_week_position'],
+                    'chart_name': chart_name
+                }
+                entries.append(entry_data)
             
             if entries:
                 return {
@@ -200,12 +314,11 @@ class BillboardService:
             trending = []
             
             # Get top artists from Artist 100
-            artist_chart = ChartData('artist-100')
-            for i, entry in enumerate(artist_chart[:limit]):
+            for entry in await self.snapshots.top('artist-100', limit):
                 trending.append({
-                    'name': entry.artist,
-                    'position': entry.rank,
-                    'weeks_on_chart': entry.weeks,
+                    'name': entry['artist'],
+                    'position': entry['rank'],
+                    'weeks_on_chart': entry['weeks_on_chart'],
                     'chart': 'artist-100'
                 })
             
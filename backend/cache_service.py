@@ -0,0 +1,437 @@
+"""
+Cache Service for MusiStash
+Tiered response caching: an in-process LRU in front of an optional SQLite disk tier
+"""
+
+import os
+import copy
+import json
+import time
+import atexit
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from single_flight import SingleFlight
+
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_data"))
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", os.path.join(CACHE_DIR, "musistash_cache.sqlite3"))
+DISK_CACHE_ENABLED = os.getenv("DISK_CACHE_ENABLED", "true").lower() == "true"
+# Disk writes are buffered and committed together by a background thread at this interval
+DISK_CACHE_FLUSH_INTERVAL = float(os.getenv("DISK_CACHE_FLUSH_INTERVAL_SECONDS", "0.5"))
+# ...or as soon as this many writes are waiting
+DISK_CACHE_MAX_PENDING = int(os.getenv("DISK_CACHE_MAX_PENDING", "500"))
+
+@dataclass
+class CacheEntry:
+    """
+    A cached value with its freshness window
+
+    An entry is fresh until ``expires_at`` and may still be served as stale
+    until ``stale_until`` while a refresh runs. Negative entries record a
+    failed lookup so it is not retried on every request.
+    """
+    value: Any
+    stored_at: float
+    expires_at: float
+    stale_until: float
+    negative: bool = False
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def is_usable(self) -> bool:
+        return time.time() < self.stale_until
+
+@dataclass
+class CacheStats:
+    """
+    Hit/miss counters for one cache
+    """
+    hits: int = 0
+    stale_hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    disk_hits: int = 0
+    writes: int = 0
+    evictions: int = 0
+    background_refreshes: int = 0
+    refresh_failures: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.negative_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "background_refreshes": self.background_refreshes,
+            "refresh_failures": self.refresh_failures,
+            "hit_rate": round((self.hits + self.stale_hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+        }
+
+# (value JSON, stored_at, expires_at, stale_until, negative) as stored in SQLite; None marks a pending delete
+DiskRow = Optional[Tuple[str, float, float, float, int]]
+
+class DiskCache:
+    """
+    SQLite-backed key/value tier shared by every cache namespace
+
+    Values are stored as JSON, so only JSON-serialisable data is persisted.
+    ``set`` and ``delete`` only buffer the change; a writer thread commits the
+    buffer in one transaction every ``DISK_CACHE_FLUSH_INTERVAL`` seconds, so
+    callers never wait on SQLite for writes. Reads see buffered changes first.
+    """
+
+    def __init__(self, db_path: str = CACHE_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], DiskRow] = {}
+        self._pending_lock = threading.Lock()
+        # Held while a batch is swapped out and written, so batches are committed in order
+        self._commit_lock = threading.Lock()
+        self._wake = threading.Event()
+        self.commits = 0
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                stale_until REAL NOT NULL,
+                negative INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        # Databases created before negative entries could be persisted lack the column
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache_entries)")}
+        if "negative" not in columns:
+            self._conn.execute("ALTER TABLE cache_entries ADD COLUMN negative INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+        self._writer = threading.Thread(target=self._write_loop, name="disk-cache-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def get(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        """
+        Blocking read; call it from a worker thread in async code
+        """
+        with self._pending_lock:
+            buffered = (namespace, key) in self._pending
+            row = self._pending.get((namespace, key))
+        if not buffered:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, stored_at, expires_at, stale_until, negative FROM cache_entries "
+                    "WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                ).fetchone()
+
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2], row[3], bool(row[4]))
+
+    def set(self, namespace: str, key: str, entry: CacheEntry):
+        # Serialised now, so later changes to the value object are not persisted by accident
+        row = (json.dumps(entry.value, default=str), entry.stored_at, entry.expires_at, entry.stale_until,
+               int(entry.negative))
+        self._buffer(namespace, key, row)
+
+    def delete(self, namespace: str, key: str):
+        self._buffer(namespace, key, None)
+
+    def _buffer(self, namespace: str, key: str, row: DiskRow):
+        with self._pending_lock:
+            self._pending[(namespace, key)] = row
+            pending = len(self._pending)
+        if pending >= DISK_CACHE_MAX_PENDING:
+            self._wake.set()
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait(DISK_CACHE_FLUSH_INTERVAL)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️  Disk cache flush failed: {e}")
+
+    def flush(self) -> int:
+        """
+        Commit every buffered change in one transaction; returns how many were written
+        """
+        with self._commit_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            upserts: List[Tuple[Any, ...]] = [(namespace, key, *row) for (namespace, key), row in batch.items()
+                                              if row is not None]
+            deletes = [(namespace, key) for (namespace, key), row in batch.items() if row is None]
+            with self._lock:
+                if upserts:
+                    self._conn.executemany("INSERT OR REPLACE INTO cache_entries "
+                                           "(namespace, key, value, stored_at, expires_at, stale_until, negative) "
+                                           "VALUES (?, ?, ?, ?, ?, ?, ?)", upserts)
+                if deletes:
+                    self._conn.executemany("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", deletes)
+                self._conn.commit()
+            self.commits += 1
+            return len(batch)
+
+    def items(self, namespace: str) -> Iterator[Tuple[str, CacheEntry]]:
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value, stored_at, expires_at, stale_until, negative FROM cache_entries "
+                "WHERE namespace = ? AND stale_until > ?",
+                (namespace, time.time())
+            ).fetchall()
+
+        for key, value, stored_at, expires_at, stale_until, negative in rows:
+            yield key, CacheEntry(json.loads(value), stored_at, expires_at, stale_until, bool(negative))
+
+    def purge_expired(self) -> int:
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM cache_entries WHERE stale_until <= ?", (time.time(),))
+            self._conn.commit()
+        return cursor.rowcount
+
+_disk_cache: Optional[DiskCache] = None
+
+def get_disk_cache() -> Optional[DiskCache]:
+    """
+    Shared disk tier, or None when disabled or the database cannot be opened
+    """
+    global _disk_cache
+
+    if not DISK_CACHE_ENABLED:
+        return None
+    if _disk_cache is None:
+        try:
+            _disk_cache = DiskCache()
+        except Exception as e:
+            print(f"⚠️  Disk cache unavailable, using memory only: {e}")
+            return None
+    return _disk_cache
+
+# A fixed TTL in seconds, or a function computing one from the loaded value
+LoadTTL = Union[None, float, Callable[[Any], float]]
+
+class TieredCache:
+    """
+    Memory LRU in front of the optional disk tier, with TTL and stale windows
+
+    Negative entries stay in memory only unless ``persist_negative`` is set, for
+    caches whose misses are expensive to repeat after a restart.
+    """
+
+    def __init__(self, namespace: str, max_entries: int = 1024, default_ttl: float = 3600,
+                 stale_ttl: float = 0, persist: bool = True, persist_negative: bool = False):
+        self.namespace = namespace
+        self.persist_negative = persist_negative
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.disk = get_disk_cache() if persist else None
+        self.stats = CacheStats()
+
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loads = SingleFlight()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+        cache_registry[namespace] = self
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """
+        Look up an entry that is fresh or still inside its stale window
+
+        A memory miss reads the disk tier in the calling thread; async code
+        should use ``aget_entry`` so the event loop is not blocked.
+        """
+        entry = self._memory_entry(key)
+        if entry is None and self.disk is not None:
+            entry = self._disk_entry(key)
+        return self._checked(key, entry)
+
+    async def aget_entry(self, key: str) -> Optional[CacheEntry]:
+        """
+        ``get_entry`` with the disk read done in a worker thread
+        """
+        entry = self._memory_entry(key)
+        if entry is None and self.disk is not None:
+            entry = await asyncio.to_thread(self._disk_entry, key)
+        return self._checked(key, entry)
+
+    def _memory_entry(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        return entry
+
+    def _disk_entry(self, key: str) -> Optional[CacheEntry]:
+        entry = self.disk.get(self.namespace, key)
+        if entry is not None and entry.is_usable:
+            self.stats.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def _checked(self, key: str, entry: Optional[CacheEntry]) -> Optional[CacheEntry]:
+        if entry is None or not entry.is_usable:
+            if entry is not None:
+                self.delete(key)
+            self.stats.misses += 1
+            return None
+
+        if entry.negative:
+            self.stats.negative_hits += 1
+        elif entry.is_fresh:
+            self.stats.hits += 1
+        else:
+            self.stats.stale_hits += 1
+        return entry
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Value of a fresh, non-negative entry, otherwise ``default``
+        """
+        return self._fresh_value(self.get_entry(key), default)
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        return self._fresh_value(await self.aget_entry(key), default)
+
+    @staticmethod
+    def _fresh_value(entry: Optional[CacheEntry], default: Any) -> Any:
+        if entry is None or entry.negative or not entry.is_fresh:
+            return default
+        return entry.value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, negative: bool = False):
+        """
+        Store a value; negative entries reach the disk tier only with ``persist_negative``
+        """
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        entry = CacheEntry(value, now, now + ttl, now + ttl + (0 if negative else self.stale_ttl), negative)
+
+        self._remember(key, entry)
+        self.stats.writes += 1
+
+        if self.disk is not None and (self.persist_negative or not negative):
+            try:
+                self.disk.set(self.namespace, key, entry)
+            except Exception as e:
+                print(f"⚠️  Disk cache write failed for {self.namespace}: {e}")
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: "LoadTTL" = None,
+                          negative_ttl: Optional[float] = None) -> Any:
+        """
+        Cached value for ``key``, calling ``loader`` on a miss (stale-while-revalidate)
+
+        A stale entry is returned at once while ``loader`` refreshes it in the
+        background. Concurrent misses for one key share a single load, and a
+        None result is negatively cached for ``negative_ttl`` seconds when given.
+        ``ttl`` may be a function of the loaded value, e.g. to keep fallbacks briefly.
+        Callers get a copy, so mutating the result does not touch the cache.
+        """
+        entry = await self.aget_entry(key)
+        if entry is not None:
+            if entry.negative:
+                return None
+            if not entry.is_fresh:
+                self.refresh_in_background(key, loader, ttl)
+            return copy.deepcopy(entry.value)
+
+        # SingleFlight already hands each caller its own copy
+        return await self._loads.do(key, lambda: self._load(key, loader, ttl, negative_ttl))
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: "LoadTTL",
+                    negative_ttl: Optional[float]) -> Any:
+        value = await loader()
+        if value is not None:
+            self.set(key, value, ttl(value) if callable(ttl) else ttl)
+        elif negative_ttl:
+            self.set(key, None, negative_ttl, negative=True)
+        return value
+
+    def refresh_in_background(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: "LoadTTL" = None):
+        """
+        Reload ``key`` without blocking the caller; at most one refresh per key runs at a time
+        """
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                value = await loader()
+                if value is not None:
+                    self.set(key, value, ttl(value) if callable(ttl) else ttl)
+                self.stats.background_refreshes += 1
+            except Exception as e:
+                # Keep serving the stale entry; the next stale hit tries again
+                self.stats.refresh_failures += 1
+                print(f"⚠️  Background refresh failed for {self.namespace}: {e}")
+
+        task = asyncio.ensure_future(refresh())
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    def delete(self, key: str):
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.disk is not None:
+            self.disk.delete(self.namespace, key)
+
+    def load_from_disk(self) -> int:
+        """
+        Warm the memory tier from every usable disk entry in this namespace
+        """
+        if self.disk is None:
+            return 0
+
+        loaded = 0
+        for key, entry in self.disk.items(self.namespace):
+            self._remember(key, entry)
+            loaded += 1
+        return loaded
+
+    def _remember(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.stats.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+# Every TieredCache registers itself here so metrics can report all of them
+cache_registry: Dict[str, TieredCache] = {}
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Hit-rate metrics for every registered cache
+    """
+    return {
+        namespace: {**cache.stats.as_dict(), "memory_entries": len(cache), "persistent": cache.disk is not None}
+        for namespace, cache in cache_registry.items()
+    }
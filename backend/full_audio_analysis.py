@@ -85,9 +85,13 @@ class FullAudioAnalyzer:
         
         print(f"🎵 Full Audio Analyzer initialized with libraries: {self.available_libraries}")
         
-    async def analyze_audio_comprehensive(self, file_path: str, filename: str, artist_id: str = None) -> Dict[str, Any]:
+    async def analyze_audio_comprehensive(self, file_path: str, filename: str, artist_id: str = None,
+                                          include_ai: bool = True) -> Dict[str, Any]:
         """
         Comprehensive audio analysis using all available libraries
+        
+        With include_ai=False the Gemini step is skipped and the loaded artist
+        profile is returned under "artist_profile" so insights can be streamed separately.
         """
         print(f"🎵 Starting comprehensive audio analysis for: {filename}")
         
@@ -167,7 +171,9 @@ class FullAudioAnalyzer:
         analysis_results.update(commercial_analysis)
         
         # 6. Gemini AI Analysis (if available)
-        if GEMINI_AVAILABLE:
+        if not include_ai:
+            analysis_results["artist_profile"] = artist_profile
+        elif GEMINI_AVAILABLE:
             try:
                 print("🤖 Starting Gemini AI analysis...")
                 gemini_analysis = await gemini_service.analyze_audio_features(
@@ -4,15 +4,453 @@ Provides AI-powered insights for audio analysis using Google Gemini
 """
 
 import os
-import requests
 import json
+import asyncio
+import hashlib
 import httpx
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator, Set, Tuple
 from dotenv import load_dotenv
+from cache_service import TieredCache
+from single_flight import single_flight
+from resilience import TokenBucket, CircuitBreaker, backoff_delay
+from upstreams import GEMINI_API_BASE_URL
+from http_clients import upstream_clients
+from pydantic import ValidationError
+from gemini_schemas import (AudioAnalysisInsights, gemini_response_schema, validate_structured,
+                            missing_fields, decode_json)
 
 # Load environment variables
 load_dotenv()
 
+GEMINI_MODEL_URL = f"{GEMINI_API_BASE_URL}/v1beta/models/gemini-2.0-flash:generateContent"
+GEMINI_STREAM_URL = f"{GEMINI_API_BASE_URL}/v1beta/models/gemini-2.0-flash:streamGenerateContent"
+
+DEFAULT_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "topK": 40,
+    "topP": 0.95,
+    "maxOutputTokens": 2048
+}
+
+class GeminiAPIError(Exception):
+    """
+    Raised when the Gemini API returns an error status or an unusable response
+    """
+    
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class GeminiUnavailableError(GeminiAPIError):
+    """
+    Raised without calling Gemini while its circuit breaker is open
+    """
+
+# Quota-sized limiter, retry policy and breaker shared by every Gemini call
+GEMINI_RATE_LIMIT_PER_MINUTE = float(os.getenv("GEMINI_RATE_LIMIT_PER_MINUTE", "60"))
+GEMINI_RATE_LIMIT_BURST = int(os.getenv("GEMINI_RATE_LIMIT_BURST", "10"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+GEMINI_RETRY_BASE_DELAY = float(os.getenv("GEMINI_RETRY_BASE_DELAY", "0.5"))
+GEMINI_RETRY_MAX_DELAY = float(os.getenv("GEMINI_RETRY_MAX_DELAY", "8"))
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+gemini_rate_limiter = TokenBucket(GEMINI_RATE_LIMIT_PER_MINUTE, burst=GEMINI_RATE_LIMIT_BURST)
+gemini_circuit_breaker = CircuitBreaker(
+    "Gemini",
+    failure_threshold=int(os.getenv("GEMINI_BREAKER_THRESHOLD", "5")),
+    reset_timeout=float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30"))
+)
+
+async def generate_content(prompt: str,
+                           generation_config: Optional[Dict[str, Any]] = None,
+                           api_key: Optional[str] = None) -> str:
+    """
+    Send a prompt to Gemini over the shared client and return the response text
+    
+    Calls wait for the shared rate limiter, and 429/5xx responses or transport
+    errors are retried up to GEMINI_MAX_RETRIES times with jittered backoff.
+    Raises GeminiUnavailableError straight away while the circuit breaker is
+    open, and GeminiAPIError for other error statuses and malformed responses.
+    """
+    api_key = api_key or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise GeminiAPIError("GEMINI_API_KEY not configured")
+    
+    payload = {
+        "contents": [
+            {
+                "parts": [
+                    {
+                        "text": prompt
+                    }
+                ]
+            }
+        ],
+        "generationConfig": {**DEFAULT_GENERATION_CONFIG, **(generation_config or {})}
+    }
+    
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        if not gemini_circuit_breaker.allow_request():
+            raise GeminiUnavailableError("Gemini circuit open", 503)
+        
+        retry_after = None
+        try:
+            await gemini_rate_limiter.acquire()
+            response = await upstream_clients.get("gemini").post(
+                GEMINI_MODEL_URL,
+                params={"key": api_key},
+                headers={"Content-Type": "application/json"},
+                json=payload
+            )
+        except httpx.TransportError as e:
+            gemini_circuit_breaker.record_failure()
+            error = GeminiAPIError(f"Request failed: {e}")
+        except BaseException:
+            # Cancellation or an unexpected error still has to settle the call, or a half-open breaker stays stuck
+            gemini_circuit_breaker.record_failure()
+            raise
+        else:
+            if response.status_code == 200:
+                gemini_circuit_breaker.record_success()
+                break
+            
+            error = GeminiAPIError(f"API request failed: {response.status_code}", response.status_code)
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                # Gemini is reachable; a bad request is not an outage
+                gemini_circuit_breaker.record_success()
+                raise error
+            gemini_circuit_breaker.record_failure()
+            retry_after = response.headers.get("Retry-After")
+        
+        if attempt == GEMINI_MAX_RETRIES:
+            raise error
+        await asyncio.sleep(backoff_delay(attempt, GEMINI_RETRY_BASE_DELAY, GEMINI_RETRY_MAX_DELAY, retry_after))
+    
+    try:
+        result = response.json()
+    except ValueError as e:
+        raise GeminiAPIError(f"Invalid JSON in response: {e}", response.status_code)
+    if not isinstance(result, dict) or not result.get('candidates'):
+        raise GeminiAPIError("No candidates in response")
+    
+    candidate = result['candidates'][0]
+    parts = candidate.get('content', {}).get('parts') if isinstance(candidate, dict) else None
+    if not parts or 'text' not in parts[0]:
+        raise GeminiAPIError("Unexpected response structure")
+    
+    return parts[0]['text']
+
+async def stream_content(prompt: str,
+                         generation_config: Optional[Dict[str, Any]] = None,
+                         api_key: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Stream a Gemini response as text chunks using streamGenerateContent?alt=sse
+    
+    Shares the rate limiter and circuit breaker with generate_content. Nothing
+    is retried once streaming has started, since chunks are already delivered.
+    """
+    api_key = api_key or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise GeminiAPIError("GEMINI_API_KEY not configured")
+    if not gemini_circuit_breaker.allow_request():
+        raise GeminiUnavailableError("Gemini circuit open", 503)
+    
+    payload = {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "generationConfig": {**DEFAULT_GENERATION_CONFIG, **(generation_config or {})}
+    }
+    
+    settled = False
+    try:
+        await gemini_rate_limiter.acquire()
+        async with upstream_clients.get("gemini").stream(
+            "POST",
+            GEMINI_STREAM_URL,
+            params={"key": api_key, "alt": "sse"},
+            headers={"Content-Type": "application/json"},
+            json=payload
+        ) as response:
+            settled = True
+            if response.status_code != 200:
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    gemini_circuit_breaker.record_failure()
+                else:
+                    gemini_circuit_breaker.record_success()
+                raise GeminiAPIError(f"API request failed: {response.status_code}", response.status_code)
+            gemini_circuit_breaker.record_success()
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                try:
+                    event = json.loads(line[5:].strip())
+                except ValueError as e:
+                    raise GeminiAPIError(f"Invalid JSON in stream event: {e}")
+                for candidate in event.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+    except httpx.TransportError as e:
+        settled = True
+        gemini_circuit_breaker.record_failure()
+        raise GeminiAPIError(f"Request failed: {e}")
+    finally:
+        # A stream dropped or cancelled before Gemini answered still settles the breaker
+        if not settled:
+            gemini_circuit_breaker.record_failure()
+
+# Response cache lifetimes per prompt type, in seconds
+GEMINI_CACHE_TTLS = {
+    "genres": 30 * 24 * 3600,          # an artist's genres rarely change
+    "artist_profile": 24 * 3600,       # net worth, awards, social following
+    "default": 3600
+}
+GEMINI_NEGATIVE_CACHE_TTL = float(os.getenv("GEMINI_NEGATIVE_CACHE_TTL", "300"))
+
+gemini_response_cache = TieredCache(
+    "gemini_responses",
+    max_entries=int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "2048")),
+    default_ttl=GEMINI_CACHE_TTLS["default"]
+)
+
+def _normalize_cache_params(value: Any) -> Any:
+    """
+    Case- and whitespace-insensitive form of prompt parameters for cache keys
+    """
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {k: _normalize_cache_params(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_cache_params(v) for v in value]
+    return value
+
+def gemini_cache_key(template: str, params: Dict[str, Any], generation_config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Cache key from the model, effective generation config, prompt template and its parameters
+    """
+    key_material = {
+        "model": GEMINI_MODEL_URL,
+        "generation_config": {**DEFAULT_GENERATION_CONFIG, **(generation_config or {})},
+        "template": " ".join(template.split()),
+        "params": _normalize_cache_params(params)
+    }
+    return hashlib.sha256(json.dumps(key_material, sort_keys=True, default=str).encode()).hexdigest()
+
+# Structured output: Gemini is asked for JSON matching a schema, and replies are validated
+STRUCTURED_FOLLOW_UP_PROMPT = """Your previous answer to the request below was missing or had invalid values for: {fields}.
+Return ONLY a JSON object with those fields.
+
+Request:
+{prompt}"""
+
+def structured_generation_config(schema_type: Any, generation_config: Optional[Dict[str, Any]] = None,
+                                 only_fields: Optional[set] = None) -> Dict[str, Any]:
+    """
+    Generation config requesting JSON output that matches ``schema_type``
+    """
+    return {
+        **(generation_config or {}),
+        "responseMimeType": "application/json",
+        "responseSchema": gemini_response_schema(schema_type, only_fields)
+    }
+
+async def complete_structured(text: str, schema_type: Any, prompt: str,
+                              generation_config: Optional[Dict[str, Any]] = None,
+                              api_key: Optional[str] = None) -> Any:
+    """
+    Decode and validate a structured response
+    
+    Truncated JSON is repaired first. If an object is still missing fields,
+    Gemini is asked once for just those fields and the answers are merged in.
+    Raises GeminiAPIError when the response cannot be made to fit the schema.
+    """
+    try:
+        data = decode_json(text)
+    except ValueError as e:
+        raise GeminiAPIError(f"Response is not valid JSON: {e}")
+    
+    try:
+        return validate_structured(data, schema_type)
+    except ValidationError as e:
+        if not isinstance(data, dict):
+            raise GeminiAPIError(f"Response did not match schema: {e.error_count()} errors")
+        fields = missing_fields(e)
+    
+    follow_up = STRUCTURED_FOLLOW_UP_PROMPT.format(fields=", ".join(sorted(fields)), prompt=prompt)
+    extra_text = await generate_content(
+        follow_up,
+        structured_generation_config(schema_type, generation_config, only_fields=fields),
+        api_key=api_key
+    )
+    try:
+        extra = decode_json(extra_text)
+        if isinstance(extra, dict):
+            data = {**data, **{k: v for k, v in extra.items() if k in fields}}
+        return validate_structured(data, schema_type)
+    except ValueError as e:
+        raise GeminiAPIError(f"Response did not match schema after follow-up: {e}")
+
+async def generate_structured(prompt: str, schema_type: Any,
+                              generation_config: Optional[Dict[str, Any]] = None,
+                              api_key: Optional[str] = None) -> Any:
+    """
+    Generate a response validated against ``schema_type`` (a pydantic model or typing type)
+    """
+    text = await generate_content(prompt, structured_generation_config(schema_type, generation_config), api_key=api_key)
+    return await complete_structured(text, schema_type, prompt, generation_config, api_key)
+
+AUDIO_ANALYSIS_GENERATION_CONFIG = structured_generation_config(AudioAnalysisInsights)
+
+# Multi-artist batching: requests arriving within the window share one prompt
+GEMINI_BATCH_MAX_SIZE = int(os.getenv("GEMINI_BATCH_MAX_SIZE", "8"))
+GEMINI_BATCH_WINDOW_MS = float(os.getenv("GEMINI_BATCH_WINDOW_MS", "50"))
+
+def _is_complete_json(text: str) -> bool:
+    try:
+        json.loads(text)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+class GeminiBatcher:
+    """
+    Collects per-artist enrichment requests into one structured Gemini prompt
+    
+    ``template`` is formatted with ``artist_names`` (a JSON array) and Gemini
+    is asked for a JSON array of ``item_model`` objects, each with an
+    ``artist`` field. A batch is sent when it reaches ``max_batch_size``
+    artists or ``window_ms`` after its first request, and each caller gets back
+    its own artist's entry (without the ``artist`` key). Entries are validated
+    one by one; artists missing from the reply, or with invalid entries, are
+    asked for once more in a follow-up batch. Results are cached per artist,
+    so later requests for the same artist never join a batch.
+    """
+    
+    def __init__(self, prompt_type: str, template: str, item_model: Any, tokens_per_artist: int,
+                 max_batch_size: int = GEMINI_BATCH_MAX_SIZE,
+                 window_ms: float = GEMINI_BATCH_WINDOW_MS):
+        self.prompt_type = prompt_type
+        self.template = template
+        self.item_model = item_model
+        self.tokens_per_artist = tokens_per_artist
+        self.max_batch_size = max(1, max_batch_size)
+        self.window_ms = window_ms
+        self.batches_sent = 0
+        self.artists_sent = 0
+        
+        # normalized artist name -> (name as given, waiting futures)
+        self._pending: Dict[str, tuple] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Batches in flight; the loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def submit(self, artist_name: str) -> Any:
+        """
+        Parsed value for one artist, or None if Gemini did not return one
+        """
+        key = gemini_cache_key(self.template, {"artist_name": artist_name})
+        entry = await gemini_response_cache.aget_entry(key)
+        if entry is not None and entry.is_fresh:
+            return None if entry.negative else entry.value
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        normalized = _normalize_cache_params(artist_name)
+        self._pending.setdefault(normalized, (artist_name, []))[1].append(future)
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._send_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _send_batch(self, batch: Dict[str, tuple]):
+        names = [name for name, _ in batch.values()]
+        self.batches_sent += 1
+        self.artists_sent += len(names)
+        
+        results: Dict[str, Any] = {}
+        error: Optional[BaseException] = None
+        try:
+            results = await self._request(names)
+            missing = [name for name in names if _normalize_cache_params(name) not in results]
+            if missing and len(missing) < len(names):
+                results.update(await self._request(missing))
+            
+            ttl = GEMINI_CACHE_TTLS.get(self.prompt_type, GEMINI_CACHE_TTLS["default"])
+            for normalized, (name, _) in batch.items():
+                value = results.get(normalized)
+                key = gemini_cache_key(self.template, {"artist_name": name})
+                if value is None:
+                    gemini_response_cache.set(key, None, ttl=GEMINI_NEGATIVE_CACHE_TTL, negative=True)
+                else:
+                    gemini_response_cache.set(key, value, ttl=ttl)
+        except Exception as e:
+            error = e
+            print(f"❌ Gemini {self.prompt_type} batch of {len(names)} failed: {e}")
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            # Every waiter gets an answer, whatever happened to the batch
+            self._resolve(batch, results, error)
+    
+    @staticmethod
+    def _resolve(batch: Dict[str, tuple], results: Dict[str, Any], error: Optional[BaseException]):
+        for normalized, (_, futures) in batch.items():
+            for future in futures:
+                if future.done():
+                    continue
+                if isinstance(error, asyncio.CancelledError):
+                    future.cancel()
+                elif error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results.get(normalized))
+    
+    async def _request(self, names: List[str]) -> Dict[str, Any]:
+        """
+        One structured call for ``names``; returns valid entries keyed by normalized artist name
+        """
+        results: Dict[str, Any] = {}
+        try:
+            text = await generate_content(
+                self.template.format(artist_names=json.dumps(names)),
+                structured_generation_config(List[self.item_model], {"maxOutputTokens": self.tokens_per_artist * len(names)})
+            )
+            entries = decode_json(text)
+        except Exception as e:
+            print(f"❌ Gemini {self.prompt_type} batch of {len(names)} failed: {e}")
+            return results
+        
+        if not isinstance(entries, list):
+            return results
+        if not _is_complete_json(text):
+            # Cut off by the token limit: the last entry is partial, and its missing fields would
+            # validate as defaults, so that artist is asked for again in the follow-up instead
+            entries = entries[:-1]
+        
+        for entry in entries:
+            try:
+                value = validate_structured(entry, self.item_model)
+            except ValidationError:
+                continue
+            results[_normalize_cache_params(value.pop("artist"))] = value
+        return results
+
 class GeminiAnalysisService:
     """
     AI-powered analysis service using Google Gemini for music insights
@@ -20,7 +458,7 @@ class GeminiAnalysisService:
     
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+        self.base_url = GEMINI_MODEL_URL
         
         if not self.api_key:
             print("⚠️  GEMINI_API_KEY not found in environment variables")
@@ -36,18 +474,18 @@ class GeminiAnalysisService:
         """
         Analyze audio features using Gemini AI and provide comprehensive insights
         """
-        if not self.available:
+        if not self.available or gemini_circuit_breaker.is_open:
             return self._get_fallback_analysis()
         
         try:
             # Prepare the analysis prompt
             prompt = self._create_analysis_prompt(audio_features, artist_profile, filename)
             
-            # Call Gemini API
-            response = await self._call_gemini_api(prompt)
+            # Call Gemini API with JSON output constrained to the analysis schema
+            response = await self._call_gemini_api(prompt, AUDIO_ANALYSIS_GENERATION_CONFIG)
             
             # Parse and structure the response
-            analysis = self._parse_gemini_response(response, audio_features)
+            analysis = await self._parse_gemini_response(response, audio_features, prompt)
             
             return analysis
             
@@ -55,6 +493,34 @@ class GeminiAnalysisService:
             print(f"❌ Gemini analysis error: {e}")
             return self._get_fallback_analysis()
     
+    async def stream_audio_analysis(self,
+                                    audio_features: Dict[str, Any],
+                                    artist_profile: Optional[Dict[str, Any]] = None,
+                                    filename: str = "Unknown Track") -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streaming variant of analyze_audio_features
+        
+        Yields ("chunk", text) as Gemini generates the analysis, then a final
+        ("result", analysis) with the parsed insights, or the fallback analysis
+        when Gemini is unavailable or the stream fails.
+        """
+        if not self.available or gemini_circuit_breaker.is_open:
+            yield "result", self._get_fallback_analysis()
+            return
+        
+        prompt = self._create_analysis_prompt(audio_features, artist_profile, filename)
+        chunks = []
+        try:
+            async for text in stream_content(prompt, AUDIO_ANALYSIS_GENERATION_CONFIG, api_key=self.api_key):
+                chunks.append(text)
+                yield "chunk", text
+        except Exception as e:
+            print(f"❌ Gemini streaming analysis error: {e}")
+            yield "result", self._get_fallback_analysis()
+            return
+        
+        yield "result", await self._parse_gemini_response("".join(chunks), audio_features, prompt)
+    
     def _create_analysis_prompt(self, 
                                audio_features: Dict[str, Any], 
                                artist_profile: Optional[Dict[str, Any]], 
@@ -160,75 +626,37 @@ Focus on providing practical, actionable insights that would help an artist unde
         
         return prompt
     
-    async def _call_gemini_api(self, prompt: str) -> Dict[str, Any]:
+    async def _call_gemini_api(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
         """
         Call the Gemini API with the analysis prompt
         """
-        url = f"{self.base_url}?key={self.api_key}"
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {
-                            "text": prompt
-                        }
-                    ]
-                }
-            ],
-            "generationConfig": {
-                "temperature": 0.7,
-                "topK": 40,
-                "topP": 0.95,
-                "maxOutputTokens": 2048
-            }
-        }
-        
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                
-                if 'candidates' in result and len(result['candidates']) > 0:
-                    candidate = result['candidates'][0]
-                    if 'content' in candidate and 'parts' in candidate['content']:
-                        return candidate['content']['parts'][0]['text']
-                    else:
-                        raise Exception("Unexpected response structure")
-                else:
-                    raise Exception("No candidates in response")
-            else:
-                raise Exception(f"API request failed: {response.status_code}")
-                
+            return await generate_content(prompt, generation_config, api_key=self.api_key)
         except Exception as e:
             print(f"❌ Gemini API call failed: {e}")
             raise
     
-    def _parse_gemini_response(self, response_text: str, audio_features: Dict[str, Any]) -> Dict[str, Any]:
+    async def generate_insights(self, prompt: str) -> str:
         """
-        Parse the Gemini response and structure it for the frontend
+        Generate free-form insights for a custom prompt
+        """
+        if not self.available:
+            raise GeminiAPIError("Gemini API not available")
+        if gemini_circuit_breaker.is_open:
+            raise GeminiUnavailableError("Gemini circuit open", 503)
+        
+        return await self._call_gemini_api(prompt)
+    
+    async def _parse_gemini_response(self, response_text: str, audio_features: Dict[str, Any], prompt: str) -> Dict[str, Any]:
+        """
+        Validate the Gemini response against the analysis schema and structure it for the frontend
+        
+        Truncated JSON is repaired and missing sections are requested once more.
         """
         try:
-            # Try to extract JSON from the response
-            # Look for JSON content between triple backticks or just parse the whole response
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                json_content = response_text[json_start:json_end].strip()
-            elif "```" in response_text:
-                json_start = response_text.find("```") + 3
-                json_end = response_text.find("```", json_start)
-                json_content = response_text[json_start:json_end].strip()
-            else:
-                json_content = response_text.strip()
-            
-            # Parse the JSON response
-            analysis_data = json.loads(json_content)
+            analysis_data = await complete_structured(
+                response_text, AudioAnalysisInsights, prompt, api_key=self.api_key
+            )
             
             # Add the original audio features for reference
             analysis_data["original_metrics"] = {
@@ -249,7 +677,7 @@ Focus on providing practical, actionable insights that would help an artist unde
             
             return analysis_data
             
-        except json.JSONDecodeError as e:
+        except GeminiAPIError as e:
             print(f"❌ Failed to parse Gemini JSON response: {e}")
             print(f"Response text: {response_text[:500]}...")
             return self._get_fallback_analysis()
@@ -301,61 +729,35 @@ Focus on providing practical, actionable insights that would help an artist unde
             "original_metrics": {}
         }
 
-async def call_gemini_api(prompt: str) -> str:
+@single_flight("gemini_api")
+async def call_gemini_api(prompt: str, max_tokens: int = 2048) -> Optional[str]:
     """
     Direct function to call Gemini API with a custom prompt
+    
+    Returns the response text, or None when Gemini is unavailable or the
+    call failed, so callers never try to parse an error message as JSON.
     """
     try:
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            print("⚠️  GEMINI_API_KEY not found")
-            return "Gemini API not available"
-        
-        url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "contents": [
-                {
-                    "parts": [
-                        {
-                            "text": prompt
-                        }
-                    ]
-                }
-            ],
-            "generationConfig": {
-                "temperature": 0.7,
-                "topK": 40,
-                "topP": 0.95,
-                "maxOutputTokens": 2048
-            }
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{url}?key={api_key}",
-                headers=headers,
-                json=data,
-                timeout=30.0
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if 'candidates' in result and len(result['candidates']) > 0:
-                    return result['candidates'][0]['content']['parts'][0]['text']
-                else:
-                    return "No response from Gemini"
-            else:
-                print(f"❌ Gemini API error: {response.status_code}")
-                return f"API Error: {response.status_code}"
-                
+        return await generate_content(prompt, {"maxOutputTokens": max_tokens})
+    except GeminiAPIError as e:
+        print(f"❌ Gemini API error: {e}")
+        return None
     except Exception as e:
         print(f"❌ Error calling Gemini API: {e}")
-        return f"Error: {str(e)}"
+        return None
+
+def get_gemini_resilience_stats() -> Dict[str, Any]:
+    """
+    Circuit breaker state and rate limiter counters
+    """
+    return {
+        "circuit_breaker": gemini_circuit_breaker.stats(),
+        "rate_limiter": {
+            "rate_per_minute": GEMINI_RATE_LIMIT_PER_MINUTE,
+            "burst": GEMINI_RATE_LIMIT_BURST,
+            "throttled": gemini_rate_limiter.throttled
+        }
+    }
 
 # Global instance
 gemini_service = GeminiAnalysisService() 
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Structured-output schemas for Gemini prompts
+Pydantic models double as the responseSchema sent to Gemini and as the validator for its replies
+"""
+
+import re
+import json
+from typing import Any, Dict, List, Optional, Set
+
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+
+# --- Per-prompt response models ---
+class ArtistGenres(BaseModel):
+    artist: str
+    genres: List[str] = Field(min_length=1, max_length=6)
+
+class ArtistProfileEntry(BaseModel):
+    # First, so an entry cut off by the token limit still says which artist it belongs to
+    artist: str
+    instagram_followers: int = 0
+    net_worth_millions: float = 0
+    career_achievements: List[str] = []
+    major_awards: List[str] = []
+    monthly_streams_millions: float = 0
+    top_song_streams_billions: float = 0.0
+
+class TrackSummary(BaseModel):
+    overall_assessment: str
+    strengths: List[str]
+    areas_for_improvement: List[str]
+    commercial_potential: str
+
+class TechnicalAnalysis(BaseModel):
+    tempo_analysis: str
+    key_analysis: str
+    energy_analysis: str
+    rhythm_analysis: str
+    spectral_analysis: str
+
+class ArtisticInsights(BaseModel):
+    mood_and_emotion: str
+    genre_characteristics: str
+    production_quality: str
+    audience_appeal: str
+
+class ActionableRecommendations(BaseModel):
+    production_tips: List[str]
+    mixing_suggestions: List[str]
+    marketing_angles: List[str]
+    collaboration_opportunities: List[str]
+
+class SimilarArtists(BaseModel):
+    primary_matches: List[str]
+    secondary_matches: List[str]
+    reasoning: str
+
+class MarketPositioning(BaseModel):
+    target_audience: str
+    playlist_fit: str
+    radio_potential: str
+    streaming_appeal: str
+
+class AudioAnalysisInsights(BaseModel):
+    track_summary: TrackSummary
+    technical_analysis: TechnicalAnalysis
+    artistic_insights: ArtisticInsights
+    actionable_recommendations: ActionableRecommendations
+    similar_artists: SimilarArtists
+    market_positioning: MarketPositioning
+
+# --- Compiled validators ---
+# TypeAdapters build pydantic's validator once per type instead of on every response
+_adapters: Dict[Any, TypeAdapter] = {}
+
+def get_adapter(schema_type: Any) -> TypeAdapter:
+    key = repr(schema_type)
+    if key not in _adapters:
+        _adapters[key] = TypeAdapter(schema_type)
+    return _adapters[key]
+
+def validate_structured(data: Any, schema_type: Any) -> Any:
+    """
+    Validate decoded JSON against ``schema_type`` and return plain Python data
+
+    Raises pydantic.ValidationError when the data does not fit.
+    """
+    value = get_adapter(schema_type).validate_python(data)
+    return get_adapter(schema_type).dump_python(value, mode="json")
+
+def missing_fields(error: ValidationError) -> Set[str]:
+    """
+    Top-level fields a response left out or got wrong, from a validation error
+    """
+    return {str(detail["loc"][0]) for detail in error.errors() if detail.get("loc")}
+
+# --- Gemini responseSchema ---
+_TYPE_NAMES = {"string": "STRING", "integer": "INTEGER", "number": "NUMBER", "boolean": "BOOLEAN",
+               "array": "ARRAY", "object": "OBJECT"}
+
+def gemini_response_schema(schema_type: Any, only_fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """
+    Convert a pydantic type into Gemini's OpenAPI-subset responseSchema
+
+    ``only_fields`` restricts a model's top-level properties, used when asking
+    Gemini for just the fields a previous response was missing.
+    """
+    json_schema = get_adapter(schema_type).json_schema()
+    definitions = json_schema.get("$defs", {})
+
+    def convert(node: Dict[str, Any]) -> Dict[str, Any]:
+        if "$ref" in node:
+            return convert(definitions[node["$ref"].split("/")[-1]])
+        if "anyOf" in node:
+            options = [option for option in node["anyOf"] if option.get("type") != "null"]
+            return {**convert(options[0]), "nullable": True}
+
+        schema: Dict[str, Any] = {"type": _TYPE_NAMES.get(node.get("type"), "STRING")}
+        if schema["type"] == "ARRAY":
+            schema["items"] = convert(node.get("items", {}))
+        elif schema["type"] == "OBJECT" and "properties" in node:
+            schema["properties"] = {name: convert(value) for name, value in node["properties"].items()}
+            required = node.get("required", list(node["properties"]))
+            schema["required"] = required
+            schema["propertyOrdering"] = list(node["properties"])
+        return schema
+
+    schema = convert(json_schema)
+    if only_fields and "properties" in schema:
+        schema["properties"] = {k: v for k, v in schema["properties"].items() if k in only_fields}
+        schema["required"] = [k for k in schema["required"] if k in only_fields]
+        schema["propertyOrdering"] = [k for k in schema["propertyOrdering"] if k in only_fields]
+    return schema
+
+# --- Decoding with repair ---
+def repair_json(text: str) -> str:
+    """
+    Best-effort fix for JSON cut off by the token limit
+
+    Drops anything around the outermost value, closes an unterminated string,
+    removes a number or literal cut off mid-token, a dangling key or trailing
+    comma, and closes open brackets.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return text
+    text = text[min(starts):]
+
+    stack: List[str] = []
+    in_string = False
+    escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+            if not stack:
+                return text[:i + 1]
+
+    if in_string:
+        # Close the string, dropping a trailing backslash that would escape the quote
+        text = (text[:-1] if escaped else text) + '"'
+    else:
+        text = _drop_incomplete_token(text.rstrip())
+    return _drop_incomplete_member(text.rstrip(), stack) + "".join(reversed(stack))
+
+_TRAILING_TOKEN = re.compile(r"[\w.+-]+$")
+
+def _drop_incomplete_token(text: str) -> str:
+    """
+    Remove a bare value at the end of the text; a number may have lost digits
+    and ``tr`` or ``nul`` is no value at all, so only complete literals stay
+    """
+    match = _TRAILING_TOKEN.search(text)
+    if match and match.group() not in ("true", "false", "null"):
+        return text[:match.start()].rstrip()
+    return text
+
+def _drop_incomplete_member(text: str, stack: List[str]) -> str:
+    while True:
+        if text.endswith(","):
+            text = text[:-1].rstrip()
+        elif text.endswith(":") or (stack and stack[-1] == "}" and text.endswith('"') and _ends_with_key(text)):
+            key_end = len(text.rstrip(":").rstrip()) - 1
+            text = text[:text.rfind('"', 0, key_end)].rstrip()
+        else:
+            return text
+
+def _ends_with_key(text: str) -> bool:
+    """True when the text ends with an object key that has no value yet"""
+    start = text.rfind('"', 0, len(text) - 1)
+    return text[:start].rstrip().endswith(("{", ","))
+
+def decode_json(text: str) -> Any:
+    """
+    Decode a JSON response, repairing truncation when plain decoding fails
+    """
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        return json.loads(repair_json(text or ""))
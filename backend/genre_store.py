@@ -0,0 +1,77 @@
+"""
+Genre Resolution Store for MusiStash
+Artist genres resolved once from Spotify, Last.fm and Gemini, then served from memory
+"""
+
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from cache_service import TieredCache
+
+GENRE_STORE_TTL = float(os.getenv("GENRE_STORE_TTL_SECONDS", str(30 * 24 * 3600)))
+GENRE_STORE_STALE_TTL = float(os.getenv("GENRE_STORE_STALE_SECONDS", str(180 * 24 * 3600)))
+# Placeholder genres from the hard-coded fallback are retried much sooner
+GENRE_FALLBACK_TTL = float(os.getenv("GENRE_FALLBACK_TTL_SECONDS", "3600"))
+GENRE_STORE_MAX_ENTRIES = int(os.getenv("GENRE_STORE_MAX_ENTRIES", "20000"))
+
+# Resolves (artist_name, spotify_genres, **prefetched) to (genres, sources used)
+GenreResolver = Callable[..., Awaitable[Tuple[List[str], List[str]]]]
+
+def normalize_artist_name(name: str) -> str:
+    return " ".join((name or "").lower().split())
+
+class GenreStore:
+    """
+    Persistent artist → genres mapping keyed by normalized artist name
+
+    Each record keeps the genres, the sources they came from and when they
+    were resolved. The store is sized to hold every known artist in memory and
+    is preloaded from the disk tier at startup, so lookups are dictionary hits;
+    records past their TTL are served while a background refresh re-resolves them.
+    """
+
+    def __init__(self, resolver: GenreResolver):
+        self.resolver = resolver
+        self.cache = TieredCache("artist_genres", max_entries=GENRE_STORE_MAX_ENTRIES, default_ttl=GENRE_STORE_TTL,
+                                 stale_ttl=GENRE_STORE_STALE_TTL)
+
+    @staticmethod
+    def _ttl(record: Dict[str, Any]) -> float:
+        return GENRE_FALLBACK_TTL if record["sources"] == ["fallback"] else GENRE_STORE_TTL
+
+    async def is_stored(self, artist_name: str) -> bool:
+        """
+        True when ``get`` will answer from a stored record, so callers can skip prefetching sources
+        """
+        entry = await self.cache.aget_entry(normalize_artist_name(artist_name))
+        return entry is not None and not entry.negative
+
+    async def get(self, artist_name: str, spotify_genres: List[str] = None, **prefetched: Any) -> List[str]:
+        """
+        Stored genres for an artist, resolving them on a miss
+
+        ``prefetched`` source data (e.g. ``lastfm_data``) is passed on to the
+        resolver so sources fetched concurrently by the caller are not fetched twice.
+        A record resolved without Spotify genres is resolved again once a caller
+        has them, so an early lookup without Spotify data is not kept for the full TTL.
+        """
+        key = normalize_artist_name(artist_name)
+
+        async def resolve() -> Dict[str, Any]:
+            genres, sources = await self.resolver(artist_name, spotify_genres or [], **prefetched)
+            return {"genres": genres, "sources": sources, "resolved_at": time.time()}
+
+        if spotify_genres:
+            entry = await self.cache.aget_entry(key)
+            if entry is not None and not entry.negative and "spotify" not in entry.value["sources"]:
+                self.cache.delete(key)
+
+        record = await self.cache.get_or_load(key, resolve, ttl=self._ttl)
+        return record["genres"]
+
+    def preload(self) -> int:
+        """
+        Pull every stored record into memory; returns how many were loaded
+        """
+        return self.cache.load_from_disk()
@@ -0,0 +1,215 @@
+"""
+HTTP Client Registry for MusiStash
+One pooled httpx client per upstream host, opened at startup and closed at shutdown
+"""
+
+import os
+import time
+import asyncio
+import importlib.util
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+
+from upstreams import (GEMINI_API_BASE_URL, SPOTIFY_API_BASE_URL, SPOTIFY_ACCOUNTS_BASE_URL, GOOGLE_PLACES_BASE_URL,
+                       LASTFM_API_BASE_URL, YOUTUBE_API_BASE_URL, MUSICBRAINZ_API_BASE_URL, LISTENBRAINZ_API_BASE_URL)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+LATENCY_SAMPLE_SIZE = 500
+
+@dataclass
+class UpstreamConfig:
+    """
+    Connection settings for one upstream host
+
+    Every setting can be overridden from the environment with the upstream's
+    prefix, e.g. LASTFM_HTTP_TIMEOUT_SECONDS, LASTFM_HTTP_MAX_CONNECTIONS,
+    LASTFM_HTTP_MAX_KEEPALIVE, LASTFM_HTTP_KEEPALIVE_EXPIRY and LASTFM_HTTP_HTTP2.
+    """
+    base_url: str
+    env_prefix: str
+    timeout: float = 10.0
+    max_connections: int = 20
+    max_keepalive: int = 10
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+
+    def resolved(self) -> "UpstreamConfig":
+        prefix = self.env_prefix
+        return UpstreamConfig(
+            base_url=self.base_url,
+            env_prefix=prefix,
+            timeout=float(os.getenv(f"{prefix}_TIMEOUT_SECONDS", self.timeout)),
+            max_connections=int(os.getenv(f"{prefix}_MAX_CONNECTIONS", self.max_connections)),
+            max_keepalive=int(os.getenv(f"{prefix}_MAX_KEEPALIVE", self.max_keepalive)),
+            keepalive_expiry=float(os.getenv(f"{prefix}_KEEPALIVE_EXPIRY", self.keepalive_expiry)),
+            http2=os.getenv(f"{prefix}_HTTP2", str(self.http2)).lower() == "true" and HTTP2_AVAILABLE
+        )
+
+@dataclass
+class UpstreamStats:
+    """
+    Request, error and latency counters for one upstream host
+    """
+    requests: int = 0
+    errors: int = 0
+    transport_errors: int = 0
+    status_counts: Dict[int, int] = field(default_factory=dict)
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLE_SIZE))
+
+    def record(self, latency: float, status_code: Optional[int]):
+        self.requests += 1
+        self.latencies.append(latency)
+        if status_code is None:
+            self.transport_errors += 1
+            self.errors += 1
+            return
+        self.status_counts[status_code] = self.status_counts.get(status_code, 0) + 1
+        if status_code >= 400:
+            self.errors += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 1)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "transport_errors": self.transport_errors,
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "status_counts": dict(sorted(self.status_counts.items())),
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "max": percentile(1.0)}
+        }
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps a transport and records time-to-response-headers and outcome per request
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, stats: UpstreamStats):
+        self.transport = transport
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception:
+            self.stats.record(time.perf_counter() - started, None)
+            raise
+        self.stats.record(time.perf_counter() - started, response.status_code)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+class HTTPClientRegistry:
+    """
+    Application-wide httpx clients keyed by upstream name
+
+    Clients keep connections alive between calls so DNS, TCP and TLS setup is
+    paid once per host rather than once per request. ``start`` opens every
+    client at application startup and ``aclose`` closes them at shutdown;
+    ``get`` also opens a client lazily, and reopens it when called from a
+    different event loop (scripts and tests that use ``asyncio.run``).
+    """
+
+    def __init__(self):
+        self.configs: Dict[str, UpstreamConfig] = {}
+        self.stats: Dict[str, UpstreamStats] = {}
+        self._transports: Dict[str, httpx.AsyncBaseTransport] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._client_loops: Dict[str, asyncio.AbstractEventLoop] = {}
+
+    def register(self, name: str, config: UpstreamConfig, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Add or replace an upstream; ``transport`` lets tests substitute httpx.MockTransport
+        """
+        self.configs[name] = config.resolved()
+        self.stats.setdefault(name, UpstreamStats())
+        if transport is not None:
+            self._transports[name] = transport
+        else:
+            self._transports.pop(name, None)
+        self._clients.pop(name, None)
+        self._client_loops.pop(name, None)
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(name)
+        if client is None or client.is_closed or self._client_loops.get(name) is not loop:
+            client = self._open(name)
+            self._clients[name] = client
+            self._client_loops[name] = loop
+        return client
+
+    def _open(self, name: str) -> httpx.AsyncClient:
+        config = self.configs[name]
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive,
+            keepalive_expiry=config.keepalive_expiry
+        )
+        transport = self._transports.get(name) or httpx.AsyncHTTPTransport(http2=config.http2, limits=limits)
+        return httpx.AsyncClient(
+            base_url=config.base_url,
+            timeout=httpx.Timeout(config.timeout),
+            transport=InstrumentedTransport(transport, self.stats[name])
+        )
+
+    async def start(self):
+        for name in self.configs:
+            self.get(name)
+        print(f"✅ Opened HTTP clients for {len(self.configs)} upstreams")
+
+    async def aclose(self):
+        # Clients opened from an event loop that has since closed cannot be closed cleanly; they are dropped
+        clients = [client for name, client in self._clients.items()
+                   if not client.is_closed and not self._client_loops[name].is_closed()]
+        self._clients.clear()
+        self._client_loops.clear()
+        for client in clients:
+            await client.aclose()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                **self.stats[name].as_dict(),
+                "base_url": config.base_url,
+                "http2": config.http2,
+                "timeout_seconds": config.timeout,
+                "max_connections": config.max_connections,
+                "open": name in self._clients and not self._clients[name].is_closed
+            }
+            for name, config in self.configs.items()
+        }
+
+upstream_clients = HTTPClientRegistry()
+
+# Gemini keeps its original GEMINI_* pool settings; Google hosts speak HTTP/2
+upstream_clients.register("gemini", UpstreamConfig(GEMINI_API_BASE_URL, "GEMINI", timeout=30.0, max_connections=20,
+                                                   max_keepalive=10, http2=True))
+upstream_clients.register("spotify", UpstreamConfig(SPOTIFY_API_BASE_URL, "SPOTIFY_HTTP", timeout=10.0, max_connections=20))
+upstream_clients.register("spotify_accounts", UpstreamConfig(SPOTIFY_ACCOUNTS_BASE_URL, "SPOTIFY_ACCOUNTS_HTTP", timeout=10.0,
+                                                             max_connections=2, max_keepalive=1))
+upstream_clients.register("places", UpstreamConfig(GOOGLE_PLACES_BASE_URL, "PLACES_HTTP", timeout=10.0, max_connections=20,
+                                                   http2=True))
+upstream_clients.register("youtube", UpstreamConfig(YOUTUBE_API_BASE_URL, "YOUTUBE_HTTP", timeout=5.0, max_connections=10,
+                                                    http2=True))
+upstream_clients.register("lastfm", UpstreamConfig(LASTFM_API_BASE_URL, "LASTFM_HTTP", timeout=5.0, max_connections=10))
+upstream_clients.register("musicbrainz", UpstreamConfig(MUSICBRAINZ_API_BASE_URL, "MUSICBRAINZ_HTTP", timeout=5.0,
+                                                        max_connections=2, max_keepalive=2))
+upstream_clients.register("listenbrainz", UpstreamConfig(LISTENBRAINZ_API_BASE_URL, "LISTENBRAINZ_HTTP", timeout=5.0,
+                                                         max_connections=10))
+
+def get_http_client_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-upstream latency and error metrics
+    """
+    return upstream_clients.get_stats()
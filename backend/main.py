@@ -8,10 +8,9 @@ from dotenv import load_dotenv
 import openai
 import requests
 import httpx
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
+import copy
 import json
 from pathlib import Path
 import random
@@ -52,6 +51,17 @@ from fastapi import UploadFile, File, Form
 import tempfile
 import shutil
 from fastapi import Request
+from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
+from cache_service import TieredCache, get_cache_stats, get_disk_cache
+from single_flight import single_flight, get_single_flight_stats
+from http_clients import upstream_clients, get_http_client_stats
+from upstreams import YOUTUBE_API_BASE_URL
+from spotify_service import SpotifyClient
+from artist_cache import ArtistMetadataCache
+from genre_store import GenreStore
+from stage_graph import Stage, run_stages, get_stage_stats
+from mbid_store import MBIDStore
 
 def convert_numpy_types(obj):
     """Convert numpy types to JSON-serializable Python types"""
@@ -100,7 +110,8 @@ except ImportError as e:
 
 # Import Gemini analysis service
 try:
-    from gemini_analysis_service import call_gemini_api
+    from gemini_analysis_service import gemini_service, call_gemini_api, generate_content, GeminiBatcher, GeminiAPIError, GeminiUnavailableError, get_gemini_resilience_stats
+    from gemini_schemas import ArtistGenres, ArtistProfileEntry
     GEMINI_AVAILABLE = True
     print("✅ Gemini analysis service imported successfully")
 except ImportError as e:
@@ -118,7 +129,6 @@ openai_api_key = os.getenv("OPENAI_API_KEY", "dummy_key")
 
 # Replace OpenAI client initialization with Gemini
 gemini_api_key = os.getenv("GEMINI_API_KEY", "dummy_key")
-gemini_base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
 
 # News API
 news_api_key = os.getenv("NEWS_API_KEY", "dummy_key")
@@ -134,18 +144,13 @@ if not spotify_client_id or spotify_client_id == "dummy_key":
     print("❌ Warning: Spotify credentials not found. Using mock data.")
     print(f"   Client ID: {'Present' if spotify_client_id else 'Missing'}")
     print(f"   Client Secret: {'Present' if spotify_client_secret else 'Missing'}")
-    sp = None
+    spotify_client = None
+    artist_metadata = None
 else:
-    try:
-        print("✅ Initializing Spotify client with credentials...")
-        sp = spotipy.Spotify(auth_manager=SpotifyClientCredentials(
-            client_id=spotify_client_id,
-            client_secret=spotify_client_secret
-        ))
-        print("✅ Spotify client initialized successfully!")
-    except Exception as e:
-        print(f"❌ Error initializing Spotify client: {e}")
-        sp = None
+    # Async client; the access token is fetched on the first request
+    spotify_client = SpotifyClient(spotify_client_id, spotify_client_secret)
+    artist_metadata = ArtistMetadataCache(spotify_client)
+    print("✅ Spotify client initialized successfully!")
 
 # Last.fm
 lastfm_api_key = os.getenv("LASTFM_API_KEY", "dummy_key")
@@ -156,7 +161,8 @@ youtube_api_key = os.getenv("YOUTUBE_API_KEY", "dummy_key")
 # Initialize YouTube client
 try:
     if youtube_api_key and youtube_api_key != "dummy_key":
-        youtube = googleapiclient.discovery.build("youtube", "v3", developerKey=youtube_api_key)
+        youtube = googleapiclient.discovery.build("youtube", "v3", developerKey=youtube_api_key,
+                                                  client_options={"api_endpoint": YOUTUBE_API_BASE_URL})
         print("✅ YouTube client initialized successfully!")
     else:
         youtube = None
@@ -205,10 +211,32 @@ JWT_EXPIRATION_TIME = timedelta(days=7)
 # Security
 security = HTTPBearer(auto_error=False)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifecycle: open shared HTTP clients at startup and close them on shutdown"""
+    await upstream_clients.start()
+    preloaded = genre_store.preload()
+    if preloaded:
+        print(f"✅ Preloaded {preloaded} artist genre records")
+    # Popular cities were persisted by earlier runs; pull them into memory before the first request
+    warmed = venue_search_cache.load_from_disk()
+    if warmed:
+        print(f"✅ Warmed venue search cache with {warmed} entries")
+    mbids = mbid_store.preload()
+    if mbids:
+        print(f"✅ Preloaded {mbids} MusicBrainz artist ids")
+    yield
+    await upstream_clients.aclose()
+    # Commit cache writes still buffered for the disk tier
+    disk_cache = get_disk_cache()
+    if disk_cache is not None:
+        await asyncio.to_thread(disk_cache.flush)
+
 app = FastAPI(
     title="MusiStash Artist Analysis API",
     version="1.0.0",
-    description="API for analyzing artists using Spotify, Billboard, and Last.fm data with AI insights."
+    description="API for analyzing artists using Spotify, Billboard, and Last.fm data with AI insights.",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -341,18 +369,54 @@ def get_user_by_email(email: str) -> Optional[User]:
         return User(**user_data)
     return None
 
+# --- Gemini Prompt Templates ---
+# Multi-artist prompts: Gemini returns a JSON array with one schema-validated entry per artist
+GENRE_BATCH_PROMPT_TEMPLATE = """What are the main music genres for each of these artists: {artist_names}
+            Provide 2-4 specific genres per artist. Examples: ["pop", "r&b"], ["hip-hop", "rap"], ["alternative rock", "indie"].
+            Be specific and accurate. Return one entry per artist with "artist" set to the name exactly as given."""
+
+ARTIST_PROFILE_BATCH_PROMPT_TEMPLATE = """
+    Get real-time comprehensive data for each of these artists: {artist_names}.
+    Return one entry per artist with "artist" set to the name exactly as given.
+
+    Important:
+    - Use current 2024 data when available
+    - For net worth, provide the number in millions (e.g., if worth $50M, put 50)
+    - For Instagram followers, provide exact number (e.g., 50000000 for 50M)
+    - For monthly streams, provide realistic current numbers (typically 10-15% of Spotify followers)
+    - Include major Grammy wins, Billboard achievements, etc. in awards
+    - Keep arrays concise (max 3-4 items each)
+    """
+
+if GEMINI_AVAILABLE:
+    genre_batcher = GeminiBatcher("genres", GENRE_BATCH_PROMPT_TEMPLATE, ArtistGenres, tokens_per_artist=40)
+    artist_profile_batcher = GeminiBatcher("artist_profile", ARTIST_PROFILE_BATCH_PROMPT_TEMPLATE, ArtistProfileEntry, tokens_per_artist=250)
+
 # --- Helper Functions ---
-async def get_genres_from_multiple_sources(artist_name: str, spotify_genres: list = None) -> list:
-    """Get genres from multiple sources with fallbacks"""
+# Per-stage timeouts for the artist enrichment graphs; a stage that overruns falls back to its default
+ENRICHMENT_STAGE_TIMEOUTS = {
+    "spotify": float(os.getenv("SPOTIFY_STAGE_TIMEOUT_SECONDS", "8")),
+    "lastfm": float(os.getenv("LASTFM_STAGE_TIMEOUT_SECONDS", "5")),
+    "genres": float(os.getenv("GENRES_STAGE_TIMEOUT_SECONDS", "20")),
+    "youtube": float(os.getenv("YOUTUBE_STAGE_TIMEOUT_SECONDS", "6")),
+    "gemini_profile": float(os.getenv("GEMINI_PROFILE_STAGE_TIMEOUT_SECONDS", "25"))
+}
+
+async def resolve_genres_from_sources(artist_name: str, spotify_genres: list,
+                                      lastfm_data: Any = None, lastfm_prefetched: bool = False) -> Tuple[List[str], List[str]]:
+    """Resolve genres from Spotify, Last.fm and Gemini with fallbacks; returns (genres, sources used)"""
     all_genres = set()
+    sources = []
     
     # Use Spotify genres if available
     if spotify_genres:
         all_genres.update([g.lower().strip() for g in spotify_genres if isinstance(g, str) and g])
+        sources.append("spotify")
     
-    # Try LastFM for additional genres
+    # Try LastFM for additional genres, unless the caller already fetched them alongside Spotify
     try:
-        lastfm_data = await get_lastfm_artist(artist_name)
+        if not lastfm_prefetched:
+            lastfm_data = await get_lastfm_artist(artist_name)
         if lastfm_data and lastfm_data.get('tags'):
             tags = lastfm_data['tags']
             # Handle both list and dict formats from LastFM API
@@ -361,33 +425,24 @@ async def get_genres_from_multiple_sources(artist_name: str, spotify_genres: lis
             if isinstance(tags, list):
                 lastfm_genres = [tag['name'].lower().strip() for tag in tags[:5] if isinstance(tag, dict) and isinstance(tag.get('name'), str)]
                 all_genres.update(lastfm_genres)
+                if lastfm_genres:
+                    sources.append("lastfm")
     except Exception as e:
         print(f"LastFM genre fetch failed for {artist_name}: {e}")
     
     # If still no genres, use Gemini AI as fallback
-    if not all_genres:
+    if not all_genres and GEMINI_AVAILABLE:
         try:
-            prompt = f"""What are the main music genres for the artist "{artist_name}"? 
-            Provide 2-4 specific genres as a JSON array. Examples: ["pop", "r&b"], ["hip-hop", "rap"], ["alternative rock", "indie"].
-            Be specific and accurate. Return ONLY the JSON array, no other text."""
-            
-            response = call_gemini_api(prompt, max_tokens=100)
-            if response is not None:
-                response = response.strip()
-                if response.startswith('```json'):
-                    response = response[7:]
-                if response.endswith('```'):
-                    response = response[:-3]
-                response = response.strip()
-                
-                genres_from_ai = json.loads(response)
-                if isinstance(genres_from_ai, list):
-                    all_genres.update([g.lower().strip() for g in genres_from_ai if isinstance(g, str) and g])
+            genre_entry = await genre_batcher.submit(artist_name)
+            if genre_entry:
+                all_genres.update([g.lower().strip() for g in genre_entry["genres"] if g])
+                sources.append("gemini")
         except Exception as e:
             print(f"Gemini genre fetch failed for {artist_name}: {e}")
     
     # Absolute fallback based on known artist patterns
     if not all_genres:
+        sources.append("fallback")
         artist_lower = artist_name.lower()
         if any(name in artist_lower for name in ['weeknd', 'weekend']):
             all_genres.update(['r&b', 'pop', 'alternative r&b'])
@@ -403,11 +458,18 @@ async def get_genres_from_multiple_sources(artist_name: str, spotify_genres: lis
             # Generic fallback
             all_genres.update(['pop', 'contemporary'])
     
-    return list(all_genres)[:6]  # Limit to 6 genres max
+    return list(all_genres)[:6], sources  # Limit to 6 genres max
+
+# Resolved genres are stored persistently and served from memory; see genre_store.py
+genre_store = GenreStore(resolve_genres_from_sources)
+
+async def get_genres_from_multiple_sources(artist_name: str, spotify_genres: list = None) -> list:
+    """Get genres from multiple sources with fallbacks, resolved once per artist through the genre store"""
+    return await genre_store.get(artist_name, spotify_genres)
 
 async def get_artist_info(artist_name: str) -> Optional[Artist]:
     """Search for an artist on Spotify and return their details with enhanced genre data."""
-    if sp is None:
+    if spotify_client is None:
         # Return mock data if Spotify is not available, but with better genre data
         enhanced_genres = await get_genres_from_multiple_sources(artist_name, [])
         return Artist(
@@ -420,15 +482,34 @@ async def get_artist_info(artist_name: str) -> Optional[Artist]:
         )
     
     try:
-        results = sp.search(q=f'artist:{artist_name}', type='artist', limit=1)
-        if not results['artists']['items']:
+        # Last.fm tags don't depend on the Spotify match, so they are fetched alongside it
+        # unless the genre store already has this artist. Gemini is only asked for genres
+        # when neither source has any, so that step stays behind both of them.
+        prefetch_lastfm = not await genre_store.is_stored(artist_name)
+        # Default when the Last.fm stage is skipped, fails or times out; the resolver then fetches it itself
+        lastfm_missing = object()
+        
+        async def resolve_genres(spotify, lastfm):
+            if not spotify:
+                return None
+            if lastfm is lastfm_missing:
+                return await genre_store.get(artist_name, spotify['genres'])
+            return await genre_store.get(artist_name, spotify['genres'], lastfm_data=lastfm, lastfm_prefetched=True)
+        
+        results, _ = await run_stages([
+            Stage("spotify", lambda: artist_metadata.search_artist(artist_name),
+                  timeout=ENRICHMENT_STAGE_TIMEOUTS["spotify"]),
+            Stage("lastfm", lambda: get_lastfm_artist(artist_name),
+                  timeout=ENRICHMENT_STAGE_TIMEOUTS["lastfm"], default=lastfm_missing, enabled=prefetch_lastfm),
+            Stage("genres", resolve_genres, timeout=ENRICHMENT_STAGE_TIMEOUTS["genres"],
+                  depends_on=["spotify", "lastfm"])
+        ], label="artist_info")
+        
+        artist_data = results["spotify"]
+        if not artist_data:
             return None
         
-        artist_data = results['artists']['items'][0]
-        spotify_genres = artist_data['genres']
-        
-        # Always try to enhance genres from multiple sources
-        enhanced_genres = await get_genres_from_multiple_sources(artist_name, spotify_genres)
+        enhanced_genres = results["genres"] or artist_data['genres']
         
         print(f"Enhanced genres for {artist_name}: {enhanced_genres}")
         
@@ -445,7 +526,7 @@ async def get_artist_info(artist_name: str) -> Optional[Artist]:
         return None
 
 async def get_top_track_info(artist_id: str) -> Optional[TopTrack]:
-    if sp is None:
+    if spotify_client is None:
         return TopTrack(
             id="mock_track",
             name="Top Hit",
@@ -456,10 +537,10 @@ async def get_top_track_info(artist_id: str) -> Optional[TopTrack]:
         )
     
     try:
-        top_tracks = sp.artist_top_tracks(artist_id)
-        if not top_tracks['tracks']:
+        top_tracks = await artist_metadata.artist_top_tracks(artist_id)
+        if not top_tracks:
             return None
-        track = top_tracks['tracks'][0]
+        track = top_tracks[0]
         return TopTrack(
             id=track['id'],
             name=track['name'],
@@ -473,60 +554,26 @@ async def get_top_track_info(artist_id: str) -> Optional[TopTrack]:
         return None
 
 # Add enhanced artist tier calculation with real API integration
+@single_flight("enhanced_artist_data", normalize=("artist_name",))
 async def get_enhanced_artist_data_with_gemini(artist_name: str) -> dict:
     """Get comprehensive artist data using real APIs and Gemini for missing data"""
     
-    # Get real YouTube data first
-    youtube_data = await get_youtube_channel_data(artist_name)
-    youtube_subscribers = youtube_data.get('subscriber_count', 0) if not youtube_data.get('fallback_data', True) else 0
-    
-    # Get real Spotify monthly listeners (estimate from followers)
-    # Spotify doesn't provide monthly listeners directly, so we estimate
-    # Typically monthly listeners are 10-15% of followers for active artists
-    # This will be calculated in the tier calculation function using Spotify followers
+    # YouTube and Gemini don't depend on each other, so both are fetched concurrently.
+    # Spotify monthly listeners are estimated from followers in the tier calculation,
+    # since Spotify doesn't provide them directly.
+    results, _ = await run_stages([
+        Stage("youtube", lambda: get_youtube_channel_data(artist_name),
+              timeout=ENRICHMENT_STAGE_TIMEOUTS["youtube"], default={"subscriber_count": 0, "fallback_data": True}),
+        # Gemini covers data that requires research (net worth, Instagram, achievements)
+        Stage("gemini_profile", lambda: artist_profile_batcher.submit(artist_name),
+              timeout=ENRICHMENT_STAGE_TIMEOUTS["gemini_profile"], enabled=GEMINI_AVAILABLE)
+    ], label="enhanced_artist_data")
     
-    # Use Gemini for data that requires research (net worth, Instagram, achievements)
-    prompt = f"""
-    Get real-time comprehensive data for the artist "{artist_name}". Return ONLY a valid JSON object with this exact structure:
-
-    {{
-        "instagram_followers": 0,
-        "net_worth_millions": 0,
-        "career_achievements": ["achievement1", "achievement2"],
-        "major_awards": ["award1", "award2"],
-        "monthly_streams_millions": 0,
-        "top_song_streams_billions": 0.0
-    }}
-
-    Important:
-    - Use current 2024 data when available
-    - For net worth, provide the number in millions (e.g., if worth $50M, put 50)
-    - For Instagram followers, provide exact number (e.g., 50000000 for 50M)
-    - For monthly streams, provide realistic current numbers (typically 10-15% of Spotify followers)
-    - Include major Grammy wins, Billboard achievements, etc. in awards
-    - Keep arrays concise (max 3-4 items each)
-    - Return ONLY the JSON, no other text
-    """
+    youtube_data = results["youtube"]
+    youtube_subscribers = youtube_data.get('subscriber_count', 0) if not youtube_data.get('fallback_data', True) else 0
     
-    try:
-        response = call_gemini_api(prompt, max_tokens=400)
-        # Clean the response to extract just the JSON
-        if response is not None:
-            response = response.strip()
-        if response.startswith('```json'):
-            response = response[7:]
-        if response.endswith('```'):
-            response = response[:-3]
-        response = response.strip()
-        
-        data = json.loads(response)
-        
-        # Combine real YouTube data with Gemini data
-        data['youtube_subscribers'] = youtube_subscribers
-        
-        return data
-    except Exception as e:
-        print(f"Error getting enhanced artist data for {artist_name}: {e}")
+    if results["gemini_profile"] is None:
+        print(f"No Gemini profile data for {artist_name}, using defaults")
         # Return default data structure with real YouTube data
         return {
             "instagram_followers": 0,
@@ -535,9 +582,17 @@ async def get_enhanced_artist_data_with_gemini(artist_name: str) -> dict:
             "career_achievements": [],
             "major_awards": [],
             "monthly_streams_millions": 0,
-            "top_song_streams_billions": 0.0
+            "top_song_streams_billions": 0.0,
+            "fallback_data": True  # Gemini data missing; tiers computed from this are retried soon
         }
+    
+    # Combine real YouTube data with Gemini data
+    data = dict(results["gemini_profile"])
+    data['youtube_subscribers'] = youtube_subscribers
+    
+    return data
 
+@single_flight("enhanced_artist_tier", normalize=("artist_name",))
 async def calculate_enhanced_artist_tier(artist_name: str, spotify_followers: int, spotify_popularity: int) -> dict:
     """
     Enhanced artist tier calculation using Gemini AI to get comprehensive data
@@ -685,13 +740,59 @@ def calculate_artist_tier(followers: int, popularity: int) -> dict:
         "popularity": popularity
     }
 
+# Tier results are stored per artist with the inputs they were computed from. Bump the
+# version whenever calculate_enhanced_artist_tier's scoring changes to invalidate them.
+TIER_ALGORITHM_VERSION = 1
+TIER_CACHE_TTL = float(os.getenv("TIER_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+TIER_FALLBACK_TTL = float(os.getenv("TIER_FALLBACK_TTL_SECONDS", "3600"))
+TIER_FOLLOWER_CHANGE_THRESHOLD = float(os.getenv("TIER_FOLLOWER_CHANGE_THRESHOLD", "0.05"))  # relative change
+TIER_POPULARITY_CHANGE_THRESHOLD = int(os.getenv("TIER_POPULARITY_CHANGE_THRESHOLD", "5"))  # popularity points
+TIER_PRECOMPUTE_CONCURRENCY = int(os.getenv("TIER_PRECOMPUTE_CONCURRENCY", "4"))
+
+artist_tier_cache = TieredCache("artist_tiers", max_entries=10000, default_ttl=TIER_CACHE_TTL)
+
+def tier_inputs_changed(inputs: dict, spotify_followers: int, spotify_popularity: int) -> bool:
+    """True when followers or popularity moved far enough from the stored inputs to change the tier"""
+    stored_followers = inputs.get("spotify_followers", 0)
+    follower_change = abs(spotify_followers - stored_followers) / max(stored_followers, 1)
+    popularity_change = abs(spotify_popularity - inputs.get("spotify_popularity", 0))
+    return follower_change > TIER_FOLLOWER_CHANGE_THRESHOLD or popularity_change >= TIER_POPULARITY_CHANGE_THRESHOLD
+
+def tier_cache_ttl(tier_info: dict) -> float:
+    """
+    How long a computed tier is stored. Tiers from the basic fallback (no composite
+    score) or from Gemini-less defaults are kept briefly so the full tier is retried.
+    """
+    if "composite_score" not in tier_info or tier_info.get("enhanced_data", {}).get("fallback_data"):
+        return TIER_FALLBACK_TTL
+    return TIER_CACHE_TTL
+
+async def get_artist_tier(artist_name: str, spotify_followers: int, spotify_popularity: int, force: bool = False) -> dict:
+    """Stored enhanced tier for an artist, recomputed on TTL expiry, a version bump or a large input change"""
+    cache_key = " ".join(artist_name.lower().split())
+    entry = await artist_tier_cache.aget_entry(cache_key)
+    if (not force and entry is not None and entry.is_fresh and not entry.negative
+            and entry.value["version"] == TIER_ALGORITHM_VERSION
+            and not tier_inputs_changed(entry.value["inputs"], spotify_followers, spotify_popularity)):
+        return copy.deepcopy(entry.value["result"])
+    
+    tier_info = await calculate_enhanced_artist_tier(artist_name, spotify_followers, spotify_popularity)
+    record = {
+        "result": tier_info,
+        "inputs": {"spotify_followers": spotify_followers, "spotify_popularity": spotify_popularity},
+        "version": TIER_ALGORITHM_VERSION,
+        "computed_at": datetime.utcnow().isoformat()
+    }
+    artist_tier_cache.set(cache_key, record, tier_cache_ttl(tier_info))
+    return tier_info
+
 async def map_spotify_artist_to_frontend(artist):
     """Map Spotify artist data to frontend format with enhanced tier information"""
     if not artist:
         return None
     
     # Calculate enhanced artist tier using AI
-    tier_info = await calculate_enhanced_artist_tier(artist.name, artist.followers, artist.popularity)
+    tier_info = await get_artist_tier(artist.name, artist.followers, artist.popularity)
     
     return {
         "id": artist.id,
@@ -706,46 +807,76 @@ async def map_spotify_artist_to_frontend(artist):
     }
 
 # Helper to get Last.fm artist info with timeout
+@single_flight("lastfm_artist", normalize=("artist_name",))
 async def get_lastfm_artist(artist_name: str):
     if not lastfm_api_key:
         # Instead of random data, return None so we can use Spotify data
         print("Last.fm API key not available, will use Spotify data instead")
         return None
     
-    url = f"https://ws.audioscrobbler.com/2.0/?method=artist.getinfo&artist={artist_name}&api_key={lastfm_api_key}&format=json"
+    params = {"method": "artist.getinfo", "artist": artist_name, "api_key": lastfm_api_key, "format": "json"}
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(url)
-            if resp.status_code == 200:
-                return resp.json().get('artist', None)
-            return None
+        resp = await upstream_clients.get("lastfm").get("/2.0/", params=params)
+        if resp.status_code == 200:
+            return resp.json().get('artist', None)
+        return None
     except Exception as e:
         print(f'Error fetching Last.fm data: {e}')
         return None
 
+# Helper to get YouTube channel statistics with timeout
+async def get_youtube_channel_data(artist_name: str) -> dict:
+    """Find the artist's YouTube channel and return its public statistics"""
+    fallback = {"subscriber_count": 0, "view_count": 0, "video_count": 0, "fallback_data": True}
+    if not youtube_api_key or youtube_api_key == "dummy_key":
+        return fallback
+    
+    try:
+        client = upstream_clients.get("youtube")
+        search_resp = await client.get(
+            "/youtube/v3/search",
+            params={"part": "snippet", "type": "channel", "q": artist_name, "maxResults": 1, "key": youtube_api_key}
+        )
+        if search_resp.status_code != 200 or not search_resp.json().get("items"):
+            return fallback
+        
+        channel_id = search_resp.json()["items"][0]["snippet"]["channelId"]
+        channel_resp = await client.get(
+            "/youtube/v3/channels",
+            params={"part": "statistics", "id": channel_id, "key": youtube_api_key}
+        )
+        if channel_resp.status_code != 200 or not channel_resp.json().get("items"):
+            return fallback
+        
+        stats = channel_resp.json()["items"][0].get("statistics", {})
+        return {
+            "channel_id": channel_id,
+            "subscriber_count": int(stats.get("subscriberCount", 0)),
+            "view_count": int(stats.get("viewCount", 0)),
+            "video_count": int(stats.get("videoCount", 0)),
+            "fallback_data": False
+        }
+    except Exception as e:
+        print(f'Error fetching YouTube data: {e}')
+        return fallback
+
+# Artist MBIDs are resolved ahead of time (POST /api/mbids/resolve) and kept on disk; see mbid_store.py
+mbid_store = MBIDStore()
+
 # Helper to get ListenBrainz artist listens with timeout
 async def get_listenbrainz_artist(artist_name: str, user_token: str):
     try:
-        # Get MBID from MusicBrainz with timeout
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            mb_url = f"https://musicbrainz.org/ws/2/artist/?query={artist_name}&fmt=json"
-            mb_resp = await client.get(mb_url)
-            if mb_resp.status_code != 200:
-                return None
-            
-            mb_data = mb_resp.json()
-            if not mb_data.get('artists'):
-                return None
-            
-            mbid = mb_data['artists'][0]['id']
-            
-            # Get ListenBrainz data
-            lb_url = f"https://api.listenbrainz.org/1/artist/{mbid}/listens"
-            headers = {"Authorization": f"Token {user_token}"}
-            lb_resp = await client.get(lb_url, headers=headers)
-            if lb_resp.status_code == 200:
-                return lb_resp.json()
+        # MBID from the store; MusicBrainz itself is only queried in the background on a miss
+        mbid = await mbid_store.lookup(artist_name)
+        if not mbid:
             return None
+        
+        # Get ListenBrainz data
+        headers = {"Authorization": f"Token {user_token}"}
+        lb_resp = await upstream_clients.get("listenbrainz").get(f"/1/artist/{mbid}/listens", headers=headers)
+        if lb_resp.status_code == 200:
+            return lb_resp.json()
+        return None
     except Exception as e:
         print(f'Error fetching ListenBrainz data: {e}')
         return None
@@ -1128,6 +1259,122 @@ def get_resonance_recommendation(score: float, success_factors: list, risk_facto
 
 # === AGENTIC MANAGER ENDPOINTS ===
 
+# --- Uploaded track analysis sections (shared by the blocking and streaming upload endpoints) ---
+def track_basic_info(filename: str, features: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "filename": filename,
+        "duration": features.get("duration", 0),
+        "bpm": features.get("bpm", 0),
+        "key": features.get("key", "Unknown"),
+        "mode": features.get("mode", "major"),
+        "energy": features.get("energy", 0),
+        "loudness": features.get("loudness", 0)
+    }
+
+def track_commercial_analysis(features: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "commercial_score": features.get("commercial_score", 0),
+        "emotional_category": features.get("emotional_category", "neutral"),
+        "valence": features.get("valence", 0),
+        "arousal": features.get("arousal", 0)
+    }
+
+def track_similarity_analysis(similarity_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "style_consistency": similarity_data.get("style_consistency", 0.5),
+        "tracks_compared": similarity_data.get("total_tracks_compared", 0),
+        "most_similar": similarity_data.get("most_similar_track", None)
+    }
+
+def track_resonance_prediction(resonance_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "score": resonance_data.get("resonance_score", 50),
+        "confidence": resonance_data.get("confidence", 0.5),
+        "recommendation": resonance_data.get("recommendation", ""),
+        "success_factors": resonance_data.get("success_factors", []),
+        "risk_factors": resonance_data.get("risk_factors", [])
+    }
+
+DEFAULT_SIMILARITY_DATA = {
+    "similarity_scores": [],
+    "avg_similarity": 0.0,
+    "most_similar_track": None,
+    "style_consistency": 1.0,
+    "total_tracks_compared": 0
+}
+
+DEFAULT_RESONANCE_DATA = {
+    "resonance_score": 50.0,
+    "confidence": 0.5,
+    "recommendation": "Analysis completed with limited data",
+    "success_factors": [],
+    "risk_factors": []
+}
+
+def build_uploaded_track_row(artist_id: str, filename: str, features: Dict[str, Any],
+                             similarity_data: Dict[str, Any], resonance_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Row for the uploaded_tracks table (not saved until the user clicks 'Save Analysis')"""
+    return {
+        "artist_id": artist_id,
+        "file_url": f"uploads/{filename}",
+        "onset_count": features.get("onset_count"),
+        "spectral_contrast": features.get("spectral_contrast"),
+        "pyaudio_energy_mean": features.get("pyaudio_energy_mean"),
+        "pyaudio_energy_std": features.get("pyaudio_energy_std"),
+        "music21_analysis": features.get("music21_analysis"),
+        "analysis_quality": features.get("analysis_quality"),
+        "libraries_used": features.get("libraries_used"),
+        # PyAudioAnalysis fields (replacing Essentia)
+        "pyaudio_rhythm_clarity": features.get("pyaudio_rhythm_clarity"),
+        "pyaudio_bpm": features.get("pyaudio_bpm"),
+        "pyaudio_beats_confidence": features.get("pyaudio_beats_confidence"),
+        "pyaudio_dissonance": features.get("pyaudio_dissonance"),
+        "pyaudio_key": features.get("pyaudio_key"),
+        "pyaudio_scale": features.get("pyaudio_scale"),
+        "pyaudio_spectral_centroid": features.get("pyaudio_spectral_centroid"),
+        "pyaudio_spectral_rolloff": features.get("pyaudio_spectral_rolloff"),
+        "pyaudio_spectral_flux": features.get("pyaudio_spectral_flux"),
+        "pyaudio_spectral_contrast": features.get("pyaudio_spectral_contrast"),
+        "pyaudio_key_confidence": features.get("pyaudio_key_confidence"),
+        # Complete analysis data
+        "complete_analysis_json": {
+            "basic_info": track_basic_info(filename, features),
+            "commercial_analysis": track_commercial_analysis(features),
+            "similarity_analysis": track_similarity_analysis(similarity_data),
+            "resonance_prediction": track_resonance_prediction(resonance_data),
+            "enhanced_features": {
+                "onset_count": features.get("onset_count"),
+                "spectral_contrast": features.get("spectral_contrast"),
+                "pyaudio_energy_mean": features.get("pyaudio_energy_mean"),
+                "pyaudio_energy_std": features.get("pyaudio_energy_std"),
+                "music21_analysis": features.get("music21_analysis"),
+                "analysis_quality": features.get("analysis_quality"),
+                "libraries_used": features.get("libraries_used"),
+                "pyaudio_rhythm_clarity": features.get("pyaudio_rhythm_clarity"),
+                "pyaudio_bpm": features.get("pyaudio_bpm"),
+                "pyaudio_beats_confidence": features.get("pyaudio_beats_confidence"),
+                "pyaudio_dissonance": features.get("pyaudio_dissonance"),
+                "pyaudio_key": features.get("pyaudio_key"),
+                "pyaudio_scale": features.get("pyaudio_scale"),
+                "pyaudio_spectral_centroid": features.get("pyaudio_spectral_centroid"),
+                "pyaudio_spectral_rolloff": features.get("pyaudio_spectral_rolloff"),
+                "pyaudio_spectral_flux": features.get("pyaudio_spectral_flux"),
+                "pyaudio_spectral_contrast": features.get("pyaudio_spectral_contrast"),
+                "pyaudio_key_confidence": features.get("pyaudio_key_confidence"),
+            }
+        },
+        "is_saved": False,  # Not saved until user clicks "Save Analysis"
+        "last_analysis_date": datetime.now().isoformat(),
+        # Store Gemini insights separately for easy access
+        "gemini_insights_json": features.get("gemini_insights", {}),
+        "track_summary": features.get("gemini_insights", {}).get("track_summary", {}),
+        "technical_analysis": features.get("gemini_insights", {}).get("technical_analysis", {}),
+        "artistic_insights": features.get("gemini_insights", {}).get("artistic_insights", {}),
+        "actionable_recommendations": features.get("gemini_insights", {}).get("actionable_recommendations", {}),
+        "similar_artists": features.get("gemini_insights", {}).get("similar_artists", {}),
+        "market_positioning": features.get("gemini_insights", {}).get("market_positioning", {})
+    }
+
 @app.post("/api/agent/upload-track")
 async def upload_track(
     file: UploadFile = File(...), 
@@ -1187,13 +1434,7 @@ async def upload_track(
             except Exception as e:
                 print(f"❌ Similarity calculation failed: {str(e)}")
                 # Continue with default similarity data
-                similarity_data = {
-                    "similarity_scores": [],
-                    "avg_similarity": 0.0,
-                    "most_similar_track": None,
-                    "style_consistency": 1.0,
-                    "total_tracks_compared": 0
-                }
+                similarity_data = dict(DEFAULT_SIMILARITY_DATA)
             
             # Calculate resonance score
             print(f"🎯 Calculating audience resonance score...")
@@ -1203,98 +1444,10 @@ async def upload_track(
             except Exception as e:
                 print(f"❌ Resonance calculation failed: {str(e)}")
                 # Continue with default resonance data
-                resonance_data = {
-                    "resonance_score": 50.0,
-                    "confidence": 0.5,
-                    "recommendation": "Analysis completed with limited data",
-                    "success_factors": [],
-                    "risk_factors": []
-                }
+                resonance_data = dict(DEFAULT_RESONANCE_DATA)
             
             # Store enhanced track data in database (not saved yet - user must click "Save Analysis")
-            track_data = {
-                "artist_id": artist_id,
-                "file_url": f"uploads/{file.filename}",
-                "onset_count": features.get("onset_count"),
-                "spectral_contrast": features.get("spectral_contrast"),
-                "pyaudio_energy_mean": features.get("pyaudio_energy_mean"),
-                "pyaudio_energy_std": features.get("pyaudio_energy_std"),
-                "music21_analysis": features.get("music21_analysis"),
-                "analysis_quality": features.get("analysis_quality"),
-                "libraries_used": features.get("libraries_used"),
-                # PyAudioAnalysis fields (replacing Essentia)
-                "pyaudio_rhythm_clarity": features.get("pyaudio_rhythm_clarity"),
-                "pyaudio_bpm": features.get("pyaudio_bpm"),
-                "pyaudio_beats_confidence": features.get("pyaudio_beats_confidence"),
-                "pyaudio_dissonance": features.get("pyaudio_dissonance"),
-                "pyaudio_key": features.get("pyaudio_key"),
-                "pyaudio_scale": features.get("pyaudio_scale"),
-                "pyaudio_spectral_centroid": features.get("pyaudio_spectral_centroid"),
-                "pyaudio_spectral_rolloff": features.get("pyaudio_spectral_rolloff"),
-                "pyaudio_spectral_flux": features.get("pyaudio_spectral_flux"),
-                "pyaudio_spectral_contrast": features.get("pyaudio_spectral_contrast"),
-                "pyaudio_key_confidence": features.get("pyaudio_key_confidence"),
-                # Complete analysis data
-                "complete_analysis_json": {
-                    "basic_info": {
-                        "filename": file.filename,
-                        "duration": features.get("duration", 0),
-                        "bpm": features.get("bpm", 0),
-                        "key": features.get("key", "Unknown"),
-                        "mode": features.get("mode", "major"),
-                        "energy": features.get("energy", 0),
-                        "loudness": features.get("loudness", 0)
-                    },
-                    "commercial_analysis": {
-                        "commercial_score": features.get("commercial_score", 0),
-                        "emotional_category": features.get("emotional_category", "neutral"),
-                        "valence": features.get("valence", 0),
-                        "arousal": features.get("arousal", 0)
-                    },
-                    "similarity_analysis": {
-                        "style_consistency": similarity_data.get("style_consistency", 0.5),
-                        "tracks_compared": similarity_data.get("total_tracks_compared", 0),
-                        "most_similar": similarity_data.get("most_similar_track", None)
-                    },
-                    "resonance_prediction": {
-                        "score": resonance_data.get("resonance_score", 50),
-                        "confidence": resonance_data.get("confidence", 0.5),
-                        "recommendation": resonance_data.get("recommendation", ""),
-                        "success_factors": resonance_data.get("success_factors", []),
-                        "risk_factors": resonance_data.get("risk_factors", [])
-                    },
-                    "enhanced_features": {
-                        "onset_count": features.get("onset_count"),
-                        "spectral_contrast": features.get("spectral_contrast"),
-                        "pyaudio_energy_mean": features.get("pyaudio_energy_mean"),
-                        "pyaudio_energy_std": features.get("pyaudio_energy_std"),
-                        "music21_analysis": features.get("music21_analysis"),
-                        "analysis_quality": features.get("analysis_quality"),
-                        "libraries_used": features.get("libraries_used"),
-                        "pyaudio_rhythm_clarity": features.get("pyaudio_rhythm_clarity"),
-                        "pyaudio_bpm": features.get("pyaudio_bpm"),
-                        "pyaudio_beats_confidence": features.get("pyaudio_beats_confidence"),
-                        "pyaudio_dissonance": features.get("pyaudio_dissonance"),
-                        "pyaudio_key": features.get("pyaudio_key"),
-                        "pyaudio_scale": features.get("pyaudio_scale"),
-                        "pyaudio_spectral_centroid": features.get("pyaudio_spectral_centroid"),
-                        "pyaudio_spectral_rolloff": features.get("pyaudio_spectral_rolloff"),
-                        "pyaudio_spectral_flux": features.get("pyaudio_spectral_flux"),
-                        "pyaudio_spectral_contrast": features.get("pyaudio_spectral_contrast"),
-                        "pyaudio_key_confidence": features.get("pyaudio_key_confidence"),
-                    }
-                },
-                "is_saved": False,  # Not saved until user clicks "Save Analysis"
-                "last_analysis_date": datetime.now().isoformat(),
-                # Store Gemini insights separately for easy access
-                "gemini_insights_json": features.get("gemini_insights", {}),
-                "track_summary": features.get("gemini_insights", {}).get("track_summary", {}),
-                "technical_analysis": features.get("gemini_insights", {}).get("technical_analysis", {}),
-                "artistic_insights": features.get("gemini_insights", {}).get("artistic_insights", {}),
-                "actionable_recommendations": features.get("gemini_insights", {}).get("actionable_recommendations", {}),
-                "similar_artists": features.get("gemini_insights", {}).get("similar_artists", {}),
-                "market_positioning": features.get("gemini_insights", {}).get("market_positioning", {})
-            }
+            track_data = build_uploaded_track_row(artist_id, file.filename, features, similarity_data, resonance_data)
             
             result = supabase_manager.client.table("uploaded_tracks").insert(track_data).execute()
             
@@ -1395,6 +1548,126 @@ async def upload_track(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing track: {str(e)}")
 
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(convert_numpy_types(data), default=str)}\n\n"
+
+@app.post("/api/agent/upload-track/stream")
+async def upload_track_stream(
+    file: UploadFile = File(...), 
+    artist_id: str = Form(...)
+):
+    """
+    Streaming variant of /api/agent/upload-track (text/event-stream)
+    
+    Sends basic_info, commercial_analysis, similarity_analysis and resonance_prediction
+    events as soon as each is computed, then ai_insights_chunk events while Gemini
+    generates, ai_insights with the parsed result, and complete once the
+    uploaded_tracks row is written.
+    """
+    if not SUPABASE_AVAILABLE:
+        raise HTTPException(status_code=500, detail="Supabase not available.")
+    
+    # Validate before the stream starts so errors are still plain HTTP responses
+    if not file.filename or not any(file.filename.lower().endswith(ext) for ext in ['.mp3', '.wav', '.m4a', '.mpeg', '.mp4']):
+        raise HTTPException(status_code=400, detail="Invalid file type. Only MP3, WAV, and M4A files are supported.")
+    
+    file_content = await file.read()
+    if len(file_content) > 20 * 1024 * 1024:  # 20MB
+        raise HTTPException(status_code=400, detail="File too large. Maximum size is 20MB.")
+    
+    filename = file.filename
+    temp_file_path = f"/tmp/{filename}"
+    try:
+        with open(temp_file_path, "wb") as f:
+            f.write(file_content)
+    except Exception as save_error:
+        raise HTTPException(status_code=500, detail=f"Failed to save uploaded file: {save_error}")
+    
+    async def event_stream():
+        features = None
+        similarity_data = dict(DEFAULT_SIMILARITY_DATA)
+        resonance_data = dict(DEFAULT_RESONANCE_DATA)
+        row_written = False
+        
+        def write_row():
+            nonlocal row_written
+            row_written = True
+            track_data = build_uploaded_track_row(artist_id, filename, features, similarity_data, resonance_data)
+            return supabase_manager.client.table("uploaded_tracks").insert(track_data).execute()
+        
+        try:
+            try:
+                if AUDIO_FACTORY_AVAILABLE:
+                    analyzer = AudioAnalysisFactory.get_analyzer()
+                    features = await analyzer.analyze_audio_comprehensive(temp_file_path, filename, artist_id, include_ai=False)
+                else:
+                    features = await extract_comprehensive_audio_features(temp_file_path, filename)
+                if "error" in features:
+                    raise Exception(features["error"])
+            except Exception as e:
+                features = None
+                yield sse_event("error", {"detail": f"Audio feature extraction failed: {str(e)}"})
+                return
+            
+            artist_profile = features.pop("artist_profile", None)
+            yield sse_event("basic_info", track_basic_info(filename, features))
+            yield sse_event("commercial_analysis", track_commercial_analysis(features))
+            
+            try:
+                similarity_data = await calculate_track_similarity(features, artist_id)
+            except Exception as e:
+                print(f"❌ Similarity calculation failed: {str(e)}")
+            yield sse_event("similarity_analysis", track_similarity_analysis(similarity_data))
+            
+            try:
+                resonance_data = await calculate_resonance_score(features, similarity_data)
+            except Exception as e:
+                print(f"❌ Resonance calculation failed: {str(e)}")
+            yield sse_event("resonance_prediction", track_resonance_prediction(resonance_data))
+            
+            gemini_insights = {}
+            if GEMINI_AVAILABLE:
+                async for kind, payload in gemini_service.stream_audio_analysis(features, artist_profile, filename):
+                    if kind == "chunk":
+                        yield sse_event("ai_insights_chunk", {"text": payload})
+                    else:
+                        gemini_insights = payload
+            features["gemini_insights"] = gemini_insights
+            yield sse_event("ai_insights", gemini_insights)
+            
+            try:
+                result = write_row()
+            except Exception as e:
+                print(f"❌ Failed to save streamed track analysis: {e}")
+                yield sse_event("error", {"detail": f"Failed to save track analysis: {str(e)}"})
+                return
+            if not result.data:
+                yield sse_event("error", {"detail": "Failed to save track analysis."})
+                return
+            yield sse_event("complete", {"status": "success", "message": "Track uploaded and comprehensively analyzed!"})
+        
+        except Exception as e:
+            # Every stream ends with complete or error, so the client never just sees the connection close
+            print(f"❌ Error streaming track analysis: {e}")
+            yield sse_event("error", {"detail": f"Error analyzing track: {str(e)}"})
+        
+        finally:
+            # Client went away mid-stream: still record what was computed
+            if features is not None and not row_written:
+                try:
+                    write_row()
+                except Exception as e:
+                    print(f"❌ Failed to save streamed track analysis: {e}")
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Alternative endpoint with cleaner REST naming
 @app.post("/api/upload-track")
 async def upload_track_analysis(
@@ -1592,41 +1865,33 @@ async def get_venue_recommendations(artist_id: str = Query(...), city: str = Que
     if not api_key:
         raise HTTPException(status_code=500, detail="Google Maps API key not configured.")
     
-    search_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    params = {
-        "query": f"music venue in {search_city}",
-        "key": api_key
-    }
+    results = await search_places_cached(search_city, "", api_key)
     
-    response = requests.get(search_url, params=params)
-    if response.status_code != 200:
-        raise HTTPException(status_code=500, detail="Google Maps API error.")
+    # Fetch every venue already recommended for this artist and city in one query
+    existing = supabase_manager.client.table("venue_recommendations").select("venue_name").eq("artist_id", artist_id).eq("city", search_city).execute()
+    seen_names = {row["venue_name"] for row in (existing.data or [])} if existing else set()
     
-    results = response.json().get("results", [])
     venues = []
-    
     for venue in results:
         venue_name = venue.get("name")
-        address = venue.get("formatted_address")
-        place_id = venue.get("place_id")
-        relevance_score = venue.get("rating", 0)
-        
-        # Check if already exists
-        exists = supabase_manager.client.table("venue_recommendations").select("id").eq("artist_id", artist_id).eq("city", search_city).eq("venue_name", venue_name).execute()
-        if exists and exists.data:
+        if not venue_name or venue_name in seen_names:
             continue
+        seen_names.add(venue_name)
         
-        data = {
+        venues.append({
             "artist_id": artist_id,
             "city": search_city,
             "venue_name": venue_name,
-            "address": address,
-            "relevance_score": relevance_score,
-            "google_place_id": place_id,
-        }
-        
-        supabase_manager.client.table("venue_recommendations").insert(data).execute()
-        venues.append(data)
+            "address": venue.get("formatted_address"),
+            "relevance_score": venue.get("rating", 0),
+            "google_place_id": venue.get("place_id"),
+        })
+    
+    # One bulk write; the unique key (add-venue-recommendations-unique-key.sql) makes concurrent calls safe
+    if venues:
+        supabase_manager.client.table("venue_recommendations").upsert(
+            venues, on_conflict="artist_id,city,venue_name", ignore_duplicates=True
+        ).execute()
     
     return {"status": "success", "venues": venues}
 
@@ -1651,23 +1916,18 @@ async def generate_email_drafts(request: EmailDraftRequest):
     drafts = []
     
     # Use Gemini if available
-    if gemini_api_key and gemini_api_key != "dummy_key":
-        headers = {"Content-Type": "application/json"}
-        data = {
-            "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {"temperature": 0.7, "maxOutputTokens": 800}
-        }
-        
-        response = requests.post(
-            gemini_base_url + f"?key={gemini_api_key}",
-            headers=headers,
-            json=data
-        )
-        
-        if response.status_code != 200:
+    if GEMINI_AVAILABLE and gemini_api_key and gemini_api_key != "dummy_key":
+        try:
+            text = await generate_content(
+                prompt,
+                {"temperature": 0.7, "maxOutputTokens": 800},
+                api_key=gemini_api_key
+            )
+        except GeminiUnavailableError:
+            raise HTTPException(status_code=503, detail="Gemini temporarily unavailable.")
+        except GeminiAPIError:
             raise HTTPException(status_code=500, detail="Gemini API error.")
         
-        text = response.json()["candidates"][0]["content"]["parts"][0]["text"]
         drafts = [d.strip() for d in text.split("\n\n") if d.strip()]
         
     elif openai_api_key and openai_api_key != "dummy_key":
@@ -1893,6 +2153,60 @@ async def get_last_analysis(artist_id: str):
         print(f"Error getting last analysis: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get last analysis: {str(e)}")
 
+# Similar-artist samples: lookups run concurrently, capped so one request cannot flood Spotify
+SIMILAR_ARTISTS_MAX_CONCURRENCY = int(os.getenv("SIMILAR_ARTISTS_MAX_CONCURRENCY", "4"))
+SIMILAR_ARTISTS_DEADLINE_SECONDS = float(os.getenv("SIMILAR_ARTISTS_DEADLINE_SECONDS", "8"))
+
+async def fetch_similar_artist_sample(artist_name: str, semaphore: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+    """Search Spotify for one artist and return its profile with up to 3 top tracks"""
+    async with semaphore:
+        # Search for the artist on Spotify
+        artist = await spotify_client.search_artist(artist_name)
+        
+        if not artist:
+            print(f"⚠️  No Spotify artist found for: {artist_name}")
+            return None
+        
+        artist_id = artist['id']
+        
+        print(f"✅ Found Spotify artist: {artist['name']} (ID: {artist_id})")
+        
+        # Get top tracks for this artist
+        tracks_data = []
+        try:
+            top_tracks = await spotify_client.artist_top_tracks(artist_id, country='US')
+            
+            # Get up to 3 top tracks
+            for track in top_tracks[:3]:
+                track_info = {
+                    "id": track['id'],
+                    "name": track['name'],
+                    "album": track['album']['name'],
+                    "album_art": track['album']['images'][0]['url'] if track['album']['images'] else None,
+                    "preview_url": track.get('preview_url'),
+                    "external_url": track['external_urls']['spotify'],
+                    "duration_ms": track['duration_ms'],
+                    "popularity": track['popularity'],
+                    "explicit": track['explicit']
+                }
+                tracks_data.append(track_info)
+            
+            print(f"✅ Added {len(tracks_data)} tracks for {artist['name']}")
+            
+        except Exception as track_error:
+            # Still add the artist even if we can't get tracks
+            print(f"❌ Error getting tracks for {artist_name}: {track_error}")
+            tracks_data = []
+        
+        return {
+            "name": artist['name'],
+            "spotify_id": artist_id,
+            "image": artist['images'][0]['url'] if artist['images'] else None,
+            "popularity": artist['popularity'],
+            "genres": artist['genres'],
+            "tracks": tracks_data
+        }
+
 @app.get("/api/agent/similar-artists-samples")
 async def get_similar_artists_samples(artist_names: str = Query(...)):
     """Get Spotify samples for similar artists recommended by Gemini"""
@@ -1903,86 +2217,157 @@ async def get_similar_artists_samples(artist_names: str = Query(...)):
         if not artist_list:
             raise HTTPException(status_code=400, detail="No artist names provided")
         
+        artist_list = artist_list[:6]  # Limit to 6 artists to avoid rate limits
         print(f"🎵 Fetching Spotify samples for artists: {artist_list}")
         
-        similar_artists_data = []
-        
-        for artist_name in artist_list[:6]:  # Limit to 6 artists to avoid rate limits
-            try:
-                # Search for the artist on Spotify
-                search_results = sp.search(q=artist_name, type='artist', limit=1)
-                
-                if not search_results['artists']['items']:
-                    print(f"⚠️  No Spotify artist found for: {artist_name}")
-                    continue
-                
-                artist = search_results['artists']['items'][0]
-                artist_id = artist['id']
-                
-                print(f"✅ Found Spotify artist: {artist['name']} (ID: {artist_id})")
-                
-                # Get top tracks for this artist
-                try:
-                    top_tracks = sp.artist_top_tracks(artist_id, country='US')
-                    
-                    # Get up to 3 top tracks
-                    tracks_data = []
-                    for track in top_tracks['tracks'][:3]:
-                        track_info = {
-                            "id": track['id'],
-                            "name": track['name'],
-                            "album": track['album']['name'],
-                            "album_art": track['album']['images'][0]['url'] if track['album']['images'] else None,
-                            "preview_url": track.get('preview_url'),
-                            "external_url": track['external_urls']['spotify'],
-                            "duration_ms": track['duration_ms'],
-                            "popularity": track['popularity'],
-                            "explicit": track['explicit']
-                        }
-                        tracks_data.append(track_info)
-                    
-                    # Get artist image
-                    artist_image = artist['images'][0]['url'] if artist['images'] else None
-                    
-                    similar_artists_data.append({
-                        "name": artist['name'],
-                        "spotify_id": artist_id,
-                        "image": artist_image,
-                        "popularity": artist['popularity'],
-                        "genres": artist['genres'],
-                        "tracks": tracks_data
-                    })
-                    
-                    print(f"✅ Added {len(tracks_data)} tracks for {artist['name']}")
-                    
-                except Exception as track_error:
-                    print(f"❌ Error getting tracks for {artist_name}: {track_error}")
-                    # Still add the artist even if we can't get tracks
-                    similar_artists_data.append({
-                        "name": artist['name'],
-                        "spotify_id": artist_id,
-                        "image": artist['images'][0]['url'] if artist['images'] else None,
-                        "popularity": artist['popularity'],
-                        "genres": artist['genres'],
-                        "tracks": []
-                    })
-                
-            except Exception as artist_error:
-                print(f"❌ Error processing artist {artist_name}: {artist_error}")
-                continue
+        # Resolve all artists concurrently; whatever has finished by the deadline is returned
+        semaphore = asyncio.Semaphore(SIMILAR_ARTISTS_MAX_CONCURRENCY)
+        tasks = [asyncio.create_task(fetch_similar_artist_sample(name, semaphore)) for name in artist_list]
+        done, pending = await asyncio.wait(tasks, timeout=SIMILAR_ARTISTS_DEADLINE_SECONDS)
+        for task in pending:
+            task.cancel()
         
+        similar_artists_data = []
+        failed_artists = []
+        timed_out_artists = []
+        for artist_name, task in zip(artist_list, tasks):
+            if task in pending:
+                timed_out_artists.append(artist_name)
+            elif task.exception() is not None:
+                print(f"❌ Error processing artist {artist_name}: {task.exception()}")
+                failed_artists.append(artist_name)
+            elif task.result() is not None:
+                similar_artists_data.append(task.result())
+        
+        if timed_out_artists:
+            print(f"⏱️  Deadline reached before Spotify returned: {timed_out_artists}")
         print(f"🎯 Successfully fetched data for {len(similar_artists_data)} artists")
         
         return {
             "status": "success",
             "similar_artists": similar_artists_data,
-            "total_artists": len(similar_artists_data)
+            "total_artists": len(similar_artists_data),
+            "partial": bool(failed_artists or timed_out_artists),
+            "failed_artists": failed_artists,
+            "timed_out_artists": timed_out_artists
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error fetching similar artists samples: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch similar artists samples: {str(e)}")
 
+# Place Details lookups for discover_venues run concurrently, each with its own timeout
+PLACE_DETAILS_MAX_CONCURRENCY = int(os.getenv("PLACE_DETAILS_MAX_CONCURRENCY", "5"))
+PLACE_DETAILS_TIMEOUT_SECONDS = float(os.getenv("PLACE_DETAILS_TIMEOUT_SECONDS", "4"))
+VENUE_ENRICHMENT_CHUNK_SIZE = int(os.getenv("VENUE_ENRICHMENT_CHUNK_SIZE", "5"))
+
+# Venue data rarely changes: searches and Place Details are cached for days, served stale
+# while a background refresh runs, and persisted so popular cities stay warm across deploys
+VENUE_SEARCH_TTL = float(os.getenv("VENUE_SEARCH_TTL_SECONDS", str(7 * 24 * 3600)))
+VENUE_SEARCH_STALE_TTL = float(os.getenv("VENUE_SEARCH_STALE_SECONDS", str(30 * 24 * 3600)))
+PLACE_DETAILS_TTL = float(os.getenv("PLACE_DETAILS_TTL_SECONDS", str(30 * 24 * 3600)))
+PLACE_DETAILS_NEGATIVE_TTL = 3600
+
+venue_search_cache = TieredCache("venue_searches", max_entries=512, default_ttl=VENUE_SEARCH_TTL,
+                                 stale_ttl=VENUE_SEARCH_STALE_TTL)
+place_details_cache = TieredCache("place_details", max_entries=4096, default_ttl=PLACE_DETAILS_TTL,
+                                  stale_ttl=PLACE_DETAILS_TTL)
+
+def normalize_venue_query(value: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so "Austin, TX" and "austin tx" share a cache entry"""
+    return " ".join("".join(c if c.isalnum() else " " for c in (value or "").lower()).split())
+
+async def search_places_cached(location: str, venue_types: str, api_key: str) -> List[dict]:
+    """
+    Google Places venue search for a location, cached by normalized location and venue types
+    
+    Venue recommendations and venue discovery build the same query, so they share entries.
+    """
+    search_query = f"music venues, concert halls, clubs in {location}"
+    if venue_types:
+        search_query += f" {venue_types}"
+    params = {
+        "query": search_query,
+        "key": api_key,
+        "type": "establishment"
+    }
+    
+    async def load():
+        print(f"🔍 Searching for: {search_query}")
+        response = await upstream_clients.get("places").get("/maps/api/place/textsearch/json", params=params)
+        places_data = response.json() if response.status_code == 200 else {"status": f"HTTP {response.status_code}"}
+        if places_data.get("status") not in ("OK", "ZERO_RESULTS"):
+            print(f"❌ Google Places API error: {places_data.get('status')}")
+            raise HTTPException(status_code=500, detail=f"Google Places API error: {places_data.get('status')}")
+        return places_data.get("results", [])
+    
+    cache_key = f"{normalize_venue_query(location)}|{normalize_venue_query(venue_types)}"
+    return await venue_search_cache.get_or_load(cache_key, load)
+
+async def get_place_details_cached(place_id: str, api_key: str) -> Optional[dict]:
+    """Place Details result for one place_id, cached separately from searches; None if Google has none, raises on other errors"""
+    async def load():
+        details_params = {
+            "place_id": place_id,
+            "key": api_key,
+            "fields": "name,formatted_address,formatted_phone_number,website,rating,user_ratings_total,types,opening_hours,photos"
+        }
+        details_response = await upstream_clients.get("places").get("/maps/api/place/details/json", params=details_params)
+        if details_response.status_code != 200:
+            raise HTTPException(status_code=500, detail=f"Google Place Details HTTP {details_response.status_code}")
+        details_data = details_response.json()
+        status = details_data.get("status")
+        if status == "OK":
+            return details_data.get('result', {})
+        # Only a missing place is cached as negative; quota and server errors are retried on the next request
+        if status in ("NOT_FOUND", "ZERO_RESULTS"):
+            return None
+        raise HTTPException(status_code=500, detail=f"Google Place Details error: {status}")
+    
+    return await place_details_cache.get_or_load(place_id, load, negative_ttl=PLACE_DETAILS_NEGATIVE_TTL)
+
+async def fetch_venue_details(place: dict, location: str, api_key: str, semaphore: asyncio.Semaphore) -> Optional[dict]:
+    """Fetch Place Details for one search result and build the venue record; None if it fails"""
+    place_id = place.get('place_id')
+    
+    try:
+        async with semaphore:
+            # A timed-out lookup keeps running in the cache loader, so the next request finds it cached
+            venue_details = await asyncio.wait_for(get_place_details_cached(place_id, api_key),
+                                                   timeout=PLACE_DETAILS_TIMEOUT_SECONDS)
+        
+        if venue_details is None:
+            return None
+        
+        # Extract venue information
+        venue_info = {
+            "id": place_id,
+            "name": venue_details.get('name', place.get('name', 'Unknown Venue')),
+            "address": venue_details.get('formatted_address', place.get('formatted_address', '')),
+            "phone": venue_details.get('formatted_phone_number', ''),
+            "website": venue_details.get('website', ''),
+            "rating": venue_details.get('rating', 0),
+            "total_ratings": venue_details.get('user_ratings_total', 0),
+            "types": venue_details.get('types', []),
+            "opening_hours": venue_details.get('opening_hours', {}),
+            "photos": venue_details.get('photos', []),
+            "location": location,
+            "estimated_capacity": estimate_capacity_from_types(venue_details.get('types', [])),
+            "booking_difficulty": estimate_booking_difficulty(venue_details.get('rating', 0), venue_details.get('user_ratings_total', 0))
+        }
+        
+        print(f"✅ Processed venue: {venue_info['name']}")
+        return venue_info
+        
+    except asyncio.TimeoutError:
+        print(f"⏱️  Place Details timed out for {place.get('name', 'Unknown')}")
+        return None
+    except Exception as venue_error:
+        print(f"❌ Error processing venue {place.get('name', 'Unknown')}: {venue_error}")
+        return None
+
 @app.post("/api/agent/discover-venues")
 async def discover_venues(
     location: str = Form(...),
@@ -1999,85 +2384,45 @@ async def discover_venues(
         if not google_maps_api_key:
             raise HTTPException(status_code=500, detail="Google Maps API key not configured")
         
-        # Build search query for Google Places API
-        search_query = f"music venues, concert halls, clubs in {location}"
-        if venue_types:
-            search_query += f" {venue_types}"
-        
-        print(f"🔍 Searching for: {search_query}")
-        
-        # Search for venues using Google Places API
-        venues_data = []
-        
         # First, get places from Google Places API
-        places_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-        places_params = {
-            "query": search_query,
-            "key": google_maps_api_key,
-            "type": "establishment"
-        }
-        
-        async with httpx.AsyncClient() as client:
-            places_response = await client.get(places_url, params=places_params)
-            places_data = places_response.json()
-            
-            if places_data.get("status") != "OK":
-                print(f"❌ Google Places API error: {places_data.get('status')}")
-                raise HTTPException(status_code=500, detail=f"Google Places API error: {places_data.get('status')}")
-            
-            print(f"✅ Found {len(places_data.get('results', []))} venues from Google Places")
-            
-            # Process each venue
-            for place in places_data.get('results', [])[:10]:  # Limit to 10 venues
-                try:
-                    place_id = place.get('place_id')
-                    
-                    # Get detailed information for each place
-                    details_url = "https://maps.googleapis.com/maps/api/place/details/json"
-                    details_params = {
-                        "place_id": place_id,
-                        "key": google_maps_api_key,
-                        "fields": "name,formatted_address,formatted_phone_number,website,rating,user_ratings_total,types,opening_hours,photos"
-                    }
-                    
-                    details_response = await client.get(details_url, params=details_params)
-                    details_data = details_response.json()
-                    
-                    if details_data.get("status") == "OK":
-                        venue_details = details_data.get('result', {})
-                        
-                        # Extract venue information
-                        venue_info = {
-                            "id": place_id,
-                            "name": venue_details.get('name', place.get('name', 'Unknown Venue')),
-                            "address": venue_details.get('formatted_address', place.get('formatted_address', '')),
-                            "phone": venue_details.get('formatted_phone_number', ''),
-                            "website": venue_details.get('website', ''),
-                            "rating": venue_details.get('rating', 0),
-                            "total_ratings": venue_details.get('user_ratings_total', 0),
-                            "types": venue_details.get('types', []),
-                            "opening_hours": venue_details.get('opening_hours', {}),
-                            "photos": venue_details.get('photos', []),
-                            "location": location,
-                            "estimated_capacity": estimate_capacity_from_types(venue_details.get('types', [])),
-                            "booking_difficulty": estimate_booking_difficulty(venue_details.get('rating', 0), venue_details.get('user_ratings_total', 0))
-                        }
-                        
-                        venues_data.append(venue_info)
-                        print(f"✅ Processed venue: {venue_info['name']}")
-                    
-                except Exception as venue_error:
-                    print(f"❌ Error processing venue {place.get('name', 'Unknown')}: {venue_error}")
-                    continue
-        
-        # Use Gemini AI to analyze and enhance venue data
-        if venues_data:
-            try:
-                enhanced_venues = await enhance_venues_with_gemini(venues_data, artist_genre, capacity_range)
-                venues_data = enhanced_venues
-                print(f"🤖 Enhanced {len(venues_data)} venues with Gemini AI")
-            except Exception as gemini_error:
-                print(f"⚠️  Gemini enhancement failed, using basic venue data: {gemini_error}")
+        place_results = await search_places_cached(location, venue_types, google_maps_api_key)
+        
+        print(f"✅ Found {len(place_results)} venues from Google Places")
+        
+        # Fetch Place Details concurrently; Gemini enrichment starts as soon as a chunk of venues is ready
+        places = place_results[:10]  # Limit to 10 venues
+        semaphore = asyncio.Semaphore(PLACE_DETAILS_MAX_CONCURRENCY)
+        detail_tasks = [
+            asyncio.create_task(fetch_venue_details(place, location, google_maps_api_key, semaphore))
+            for place in places
+        ]
+        
+        enrichment_tasks = []
+        ready_venues = []
+        for next_finished in asyncio.as_completed(detail_tasks):
+            venue_info = await next_finished
+            if venue_info is None:
+                continue
+            ready_venues.append(venue_info)
+            if len(ready_venues) == VENUE_ENRICHMENT_CHUNK_SIZE:
+                enrichment_tasks.append(asyncio.create_task(
+                    enhance_venues_with_gemini(ready_venues, artist_genre, capacity_range)))
+                ready_venues = []
+        if ready_venues:
+            enrichment_tasks.append(asyncio.create_task(
+                enhance_venues_with_gemini(ready_venues, artist_genre, capacity_range)))
+        
+        # Use Gemini AI to analyze and enhance venue data (venues are updated in place)
+        if enrichment_tasks:
+            results = await asyncio.gather(*enrichment_tasks, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f"⚠️  Gemini enhancement failed, using basic venue data: {result}")
+        
+        # Keep Google's ranking order regardless of which details call finished first
+        venues_data = [task.result() for task in detail_tasks if task.result() is not None]
+        if enrichment_tasks:
+            print(f"🤖 Enhanced {len(venues_data)} venues with Gemini AI")
         
         return {
             "status": "success",
@@ -2145,11 +2490,13 @@ async def enhance_venues_with_gemini(venues_data, artist_genre, capacity_range):
         Return the analysis as a JSON array with enhanced venue data.
         """
         
-        # Call Gemini API
-        gemini_response = await call_gemini_api(prompt)
+        # Call Gemini API; without it the venues get the basic enhancements below
+        gemini_response = await call_gemini_api(prompt) if GEMINI_AVAILABLE else None
         
         # Parse and merge Gemini insights with venue data
         try:
+            if gemini_response is None:
+                raise ValueError("no Gemini response")
             gemini_analysis = json.loads(gemini_response)
             for i, venue in enumerate(venues_data):
                 if i < len(gemini_analysis):
@@ -2173,7 +2520,7 @@ async def enhance_venues_with_gemini(venues_data, artist_genre, capacity_range):
 async def get_spotify_artist(artist_id: str):
     """Get Spotify artist data by artist ID"""
     try:
-        if sp is None:
+        if spotify_client is None:
             # Return mock data if Spotify is not available
             return {
                 "id": artist_id,
@@ -2190,16 +2537,15 @@ async def get_spotify_artist(artist_id: str):
                 ]
             }
         
-        # Get artist data from Spotify
-        artist = sp.artist(artist_id)
+        # Get artist data from the metadata cache; concurrent Spotify misses share one bulk request
+        artist, top_tracks = await asyncio.gather(
+            artist_metadata.artist(artist_id),
+            artist_metadata.artist_top_tracks(artist_id, country='US')
+        )
         if not artist:
             raise HTTPException(status_code=404, detail="Artist not found")
         
-        # Get top tracks
-        top_tracks = sp.artist_top_tracks(artist_id, country='US')
-        tracks = []
-        if top_tracks and top_tracks['tracks']:
-            tracks = top_tracks['tracks'][:5]  # Get top 5 tracks
+        tracks = top_tracks[:5]  # Get top 5 tracks
         
         return {
             "id": artist['id'],
@@ -2226,6 +2572,132 @@ async def health_check():
             "audio_factory": AUDIO_FACTORY_AVAILABLE,
             "billboard": False  # Billboard service disabled
         },
+        "gemini": get_gemini_resilience_stats() if GEMINI_AVAILABLE else None,
+        "upstreams": get_http_client_stats(),
+        "spotify": spotify_client.get_stats() if spotify_client else None,
+        "enrichment_stages": get_stage_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.post("/api/tiers/precompute")
+async def precompute_artist_tiers(limit: int = Query(500, ge=1, le=5000), offset: int = Query(0, ge=0),
+                                  force: bool = Query(False)):
+    """Compute and store enhanced tiers for a page of artist_profiles rows"""
+    if not SUPABASE_AVAILABLE:
+        raise HTTPException(status_code=500, detail="Supabase not available.")
+    
+    try:
+        profiles = supabase_manager.client.table("artist_profiles").select(
+            "spotify_id,name,spotify_followers,spotify_popularity"
+        ).order("id").range(offset, offset + limit - 1).execute()
+        rows = [row for row in (profiles.data or []) if row.get("name")]
+        
+        # Rows without stored Spotify stats are filled from the artist metadata cache in bulk
+        missing_stats = [row for row in rows if row.get("spotify_followers") is None and row.get("spotify_id")]
+        if missing_stats and artist_metadata is not None:
+            await artist_metadata.warm(missing_stats)
+            for row in missing_stats:
+                artist = await artist_metadata.artist(row["spotify_id"])
+                if artist:
+                    row["spotify_followers"] = artist["followers"]["total"]
+                    row["spotify_popularity"] = artist["popularity"]
+        
+        semaphore = asyncio.Semaphore(TIER_PRECOMPUTE_CONCURRENCY)
+        
+        async def precompute(row: dict) -> Optional[str]:
+            async with semaphore:
+                try:
+                    tier_info = await get_artist_tier(row["name"], row.get("spotify_followers") or 0,
+                                                      row.get("spotify_popularity") or 0, force=force)
+                    return tier_info["tier"]
+                except Exception as e:
+                    print(f"❌ Error precomputing tier for {row['name']}: {e}")
+                    return None
+        
+        tiers = await asyncio.gather(*[precompute(row) for row in rows])
+        succeeded = sum(1 for tier in tiers if tier)
+        print(f"✅ Precomputed tiers for {succeeded}/{len(rows)} artists")
+        return {
+            "status": "success",
+            "processed": len(rows),
+            "succeeded": succeeded,
+            "failed": len(rows) - succeeded,
+            "next_offset": offset + limit if len(profiles.data or []) == limit else None
+        }
+    except Exception as e:
+        print(f"❌ Error precomputing artist tiers: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to precompute tiers: {str(e)}")
+
+@app.post("/api/cache-warm/artists")
+async def warm_artist_cache(include_top_tracks: bool = Query(False)):
+    """Bulk-load every artist in artist_profiles into the artist metadata cache"""
+    if artist_metadata is None:
+        raise HTTPException(status_code=503, detail="Spotify not configured.")
+    if not SUPABASE_AVAILABLE:
+        raise HTTPException(status_code=500, detail="Supabase not available.")
+    
+    try:
+        profiles = supabase_manager.client.table("artist_profiles").select("spotify_id,name").execute()
+        result = await artist_metadata.warm(profiles.data or [], include_top_tracks=include_top_tracks)
+        print(f"✅ Warmed artist cache: {result}")
+        return {"status": "success", **result}
+    except Exception as e:
+        print(f"❌ Error warming artist cache: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to warm artist cache: {str(e)}")
+
+# At most one MBID resolution job runs at a time; it is paced by MusicBrainz's 1 req/s limit
+mbid_resolution_job: Dict[str, Any] = {"state": "idle"}
+mbid_resolution_task: Optional[asyncio.Task] = None
+
+async def run_mbid_resolution(names: List[str]):
+    try:
+        result = await mbid_store.resolve_many(names)
+        mbid_resolution_job.update(state="done", result=result, finished_at=datetime.utcnow().isoformat())
+        print(f"✅ Resolved MusicBrainz ids: {result}")
+    except Exception as e:
+        mbid_resolution_job.update(state="failed", error=str(e), finished_at=datetime.utcnow().isoformat())
+        print(f"❌ Error resolving MusicBrainz ids: {e}")
+
+@app.post("/api/mbids/resolve", status_code=202)
+async def resolve_artist_mbids(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    """Start resolving MusicBrainz ids for a page of artist_profiles rows in the background (about one second per new artist)"""
+    global mbid_resolution_task
+    if not SUPABASE_AVAILABLE:
+        raise HTTPException(status_code=500, detail="Supabase not available.")
+    if mbid_resolution_task is not None and not mbid_resolution_task.done():
+        raise HTTPException(status_code=409, detail="An MBID resolution job is already running.")
+    
+    try:
+        profiles = supabase_manager.client.table("artist_profiles").select("name").order("id").range(
+            offset, offset + limit - 1
+        ).execute()
+    except Exception as e:
+        print(f"❌ Error loading artist profiles for MBID resolution: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to resolve MusicBrainz ids: {str(e)}")
+    
+    names = [row["name"] for row in (profiles.data or []) if row.get("name")]
+    mbid_resolution_job.clear()
+    mbid_resolution_job.update(state="running", offset=offset, limit=limit, artists=len(names),
+                               started_at=datetime.utcnow().isoformat())
+    mbid_resolution_task = asyncio.create_task(run_mbid_resolution(names))
+    return {
+        "status": "started",
+        "artists": len(names),
+        "next_offset": offset + limit if len(profiles.data or []) == limit else None
+    }
+
+@app.get("/api/mbids/resolve")
+async def mbid_resolution_status():
+    """State of the latest MBID resolution job, with its counts once finished"""
+    return {**mbid_resolution_job, "store": mbid_store.get_stats()}
+
+@app.get("/api/cache-stats")
+async def cache_stats():
+    """Hit-rate metrics for the response caches and request coalescing"""
+    return {
+        "caches": get_cache_stats(),
+        "single_flight": get_single_flight_stats(),
+        "musicbrainz_ids": mbid_store.get_stats(),
         "timestamp": datetime.utcnow().isoformat()
     }
 
@@ -0,0 +1,146 @@
+"""
+MusicBrainz ID Store for MusiStash
+Artist name → MBID mappings resolved once through a rate-limited MusicBrainz client and kept on disk
+"""
+
+import os
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+from cache_service import TieredCache
+from http_clients import upstream_clients
+from resilience import TokenBucket
+
+# MBIDs are permanent identifiers, so mappings are kept for a long time
+MBID_STORE_TTL = float(os.getenv("MBID_STORE_TTL_SECONDS", str(90 * 24 * 3600)))
+MBID_STORE_STALE_TTL = float(os.getenv("MBID_STORE_STALE_SECONDS", str(365 * 24 * 3600)))
+MBID_NOT_FOUND_TTL = float(os.getenv("MBID_NOT_FOUND_TTL_SECONDS", str(7 * 24 * 3600)))
+MBID_STORE_MAX_ENTRIES = int(os.getenv("MBID_STORE_MAX_ENTRIES", "50000"))
+# MusicBrainz allows one request per second per client
+MUSICBRAINZ_REQUESTS_PER_MINUTE = float(os.getenv("MUSICBRAINZ_REQUESTS_PER_MINUTE", "60"))
+# Names missed on the request path are resolved in the background, at most this many queued at once
+MBID_BACKGROUND_QUEUE_MAX = int(os.getenv("MBID_BACKGROUND_QUEUE_MAX", "100"))
+MUSICBRAINZ_USER_AGENT = os.getenv("MUSICBRAINZ_USER_AGENT", "MusiStash/1.0")
+
+def normalize_artist_name(name: str) -> str:
+    return " ".join((name or "").lower().split())
+
+class MBIDStore:
+    """
+    Persistent artist name → MusicBrainz id mapping
+
+    Every MusicBrainz search goes through one token bucket, so the service
+    never exceeds its 1 request/second limit however many callers are waiting.
+    ``lookup`` never calls MusicBrainz: on a miss it returns None and queues
+    the name for background resolution. ``resolve_many`` fills the store in
+    bulk from ``artist_profiles`` ahead of time. Names MusicBrainz does not know
+    are stored on disk too, so restarts do not search for them again.
+    """
+
+    def __init__(self):
+        self.cache = TieredCache("musicbrainz_ids", max_entries=MBID_STORE_MAX_ENTRIES, default_ttl=MBID_STORE_TTL,
+                                 stale_ttl=MBID_STORE_STALE_TTL, persist_negative=True)
+        self.limiter = TokenBucket(MUSICBRAINZ_REQUESTS_PER_MINUTE, burst=1)
+        self._queued: Set[str] = set()
+        # Background resolutions in flight; the loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"musicbrainz_requests": 0, "lookup_misses": 0, "background_resolutions": 0, "queue_full": 0}
+
+    async def _search(self, artist_name: str) -> Optional[str]:
+        await self.limiter.acquire()
+        self.stats["musicbrainz_requests"] += 1
+        response = await upstream_clients.get("musicbrainz").get(
+            "/ws/2/artist/",
+            params={"query": artist_name, "fmt": "json", "limit": 1},
+            headers={"User-Agent": MUSICBRAINZ_USER_AGENT}
+        )
+        # Errors (including 503 when throttled) raise, so they are retried later instead of cached as not found
+        response.raise_for_status()
+        artists = response.json().get("artists") or []
+        return artists[0]["id"] if artists else None
+
+    async def resolve(self, artist_name: str) -> Optional[str]:
+        """
+        MBID for an artist, searching MusicBrainz (rate limited) when it is not stored
+        """
+        return await self.cache.get_or_load(normalize_artist_name(artist_name), lambda: self._search(artist_name),
+                                            negative_ttl=MBID_NOT_FOUND_TTL)
+
+    async def lookup(self, artist_name: str) -> Optional[str]:
+        """
+        Stored MBID for an artist, or None; misses and stale entries are resolved in the background
+        """
+        key = normalize_artist_name(artist_name)
+        entry = await self.cache.aget_entry(key)
+        if entry is None or not entry.is_fresh:
+            if entry is None:
+                self.stats["lookup_misses"] += 1
+            self._queue(artist_name, refresh=entry is not None)
+        if entry is None or entry.negative:
+            return None
+        return entry.value
+
+    def _queue(self, artist_name: str, refresh: bool = False):
+        key = normalize_artist_name(artist_name)
+        if key in self._queued:
+            return
+        if len(self._queued) >= MBID_BACKGROUND_QUEUE_MAX:
+            self.stats["queue_full"] += 1
+            return
+
+        async def resolve_later():
+            try:
+                if refresh:
+                    mbid = await self._search(artist_name)
+                    if mbid:
+                        self.cache.set(key, mbid)
+                else:
+                    await self.resolve(artist_name)
+                self.stats["background_resolutions"] += 1
+            except Exception as e:
+                print(f"⚠️  Could not resolve MBID for {artist_name}: {e}")
+            finally:
+                self._queued.discard(key)
+
+        self._queued.add(key)
+        task = asyncio.ensure_future(resolve_later())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def resolve_many(self, artist_names: List[str]) -> Dict[str, int]:
+        """
+        Resolve every name that is not already stored; takes about one second per new name
+        """
+        pending = {normalize_artist_name(name): name for name in artist_names if name}
+        # Known-missing names are negatively cached and count as stored too
+        stored = [key for key in pending if await self.cache.aget_entry(key) is not None]
+        for key in stored:
+            pending.pop(key)
+
+        resolved = not_found = failed = 0
+        for name in pending.values():
+            try:
+                if await self.resolve(name):
+                    resolved += 1
+                else:
+                    not_found += 1
+            except Exception as e:
+                failed += 1
+                print(f"⚠️  Could not resolve MBID for {name}: {e}")
+
+        return {
+            "artists": len(artist_names),
+            "already_stored": len(stored),
+            "resolved": resolved,
+            "not_found": not_found,
+            "failed": failed
+        }
+
+    def preload(self) -> int:
+        """
+        Pull every stored mapping into memory; returns how many were loaded
+        """
+        return self.cache.load_from_disk()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "queued": len(self._queued), "throttled": self.limiter.throttled}
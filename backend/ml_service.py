@@ -178,39 +178,71 @@ class MusiStashMLPredictor:
             'feature_importance': dict(zip(self.feature_names, self.model.feature_importances_))
         }
     
-    def predict_resonance(self, artist_data: Dict, comparable_data: Dict) -> Dict:
+    def predict_with_contributions(self, features_scaled: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Predict resonance score with confidence intervals
+        Predict scores and per-feature contributions for a batch of rows
+
+        Uses the booster's contribution mode, which returns one value per
+        feature plus a bias column for every row. Each row sums to the raw
+        prediction, so the score comes from the same pass instead of a
+        separate predict call.
+        """
+        booster = self.model.get_booster()
+        contributions = booster.predict(xgb.DMatrix(features_scaled), pred_contribs=True)
+        
+        predictions = contributions.sum(axis=1)
+        return predictions, contributions[:, :-1]
+    
+    def predict_resonance_batch(self, artists: List[Dict], comparable_data: Dict) -> List[Dict]:
+        """
+        Predict resonance scores for several artists in one model pass
         """
+        if not artists:
+            return []
+        
         # Train model on current data if no model exists
         if self.model is None:
-            self.train_model_on_current_data(artist_data, comparable_data)
+            self.train_model_on_current_data(artists[0], comparable_data)
         
-        features = self.prepare_features(artist_data, comparable_data)
+        features = np.vstack([self.prepare_features(artist_data, comparable_data) for artist_data in artists])
         features_scaled = self.scaler.transform(features)
         
-        # Get prediction
-        prediction = self.model.predict(features_scaled)[0]
-        prediction = np.clip(prediction, 0, 100)
-        
-        # Calculate confidence interval based on feature quality
-        confidence = self.calculate_prediction_confidence(artist_data)
-        interval_width = max(5, 20 - confidence * 0.15)  # Better confidence = smaller interval
-        confidence_interval = [max(0, prediction - interval_width), min(100, prediction + interval_width)]
+        # Get predictions and per-row contributions together
+        predictions, contributions = self.predict_with_contributions(features_scaled)
+        predictions = np.clip(predictions, 0, 100)
         
         # Get feature importance
         feature_importance = dict(zip(self.feature_names, self.model.feature_importances_))
         
-        # Generate insights
-        insights = self.generate_insights(features.flatten(), feature_importance, prediction, artist_data, comparable_data)
+        results = []
+        for row, artist_data in enumerate(artists):
+            prediction = predictions[row]
+            
+            # Calculate confidence interval based on feature quality
+            confidence = self.calculate_prediction_confidence(artist_data)
+            interval_width = max(5, 20 - confidence * 0.15)  # Better confidence = smaller interval
+            confidence_interval = [max(0, prediction - interval_width), min(100, prediction + interval_width)]
+            
+            # Generate insights
+            insights = self.generate_insights(features[row], feature_importance, prediction, artist_data,
+                                              comparable_data, contributions=contributions[row])
+            
+            results.append({
+                'predicted_score': prediction,
+                'confidence_interval': confidence_interval,
+                'prediction_confidence': confidence,
+                'feature_importance': feature_importance,
+                'feature_contributions': dict(zip(self.feature_names, contributions[row])),
+                'insights': insights
+            })
         
-        return {
-            'predicted_score': prediction,
-            'confidence_interval': confidence_interval,
-            'prediction_confidence': confidence,
-            'feature_importance': feature_importance,
-            'insights': insights
-        }
+        return results
+    
+    def predict_resonance(self, artist_data: Dict, comparable_data: Dict) -> Dict:
+        """
+        Predict resonance score with confidence intervals
+        """
+        return self.predict_resonance_batch([artist_data], comparable_data)[0]
     
     def calculate_prediction_confidence(self, artist_data: Dict) -> float:
         """
@@ -233,20 +265,35 @@ class MusiStashMLPredictor:
         return min(95, confidence)
     
     def generate_insights(self, features: np.ndarray, feature_importance: Dict, prediction: float, 
-                         artist_data: Dict, comparable_data: Dict) -> Dict:
+                         artist_data: Dict, comparable_data: Dict,
+                         contributions: Optional[np.ndarray] = None) -> Dict:
         """
         Generate actionable insights from the prediction
+        
+        When per-row contributions are given, driving factors are ranked by how
+        much each feature moved this artist's score; otherwise the model-wide
+        importances are used.
         """
         # Top driving factors
-        sorted_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)
+        if contributions is not None:
+            total_contribution = np.abs(contributions).sum() or 1.0
+            factor_weights = {name: abs(value) / total_contribution
+                              for name, value in zip(self.feature_names, contributions)}
+        else:
+            factor_weights = feature_importance
+        
+        sorted_features = sorted(factor_weights.items(), key=lambda x: x[1], reverse=True)
         top_driving_factors = []
         
         for feature, importance in sorted_features[:5]:
             feature_idx = self.feature_names.index(feature)
             feature_value = features[feature_idx]
             
-            # Determine impact based on feature value
-            impact = 'positive' if feature_value > np.mean(features) else 'negative'
+            # Determine impact from the feature's push on this prediction
+            if contributions is not None:
+                impact = 'positive' if contributions[feature_idx] >= 0 else 'negative'
+            else:
+                impact = 'positive' if feature_value > np.mean(features) else 'negative'
             
             explanations = {
                 'spotify_followers_log': f"Strong fanbase with {np.exp(feature_value * np.log(10)):.0f} followers",
@@ -263,12 +310,16 @@ class MusiStashMLPredictor:
                 'valence': f"Positive mood music ({feature_value:.2f}) appeals to broader audience"
             }
             
-            top_driving_factors.append({
+            driving_factor = {
                 'feature': feature,
                 'importance': importance,
                 'impact': impact,
                 'explanation': explanations.get(feature, f"Strong {feature.replace('_', ' ')} performance")
-            })
+            }
+            if contributions is not None:
+                driving_factor['contribution'] = float(contributions[feature_idx])
+            
+            top_driving_factors.append(driving_factor)
         
         # Growth potential based on prediction and features
         base_growth = prediction * 0.3
@@ -378,7 +429,8 @@ class MusiStashMLPredictor:
     
     def save_model(self):
         """Save trained model and scaler"""
-        os.makedirs("models", exist_ok=True)
+        os.makedirs(os.path.dirname(self.model_path) or ".", exist_ok=True)
+        os.makedirs(os.path.dirname(self.scaler_path) or ".", exist_ok=True)
         
         if self.model:
             self.model.save_model(self.model_path)
@@ -416,6 +468,7 @@ async def get_ml_enhanced_analysis(artist_data: Dict, comparable_data: Dict) ->
             'confidence_interval': ml_prediction['confidence_interval'],
             'prediction_confidence': ml_prediction['prediction_confidence'],
             'feature_importance': ml_prediction['feature_importance'],
+            'feature_contributions': ml_prediction['feature_contributions'],
             'top_driving_factors': ml_prediction['insights']['top_driving_factors'],
             'growth_potential': ml_prediction['insights']['growth_potential'],
             'risk_assessment': ml_prediction['insights']['risk_assessment'],
@@ -433,6 +486,7 @@ async def get_ml_enhanced_analysis(artist_data: Dict, comparable_data: Dict) ->
             'confidence_interval': [0, 100],
             'prediction_confidence': 50,
             'feature_importance': {},
+            'feature_contributions': {},
             'top_driving_factors': [],
             'growth_potential': {'short_term': 0, 'medium_term': 0, 'long_term': 0},
             'risk_assessment': {'overall_risk': 'medium', 'risk_factors': []},
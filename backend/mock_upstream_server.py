@@ -0,0 +1,409 @@
+"""
+Local stand-in server for MusiStash's upstream APIs
+Serves recorded fixtures for Gemini, Spotify, Google Places, Last.fm and YouTube (plus
+MusicBrainz/ListenBrainz) with configurable latency distributions and error rates, so
+the backend can be exercised and performance-tested without real API keys or quotas.
+
+Usage:
+    python mock_upstream_server.py --port 8900 --profile realistic
+    MOCK_UPSTREAMS_URL=http://localhost:8900 uvicorn main:app
+
+Runtime controls:
+    GET  /__mock__/config    current latency/error settings per service
+    POST /__mock__/config    update settings, e.g. {"gemini": {"median_ms": 2000, "error_rate": 0.2}}
+    GET  /__mock__/stats     requests, injected errors and latency per service
+    POST /__mock__/reset     clear the counters
+"""
+
+import os
+import json
+import math
+import uuid
+import random
+import asyncio
+import hashlib
+import argparse
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request, Body
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_fixtures")
+
+SERVICES = ("gemini", "spotify", "places", "lastfm", "youtube", "musicbrainz", "listenbrainz")
+
+# Latency is log-normal: median_ms * exp(sigma * N(0, 1)). error_rate is the share of
+# requests answered with 429 (with Retry-After) or 503 instead of the fixture.
+PROFILES = {
+    "fast": {service: {"median_ms": 0, "sigma": 0.0, "error_rate": 0.0} for service in SERVICES},
+    "realistic": {
+        "gemini": {"median_ms": 1200, "sigma": 0.5, "error_rate": 0.01},
+        "spotify": {"median_ms": 120, "sigma": 0.4, "error_rate": 0.005},
+        "places": {"median_ms": 250, "sigma": 0.4, "error_rate": 0.005},
+        "lastfm": {"median_ms": 180, "sigma": 0.5, "error_rate": 0.01},
+        "youtube": {"median_ms": 150, "sigma": 0.4, "error_rate": 0.005},
+        "musicbrainz": {"median_ms": 300, "sigma": 0.5, "error_rate": 0.02},
+        "listenbrainz": {"median_ms": 200, "sigma": 0.5, "error_rate": 0.01}
+    },
+    "degraded": {
+        "gemini": {"median_ms": 4000, "sigma": 0.8, "error_rate": 0.15},
+        "spotify": {"median_ms": 400, "sigma": 0.7, "error_rate": 0.05},
+        "places": {"median_ms": 800, "sigma": 0.7, "error_rate": 0.05},
+        "lastfm": {"median_ms": 600, "sigma": 0.8, "error_rate": 0.1},
+        "youtube": {"median_ms": 500, "sigma": 0.7, "error_rate": 0.05},
+        "musicbrainz": {"median_ms": 1000, "sigma": 0.8, "error_rate": 0.1},
+        "listenbrainz": {"median_ms": 700, "sigma": 0.8, "error_rate": 0.1}
+    }
+}
+
+def load_fixture(name: str) -> Dict[str, Any]:
+    with open(os.path.join(FIXTURES_DIR, f"{name}.json")) as f:
+        return json.load(f)
+
+def _stable_id(*parts: str, length: int = 22) -> str:
+    """Deterministic id so synthetic entities are the same on every request"""
+    digest = hashlib.sha256("|".join(p.lower().strip() for p in parts).encode()).hexdigest()
+    return digest[:length]
+
+def _stable_int(low: int, high: int, *parts: str) -> int:
+    return low + int(_stable_id(*parts, length=12), 16) % (high - low + 1)
+
+class MockUpstreams:
+    """
+    Fixture-backed responses plus the latency/error model shared by every route
+    """
+
+    def __init__(self, profile: str = "realistic", seed: Optional[int] = None):
+        self.config = json.loads(json.dumps(PROFILES[profile]))
+        self.random = random.Random(seed)
+        self.spotify = load_fixture("spotify")
+        self.lastfm = load_fixture("lastfm")
+        self.gemini = load_fixture("gemini")
+        self.places = load_fixture("places")
+        self.youtube = load_fixture("youtube")
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {service: {"requests": 0, "errors": 0, "total_latency_ms": 0.0} for service in SERVICES}
+
+    def sample_latency(self, service: str) -> float:
+        settings = self.config[service]
+        if settings["median_ms"] <= 0:
+            return 0.0
+        return settings["median_ms"] * math.exp(settings["sigma"] * self.random.gauss(0, 1)) / 1000
+
+    async def simulate(self, service: str) -> Optional[JSONResponse]:
+        """
+        Sleep for a sampled latency; return an error response if one is injected
+        """
+        latency = self.sample_latency(service)
+        stats = self.stats[service]
+        stats["requests"] += 1
+        stats["total_latency_ms"] += latency * 1000
+        if latency:
+            await asyncio.sleep(latency)
+
+        if self.random.random() < self.config[service]["error_rate"]:
+            stats["errors"] += 1
+            if self.random.random() < 0.5:
+                return JSONResponse({"error": {"code": 429, "message": "Rate limit exceeded"}}, status_code=429,
+                                    headers={"Retry-After": "1"})
+            return JSONResponse({"error": {"code": 503, "message": "Service unavailable"}}, status_code=503)
+        return None
+
+    # --- Spotify ---
+    def spotify_artist(self, artist_id: str) -> Dict[str, Any]:
+        if artist_id in self.spotify["artists"]:
+            return self.spotify["artists"][artist_id]
+        return self._synthetic_spotify_artist(f"Artist {artist_id[:6]}", artist_id)
+
+    def spotify_artist_by_name(self, name: str) -> Dict[str, Any]:
+        for artist in self.spotify["artists"].values():
+            if artist["name"].lower() == name.lower().strip():
+                return artist
+        return self._synthetic_spotify_artist(name.strip(), _stable_id("spotify", name))
+
+    def _synthetic_spotify_artist(self, name: str, artist_id: str) -> Dict[str, Any]:
+        return {
+            "id": artist_id,
+            "name": name,
+            "genres": self.gemini["default_genres"],
+            "popularity": _stable_int(10, 80, artist_id),
+            "followers": {"href": None, "total": _stable_int(1_000, 5_000_000, artist_id)},
+            "images": [{"url": f"https://i.scdn.co/image/{artist_id}", "height": 640, "width": 640}],
+            "external_urls": {"spotify": f"https://open.spotify.com/artist/{artist_id}"},
+            "type": "artist",
+            "uri": f"spotify:artist:{artist_id}"
+        }
+
+    def spotify_top_tracks(self, artist_id: str) -> List[Dict[str, Any]]:
+        if artist_id in self.spotify["top_tracks"]:
+            return self.spotify["top_tracks"][artist_id]
+        track_id = _stable_id("track", artist_id)
+        return [{
+            "id": track_id,
+            "name": "Signature Song",
+            "popularity": _stable_int(10, 80, track_id),
+            "duration_ms": _stable_int(150_000, 260_000, track_id),
+            "explicit": False,
+            "preview_url": None,
+            "album": {"name": "Debut", "images": [{"url": f"https://i.scdn.co/image/{track_id}"}]},
+            "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"}
+        }]
+
+    # --- Gemini ---
+    def gemini_text(self, prompt: str) -> str:
+        if "each of these artists" in prompt:
+            names = self._extract_json_list(prompt)
+            if "genre" in prompt.lower():
+                result = [{"artist": name, "genres": self.gemini["genres"].get(name.lower(), self.gemini["default_genres"])}
+                          for name in names]
+            else:
+                result = [{"artist": name, **self.gemini["artist_profiles"].get(name.lower(), self.gemini["default_artist_profile"])}
+                          for name in names]
+            return json.dumps(result)
+        if "track_summary" in prompt:
+            return json.dumps(self.gemini["audio_analysis"], indent=2)
+        return self.gemini["text"]
+
+    @staticmethod
+    def _extract_json_list(prompt: str) -> List[str]:
+        start = prompt.find("[")
+        end = prompt.find("]", start)
+        try:
+            return json.loads(prompt[start:end + 1])
+        except ValueError:
+            return []
+
+    # --- Google Places ---
+    def place_results(self, query: str) -> List[Dict[str, Any]]:
+        location = query.rsplit(" in ", 1)[-1].strip() or "Somewhere"
+        results = []
+        for index, venue in enumerate(self.places["venues"]):
+            results.append({
+                "place_id": f"mock-{_stable_id('place', location, length=10)}-{index}",
+                "name": venue["name"],
+                "formatted_address": f"{100 + index * 7} Main St, {location}",
+                "rating": venue["rating"],
+                "user_ratings_total": venue["user_ratings_total"],
+                "types": venue["types"]
+            })
+        return results
+
+    def place_details(self, place_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            index = int(place_id.rsplit("-", 1)[1])
+            venue = self.places["venues"][index]
+        except (IndexError, ValueError):
+            return None
+        return {
+            "name": venue["name"],
+            "formatted_address": f"{100 + index * 7} Main St",
+            "formatted_phone_number": f"(555) 010-{1000 + index}",
+            "website": f"https://{venue['name'].lower().replace(' ', '')}.example.com",
+            "rating": venue["rating"],
+            "user_ratings_total": venue["user_ratings_total"],
+            "types": venue["types"],
+            "opening_hours": {"open_now": index % 2 == 0},
+            "photos": []
+        }
+
+    # --- Last.fm ---
+    def lastfm_artist(self, name: str) -> Dict[str, Any]:
+        artist = self.lastfm["artists"].get(name.lower().strip())
+        if artist:
+            return artist
+        return {
+            "name": name,
+            "mbid": str(uuid.uuid5(uuid.NAMESPACE_URL, f"musicbrainz:{name.lower().strip()}")),
+            "url": f"https://www.last.fm/music/{name.replace(' ', '+')}",
+            "stats": {"listeners": str(_stable_int(100, 500_000, name)), "playcount": str(_stable_int(1_000, 9_000_000, name))},
+            "tags": {"tag": [{"name": genre} for genre in self.gemini["default_genres"]]},
+            "bio": {"summary": f"{name} is an artist."}
+        }
+
+    # --- YouTube ---
+    def youtube_channel(self, query: str) -> Dict[str, Any]:
+        channel = self.youtube["channels"].get(query.lower().strip())
+        if channel:
+            return channel
+        return {
+            "channelId": "UC" + _stable_id("youtube", query),
+            "title": query,
+            "subscriberCount": str(_stable_int(100, 2_000_000, query)),
+            "viewCount": str(_stable_int(10_000, 500_000_000, query)),
+            "videoCount": str(_stable_int(1, 400, query))
+        }
+
+def create_app(profile: str = "realistic", seed: Optional[int] = None) -> FastAPI:
+    mock = MockUpstreams(profile, seed)
+    app = FastAPI(title="MusiStash upstream stand-ins")
+    app.state.mock = mock
+
+    # --- Controls ---
+    @app.get("/__mock__/config")
+    async def get_config():
+        return mock.config
+
+    @app.post("/__mock__/config")
+    async def update_config(updates: Dict[str, Dict[str, float]] = Body(...)):
+        for service, settings in updates.items():
+            if service in mock.config:
+                mock.config[service].update(settings)
+        return mock.config
+
+    @app.get("/__mock__/stats")
+    async def get_stats():
+        return {
+            service: {**stats, "mean_latency_ms": round(stats["total_latency_ms"] / stats["requests"], 2) if stats["requests"] else 0.0}
+            for service, stats in mock.stats.items()
+        }
+
+    @app.post("/__mock__/reset")
+    async def reset_stats():
+        mock.reset_stats()
+        return {"status": "reset"}
+
+    # --- Gemini ---
+    @app.post("/gemini/v1beta/models/{model_action}")
+    async def gemini_generate(model_action: str, request: Request):
+        error = await mock.simulate("gemini")
+        if error:
+            return error
+
+        body = await request.json()
+        prompt = "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+        text = mock.gemini_text(prompt)
+
+        if model_action.endswith(":streamGenerateContent"):
+            async def sse():
+                size = max(1, math.ceil(len(text) / 4))
+                for start in range(0, len(text), size):
+                    chunk = {"candidates": [{"content": {"parts": [{"text": text[start:start + size]}], "role": "model"}}]}
+                    yield f"data: {json.dumps(chunk)}\r\n\r\n"
+                    await asyncio.sleep(mock.sample_latency("gemini") / 8)
+            return StreamingResponse(sse(), media_type="text/event-stream")
+
+        return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP"}]}
+
+    # --- Spotify ---
+    @app.post("/spotify/accounts/api/token")
+    async def spotify_token():
+        error = await mock.simulate("spotify")
+        if error:
+            return error
+        return {"access_token": "mock-spotify-token", "token_type": "Bearer", "expires_in": 3600}
+
+    @app.get("/spotify/v1/search")
+    async def spotify_search(q: str, type: str = "artist", limit: int = 1):
+        error = await mock.simulate("spotify")
+        if error:
+            return error
+        artist = mock.spotify_artist_by_name(q.replace("artist:", "").strip('"'))
+        return {"artists": {"items": [artist][:limit], "total": 1, "limit": limit, "offset": 0}}
+
+    @app.get("/spotify/v1/artists")
+    async def spotify_artists(ids: str):
+        error = await mock.simulate("spotify")
+        if error:
+            return error
+        return {"artists": [mock.spotify_artist(artist_id) for artist_id in ids.split(",")[:50]]}
+
+    @app.get("/spotify/v1/artists/{artist_id}")
+    async def spotify_artist(artist_id: str):
+        error = await mock.simulate("spotify")
+        if error:
+            return error
+        return mock.spotify_artist(artist_id)
+
+    @app.get("/spotify/v1/artists/{artist_id}/top-tracks")
+    async def spotify_top_tracks(artist_id: str, market: str = "US"):
+        error = await mock.simulate("spotify")
+        if error:
+            return error
+        return {"tracks": mock.spotify_top_tracks(artist_id)}
+
+    @app.get("/spotify/v1/artists/{artist_id}/related-artists")
+    async def spotify_related_artists(artist_id: str):
+        error = await mock.simulate("spotify")
+        if error:
+            return error
+        return {"artists": [artist for other_id, artist in mock.spotify["artists"].items() if other_id != artist_id]}
+
+    # --- Google Places ---
+    @app.get("/places/maps/api/place/textsearch/json")
+    async def places_text_search(query: str, key: str = ""):
+        error = await mock.simulate("places")
+        if error:
+            return error
+        return {"status": "OK", "results": mock.place_results(query)}
+
+    @app.get("/places/maps/api/place/details/json")
+    async def places_details(place_id: str, key: str = "", fields: str = ""):
+        error = await mock.simulate("places")
+        if error:
+            return error
+        details = mock.place_details(place_id)
+        if details is None:
+            return {"status": "NOT_FOUND"}
+        return {"status": "OK", "result": details}
+
+    # --- Last.fm ---
+    @app.get("/lastfm/2.0/")
+    async def lastfm(method: str, artist: str = "", api_key: str = "", format: str = "json"):
+        error = await mock.simulate("lastfm")
+        if error:
+            return error
+        if method != "artist.getinfo":
+            return {"error": 3, "message": "Invalid Method - No method with that name in this package"}
+        return {"artist": mock.lastfm_artist(artist)}
+
+    # --- YouTube ---
+    @app.get("/youtube/youtube/v3/search")
+    async def youtube_search(q: str, part: str = "snippet", type: str = "channel", maxResults: int = 1, key: str = ""):
+        error = await mock.simulate("youtube")
+        if error:
+            return error
+        channel = mock.youtube_channel(q)
+        return {"items": [{"id": {"kind": "youtube#channel", "channelId": channel["channelId"]},
+                           "snippet": {"channelId": channel["channelId"], "title": channel["title"]}}]}
+
+    @app.get("/youtube/youtube/v3/channels")
+    async def youtube_channels(id: str, part: str = "statistics", key: str = ""):
+        error = await mock.simulate("youtube")
+        if error:
+            return error
+        channel = next((c for c in mock.youtube["channels"].values() if c["channelId"] == id), None)
+        if channel is None:
+            channel = {"channelId": id, "subscriberCount": str(_stable_int(100, 2_000_000, id)),
+                       "viewCount": str(_stable_int(10_000, 500_000_000, id)), "videoCount": str(_stable_int(1, 400, id))}
+        return {"items": [{"id": id, "statistics": {key: channel[key] for key in ("subscriberCount", "viewCount", "videoCount")}}]}
+
+    # --- MusicBrainz / ListenBrainz ---
+    @app.get("/musicbrainz/ws/2/artist/")
+    async def musicbrainz_search(query: str, fmt: str = "json"):
+        error = await mock.simulate("musicbrainz")
+        if error:
+            return error
+        return {"artists": [{"id": mock.lastfm_artist(query)["mbid"], "name": query, "score": 100}]}
+
+    @app.get("/listenbrainz/1/artist/{mbid}/listens")
+    async def listenbrainz_listens(mbid: str):
+        error = await mock.simulate("listenbrainz")
+        if error:
+            return error
+        return {"payload": {"artist_mbid": mbid, "count": _stable_int(0, 1_000_000, mbid)}}
+
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run local stand-ins for MusiStash's upstream APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic")
+    parser.add_argument("--seed", type=int, default=None, help="Seed the latency/error model for repeatable runs")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.profile, args.seed), host=args.host, port=args.port)
@@ -0,0 +1,118 @@
+"""
+Resilience helpers for MusiStash's upstream API calls
+Token-bucket rate limiting, jittered retry backoff and a circuit breaker
+"""
+
+import time
+import random
+import asyncio
+from typing import Any, Dict, Optional
+
+class TokenBucket:
+    """
+    Async token bucket sized to an upstream quota
+
+    ``rate_per_minute`` tokens are added per minute up to ``burst``; each call
+    takes one token and waits for the next one when the bucket is empty.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_minute)))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.throttled = 0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                self.throttled += 1
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float, retry_after: Optional[str] = None) -> float:
+    """
+    Seconds to wait before retry number ``attempt`` (0-based)
+
+    Honours a numeric Retry-After header, otherwise uses full-jitter
+    exponential backoff so concurrent callers do not retry in lockstep.
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), max_delay)
+        except ValueError:
+            pass
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream that keeps failing
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    ``allow_request`` returns False for ``reset_timeout`` seconds. Then one
+    trial call is let through (half-open): success closes the circuit,
+    failure opens it again. If the trial call never reports back, another
+    one is let through after a further ``reset_timeout``.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def is_open(self) -> bool:
+        """
+        True while calls should be short-circuited to a fallback
+        """
+        return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        expired = time.monotonic() - self.opened_at >= self.reset_timeout
+        if self.state in (self.OPEN, self.HALF_OPEN) and expired:
+            # opened_at doubles as the start of the trial call, so a lost trial is retried after reset_timeout
+            self.state = self.HALF_OPEN
+            self.opened_at = time.monotonic()
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                print(f"⚠️  {self.name} circuit opened after {self.failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.OPEN if self.is_open else (self.HALF_OPEN if self.state != self.CLOSED else self.CLOSED),
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected
+        }
@@ -40,9 +40,13 @@ class EnhancedAudioAnalyzer:
             'music21': False
         }
         
-    async def analyze_audio_comprehensive(self, file_path: str, filename: str, artist_id: str = None) -> Dict[str, Any]:
+    async def analyze_audio_comprehensive(self, file_path: str, filename: str, artist_id: str = None,
+                                          include_ai: bool = True) -> Dict[str, Any]:
         """
         Simplified audio analysis that works without system audio libraries
+        
+        With include_ai=False the Gemini step is skipped and the loaded artist
+        profile is returned under "artist_profile" so insights can be streamed separately.
         """
         print(f"🎵 Starting simplified audio analysis for: {filename}")
         
@@ -115,7 +119,9 @@ class EnhancedAudioAnalyzer:
         analysis_results.update(commercial_analysis)
         
         # Generate Gemini insights if available
-        if GEMINI_AVAILABLE:
+        if not include_ai:
+            analysis_results["artist_profile"] = artist_profile
+        elif GEMINI_AVAILABLE:
             try:
                 gemini_insights = await self._generate_gemini_insights(analysis_results, filename, artist_profile)
                 analysis_results["gemini_insights"] = gemini_insights
@@ -0,0 +1,100 @@
+"""
+Single-flight request coalescing for MusiStash
+Concurrent identical lookups share one in-flight coroutine instead of each hitting the upstream API
+"""
+
+import copy
+import json
+import asyncio
+import inspect
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Tuple
+
+class SingleFlight:
+    """
+    Runs at most one coroutine per key at a time
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it is running await the same task. The task is shielded, so a
+    cancelled caller does not cancel the lookup for everyone else. Every
+    caller, including the first, receives its own deep copy of the result so
+    none of them can mutate what the others see.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+
+        task = self._in_flight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            return copy.deepcopy(await asyncio.shield(task))
+
+        task = asyncio.ensure_future(fn())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._forget(key, task))
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight)
+        }
+
+_groups: Dict[str, SingleFlight] = {}
+
+def _freeze(value: Any, normalize: bool = False) -> Hashable:
+    """
+    Hashable, order-independent form of a call argument
+
+    Strings are only case- and whitespace-folded when ``normalize`` is set.
+    """
+    if isinstance(value, str):
+        return " ".join(value.lower().split()) if normalize else value
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return json.dumps(value, sort_keys=True, default=str)
+
+def single_flight(call_type: str, normalize: Iterable[str] = ()):
+    """
+    Decorator coalescing concurrent calls of an async function by call type and arguments
+
+    Arguments named in ``normalize`` (e.g. artist names) are compared case-
+    and whitespace-insensitively, so "Drake" and "drake " share one lookup;
+    all other arguments must match exactly.
+    """
+    group = _groups.setdefault(call_type, SingleFlight())
+    normalized = frozenset(normalize)
+
+    def decorator(fn: Callable[..., Awaitable[Any]]):
+        signature = inspect.signature(fn)
+
+        def make_key(args: Tuple, kwargs: Dict[str, Any]) -> Hashable:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(sorted((name, _freeze(value, name in normalized)) for name, value in bound.arguments.items()))
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await group.do(make_key(args, kwargs), lambda: fn(*args, **kwargs))
+        wrapper.single_flight = group
+        return wrapper
+
+    return decorator
+
+def get_single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Call and coalescing counters for every single-flight group
+    """
+    return {call_type: group.stats() for call_type, group in _groups.items()}
@@ -0,0 +1,209 @@
+"""
+Spotify Service for MusiStash
+Async Spotify Web API client: client-credentials tokens, retries and bulk artist lookups
+"""
+
+import os
+import time
+import base64
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+
+from http_clients import upstream_clients
+from resilience import backoff_delay
+
+SPOTIFY_MAX_RETRIES = int(os.getenv("SPOTIFY_MAX_RETRIES", "3"))
+SPOTIFY_RETRY_BASE_DELAY = float(os.getenv("SPOTIFY_RETRY_BASE_DELAY", "0.5"))
+SPOTIFY_RETRY_MAX_DELAY = float(os.getenv("SPOTIFY_RETRY_MAX_DELAY", "10"))
+SPOTIFY_BATCH_WINDOW_MS = float(os.getenv("SPOTIFY_BATCH_WINDOW_MS", "10"))
+SPOTIFY_MAX_IDS_PER_REQUEST = 50
+# Refresh the access token this many seconds before Spotify says it expires
+TOKEN_REFRESH_MARGIN = 60
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class SpotifyAPIError(Exception):
+    """
+    Spotify request failure, with the HTTP status when there was a response
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class SpotifyClient:
+    """
+    Non-blocking replacement for the spotipy calls made from request handlers
+
+    Requests go through the shared ``spotify`` HTTP client. The client-credentials
+    token is fetched on first use, refreshed shortly before it expires and once
+    more if Spotify answers 401. 429 and 5xx responses are retried with backoff,
+    honouring Retry-After.
+
+    Single-artist lookups made within ``SPOTIFY_BATCH_WINDOW_MS`` of each other
+    are coalesced into one ``GET /v1/artists?ids=`` call (up to 50 ids), so a page
+    that loads many artists makes one request instead of one per artist.
+    """
+
+    def __init__(self, client_id: str, client_secret: str):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock: Optional[asyncio.Lock] = None
+        self._pending_ids: Dict[str, List[asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Batches in flight; the loop only keeps weak references to tasks
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self.stats = {"requests": 0, "token_refreshes": 0, "retries": 0, "coalesced_lookups": 0, "bulk_requests": 0}
+
+    # --- Authentication ---
+    async def _get_token(self, force_refresh: bool = False) -> str:
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            if not force_refresh and self._token and time.time() < self._token_expires_at - TOKEN_REFRESH_MARGIN:
+                return self._token
+
+            credentials = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
+            response = await upstream_clients.get("spotify_accounts").post(
+                "/api/token",
+                data={"grant_type": "client_credentials"},
+                headers={"Authorization": f"Basic {credentials}"}
+            )
+            if response.status_code != 200:
+                raise SpotifyAPIError(f"Token request failed: {response.status_code}", response.status_code)
+
+            token_data = response.json()
+            self._token = token_data["access_token"]
+            self._token_expires_at = time.time() + token_data.get("expires_in", 3600)
+            self.stats["token_refreshes"] += 1
+            return self._token
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        refreshed = False
+        for attempt in range(SPOTIFY_MAX_RETRIES + 1):
+            token = await self._get_token()
+            retry_after = None
+            self.stats["requests"] += 1
+            try:
+                response = await upstream_clients.get("spotify").get(
+                    f"/v1/{path}", params=params, headers={"Authorization": f"Bearer {token}"}
+                )
+            except httpx.TransportError as e:
+                error = SpotifyAPIError(f"Request failed: {e}")
+            else:
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code == 401 and not refreshed:
+                    # Token revoked or expired early; refresh once and retry straight away
+                    refreshed = True
+                    await self._get_token(force_refresh=True)
+                    continue
+
+                error = SpotifyAPIError(f"Spotify request failed: {response.status_code}", response.status_code)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    raise error
+                retry_after = response.headers.get("Retry-After")
+
+            if attempt == SPOTIFY_MAX_RETRIES:
+                raise error
+            self.stats["retries"] += 1
+            await asyncio.sleep(backoff_delay(attempt, SPOTIFY_RETRY_BASE_DELAY, SPOTIFY_RETRY_MAX_DELAY, retry_after))
+        raise SpotifyAPIError("Spotify request failed after token refresh", 401)
+
+    # --- Endpoints ---
+    async def search_artist(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        First artist matching ``query``, or None
+        """
+        results = await self._get("search", {"q": query, "type": "artist", "limit": 1})
+        items = results.get("artists", {}).get("items", [])
+        return items[0] if items else None
+
+    async def artist_top_tracks(self, artist_id: str, country: str = "US") -> List[Dict[str, Any]]:
+        results = await self._get(f"artists/{artist_id}/top-tracks", {"country": country})
+        return results.get("tracks", [])
+
+    async def artists(self, artist_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Full artist objects for ``artist_ids`` in the same order, None for unknown ids
+
+        Ids are sent 50 per request, and the chunks are fetched concurrently.
+        """
+        chunks = [artist_ids[i:i + SPOTIFY_MAX_IDS_PER_REQUEST]
+                  for i in range(0, len(artist_ids), SPOTIFY_MAX_IDS_PER_REQUEST)]
+        self.stats["bulk_requests"] += len(chunks)
+        responses = await asyncio.gather(*[self._get("artists", {"ids": ",".join(chunk)}) for chunk in chunks])
+        return [artist for response in responses for artist in response.get("artists", [])]
+
+    async def artist(self, artist_id: str) -> Optional[Dict[str, Any]]:
+        """
+        One artist, fetched together with any other lookups made in the same batch window
+        """
+        future = asyncio.get_running_loop().create_future()
+        waiters = self._pending_ids.setdefault(artist_id, [])
+        waiters.append(future)
+        if len(waiters) > 1:
+            self.stats["coalesced_lookups"] += 1
+
+        if len(self._pending_ids) >= SPOTIFY_MAX_IDS_PER_REQUEST:
+            self._flush_artist_batch()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                SPOTIFY_BATCH_WINDOW_MS / 1000, self._flush_artist_batch
+            )
+        return await future
+
+    def _flush_artist_batch(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending_ids = self._pending_ids, {}
+        if pending:
+            if len(pending) > 1:
+                self.stats["coalesced_lookups"] += len(pending) - 1
+            task = asyncio.ensure_future(self._send_artist_batch(pending))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_artist_batch(self, pending: Dict[str, List[asyncio.Future]]):
+        results: Dict[str, Any] = {}
+        error: Optional[BaseException] = None
+        try:
+            try:
+                artists = await self.artists(list(pending))
+            except SpotifyAPIError as e:
+                if e.status_code != 400 or len(pending) == 1:
+                    raise
+                # One malformed id rejects the whole request; look the ids up one by one instead
+                for artist_id in pending:
+                    await self._send_artist_batch({artist_id: pending[artist_id]})
+                return
+            results = dict(zip(pending, artists))
+        except Exception as e:
+            error = e
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            # Every waiter gets an answer, whatever happened to the batch
+            self._resolve(pending, results, error)
+
+    @staticmethod
+    def _resolve(pending: Dict[str, List[asyncio.Future]], results: Dict[str, Any], error: Optional[BaseException]):
+        for artist_id, waiters in pending.items():
+            for future in waiters:
+                if future.done():
+                    continue
+                if isinstance(error, asyncio.CancelledError):
+                    future.cancel()
+                elif error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results.get(artist_id))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "token_valid_for_seconds": max(0, int(self._token_expires_at - time.time()))}
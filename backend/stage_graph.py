@@ -0,0 +1,135 @@
+"""
+Stage Graph for MusiStash
+Runs enrichment stages as a small dependency graph of coroutines with per-stage timeouts
+"""
+
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+# Cumulative per-graph, per-stage outcome counts and latency for the metrics endpoints
+_stage_stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+def _record(label: str, stage_name: str, status: str, elapsed_ms: float):
+    stats = _stage_stats.setdefault(label, {}).setdefault(
+        stage_name, {"runs": 0, "timeouts": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+    )
+    stats["runs"] += 1
+    stats["total_ms"] += elapsed_ms
+    stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    if status == "timeout":
+        stats["timeouts"] += 1
+    elif status == "error":
+        stats["errors"] += 1
+
+def get_stage_stats() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Run counts, timeouts, errors and average/max latency for every stage seen so far
+    """
+    return {
+        label: {
+            name: {
+                "runs": int(stats["runs"]),
+                "timeouts": int(stats["timeouts"]),
+                "errors": int(stats["errors"]),
+                "avg_ms": round(stats["total_ms"] / stats["runs"], 1) if stats["runs"] else 0.0,
+                "max_ms": round(stats["max_ms"], 1)
+            }
+            for name, stats in stages.items()
+        }
+        for label, stages in _stage_stats.items()
+    }
+
+@dataclass
+class Stage:
+    """
+    One enrichment step
+
+    ``fn`` receives the results of ``depends_on`` as keyword arguments. If it
+    fails or exceeds ``timeout`` seconds, ``default`` is used as its result so
+    dependent stages still run. A stage with ``enabled=False`` is recorded as
+    skipped and yields ``default``.
+    """
+    name: str
+    fn: Callable[..., Awaitable[Any]]
+    timeout: float
+    depends_on: List[str] = field(default_factory=list)
+    default: Any = None
+    enabled: bool = True
+
+def _validate(stages: List[Stage]):
+    """
+    Reject duplicate names, unknown dependencies and cycles, which would otherwise wait forever
+    """
+    by_name = {stage.name: stage for stage in stages}
+    if len(by_name) != len(stages):
+        raise ValueError("Stage names must be unique")
+    for stage in stages:
+        missing = [dependency for dependency in stage.depends_on if dependency not in by_name]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages {missing}")
+
+    visiting, done = set(), set()
+
+    def visit(name: str, path: List[str]):
+        if name in done:
+            return
+        if name in visiting:
+            cycle = path[path.index(name):] + [name]
+            raise ValueError(f"Stage dependency cycle: {' -> '.join(cycle)}")
+        visiting.add(name)
+        for dependency in by_name[name].depends_on:
+            visit(dependency, path + [name])
+        visiting.discard(name)
+        done.add(name)
+
+    for stage in stages:
+        visit(stage.name, [])
+
+async def run_stages(stages: List[Stage], label: str = "") -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Run every stage as soon as its dependencies have finished
+
+    Stages without dependencies start immediately and concurrently, so the
+    total latency is the slowest path through the graph rather than the sum
+    of all stages. Returns ``(results, report)`` where ``report`` records each
+    stage's status (ok, timeout, error, skipped) and duration in milliseconds.
+    """
+    tasks: Dict[str, asyncio.Task] = {}
+    report: Dict[str, Dict[str, Any]] = {}
+
+    async def run(stage: Stage) -> Any:
+        inputs = {dependency: await tasks[dependency] for dependency in stage.depends_on}
+        if not stage.enabled:
+            report[stage.name] = {"status": "skipped", "ms": 0.0}
+            return stage.default
+
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            result = await asyncio.wait_for(stage.fn(**inputs), timeout=stage.timeout)
+        except asyncio.TimeoutError:
+            status, result = "timeout", stage.default
+            print(f"⏱️  {label} stage '{stage.name}' timed out after {stage.timeout}s")
+        except Exception as e:
+            status, result = "error", stage.default
+            print(f"❌ {label} stage '{stage.name}' failed: {e}")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        report[stage.name] = {"status": status, "ms": round(elapsed_ms, 1)}
+        _record(label, stage.name, status, elapsed_ms)
+        return result
+
+    _validate(stages)
+
+    # All tasks are created before any of them runs, so each can await its dependencies by name
+    for stage in stages:
+        tasks[stage.name] = asyncio.create_task(run(stage))
+
+    try:
+        results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return results, report
@@ -0,0 +1,9 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Keep tests from reading or writing the application's cache database
+os.environ.setdefault("DISK_CACHE_ENABLED", "false")
@@ -0,0 +1,84 @@
+import asyncio
+
+import httpx
+import pytest
+
+from artist_cache import ArtistMetadataCache, normalize_artist_name
+from http_clients import UpstreamConfig, upstream_clients
+from spotify_service import SpotifyClient
+
+def artist_object(artist_id: str, name: str = None) -> dict:
+    return {"id": artist_id, "name": name or artist_id.upper(), "followers": {"total": 10}, "popularity": 50}
+
+@pytest.fixture
+def spotify_requests():
+    """Mock Spotify API: ids that are not alphanumeric get a 400, like malformed ids do"""
+    requests = []
+
+    async def api(request: httpx.Request) -> httpx.Response:
+        requests.append((request.url.path, dict(request.url.params)))
+        if request.url.path == "/v1/search":
+            name = request.url.params["q"].replace("artist:", "")
+            items = [] if name.startswith("Nobody") else [artist_object(f"id{len(name)}", name)]
+            return httpx.Response(200, json={"artists": {"items": items}})
+        ids = request.url.params["ids"].split(",")
+        if any(not artist_id.isalnum() for artist_id in ids):
+            return httpx.Response(400)
+        return httpx.Response(200, json={"artists": [artist_object(artist_id) for artist_id in ids]})
+
+    async def accounts(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"access_token": "token", "expires_in": 3600})
+
+    originals = {name: upstream_clients.configs[name] for name in ("spotify", "spotify_accounts")}
+    upstream_clients.register("spotify", UpstreamConfig("http://spotify.test", "SPOTIFY"), transport=httpx.MockTransport(api))
+    upstream_clients.register("spotify_accounts", UpstreamConfig("http://accounts.test", "SPOTIFY_ACCOUNTS"),
+                              transport=httpx.MockTransport(accounts))
+    yield requests
+    for name, config in originals.items():
+        upstream_clients.register(name, config)
+
+def make_cache() -> ArtistMetadataCache:
+    cache = ArtistMetadataCache(SpotifyClient("id", "secret"))
+    for tier in (cache.artists, cache.names, cache.top_tracks):
+        tier.disk = None
+    return cache
+
+def test_warm_fetches_ids_in_one_bulk_request(spotify_requests):
+    cache = make_cache()
+    rows = [{"spotify_id": f"a{i}", "name": f"Artist {i}"} for i in range(5)]
+
+    result = asyncio.run(cache.warm(rows))
+    assert result["artists_warmed"] == 5
+    assert len(spotify_requests) == 1
+    assert cache.names.get(normalize_artist_name("Artist 3")) == "a3"
+
+def test_warm_skips_rejected_id_and_keeps_the_rest(spotify_requests):
+    cache = make_cache()
+    rows = [{"spotify_id": "a1", "name": "One"}, {"spotify_id": "bad-id", "name": "Bad"}, {"spotify_id": "a2"}]
+
+    result = asyncio.run(cache.warm(rows))
+    assert result["artists_warmed"] == 2
+    assert result["artists_failed"] == 1
+    assert cache.artists.get("a1")["id"] == "a1"
+    assert cache.artists.get("bad-id") is None
+
+def test_warm_resolves_rows_without_spotify_id_by_name(spotify_requests):
+    cache = make_cache()
+    cache.names.set(normalize_artist_name("Indexed Artist"), "indexed1")
+    rows = [{"name": "Indexed Artist"}, {"name": "Searched Artist"}, {"name": "Nobody Knows"}]
+
+    result = asyncio.run(cache.warm(rows))
+    assert cache.artists.get("indexed1")["id"] == "indexed1"
+    assert result["artists_warmed"] == 1
+    assert result["found_by_name"] == 1
+    assert result["not_found_by_name"] == 1
+    searched_id = cache.names.get(normalize_artist_name("Searched Artist"))
+    assert cache.artists.get(searched_id)["name"] == "Searched Artist"
+
+def test_warm_leaves_fresh_artists_alone(spotify_requests):
+    cache = make_cache()
+    cache.artists.set("a1", artist_object("a1"))
+
+    result = asyncio.run(cache.warm([{"spotify_id": "a1", "name": "One"}]))
+    assert result["already_cached"] == 1
+    assert spotify_requests == []
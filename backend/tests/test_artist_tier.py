@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+import main
+from cache_service import TieredCache
+
+def profile(**overrides):
+    data = {
+        "instagram_followers": 0,
+        "net_worth_millions": 0,
+        "youtube_subscribers": 0,
+        "career_achievements": [],
+        "major_awards": [],
+        "monthly_streams_millions": 0,
+        "top_song_streams_billions": 0.0
+    }
+    data.update(overrides)
+    return data
+
+@pytest.fixture
+def enhanced_data(monkeypatch):
+    """Replaces the YouTube/Gemini lookup; set ``enhanced_data.value`` to the dict it returns"""
+    class Source:
+        value = profile()
+
+    async def fake(artist_name):
+        return dict(Source.value)
+
+    monkeypatch.setattr(main, "get_enhanced_artist_data_with_gemini", fake)
+    return Source
+
+@pytest.fixture
+def tier_cache(monkeypatch):
+    cache = TieredCache("artist_tiers_test", default_ttl=main.TIER_CACHE_TTL, persist=False)
+    monkeypatch.setattr(main, "artist_tier_cache", cache)
+    return cache
+
+@pytest.mark.parametrize("followers, popularity, overrides, tier", [
+    (10_000, 20, {}, "Emerging"),
+    (150_000, 20, {}, "Developing"),
+    (10_000, 95, {}, "Viral Sensation"),
+    (2_000_000, 50, {}, "Rising Star"),
+    (6_000_000, 50, {}, "Established"),
+    (1_000, 10, {"net_worth_millions": 120}, "Megastar"),
+    (60_000_000, 90, {}, "Superstar"),
+    (90_000_000, 95, {}, "Global Icon"),
+    (40_000_000, 90, {"instagram_followers": 80_000_000, "net_worth_millions": 60, "youtube_subscribers": 20_000_000}, "Global Icon"),
+])
+def test_enhanced_tier_thresholds(enhanced_data, followers, popularity, overrides, tier):
+    enhanced_data.value = profile(**overrides)
+    result = asyncio.run(main.calculate_enhanced_artist_tier(f"Tier Artist {tier}", followers, popularity))
+    assert result["tier"] == tier
+
+def test_full_tier_is_stored_for_cache_ttl(enhanced_data, tier_cache):
+    enhanced_data.value = profile(instagram_followers=5_000_000)
+    asyncio.run(main.get_artist_tier("Full Data Artist", 2_000_000, 60))
+    entry = tier_cache.get_entry("full data artist")
+    assert entry.expires_at - entry.stored_at == pytest.approx(main.TIER_CACHE_TTL)
+
+def test_tier_without_gemini_data_is_stored_briefly(enhanced_data, tier_cache):
+    enhanced_data.value = profile(fallback_data=True)
+    asyncio.run(main.get_artist_tier("No Gemini Artist", 2_000_000, 60))
+    entry = tier_cache.get_entry("no gemini artist")
+    assert entry.expires_at - entry.stored_at == pytest.approx(main.TIER_FALLBACK_TTL)
+
+def test_basic_fallback_tier_is_stored_briefly():
+    assert main.tier_cache_ttl(main.calculate_artist_tier(2_000_000, 60)) == main.TIER_FALLBACK_TTL
+
+def test_stored_tier_is_reused_until_inputs_change(enhanced_data, tier_cache, monkeypatch):
+    calls = []
+    calculate = main.calculate_enhanced_artist_tier
+
+    async def counting(artist_name, followers, popularity):
+        calls.append(followers)
+        return await calculate(artist_name, followers, popularity)
+
+    monkeypatch.setattr(main, "calculate_enhanced_artist_tier", counting)
+
+    async def run():
+        await main.get_artist_tier("Stable Artist", 2_000_000, 60)
+        await main.get_artist_tier("Stable Artist", 2_050_000, 62)  # within both thresholds
+        await main.get_artist_tier("Stable Artist", 2_500_000, 62)  # followers moved > 5%
+
+    asyncio.run(run())
+    assert calls == [2_000_000, 2_500_000]
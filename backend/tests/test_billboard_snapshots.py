@@ -0,0 +1,93 @@
+import asyncio
+import sys
+import types
+from datetime import datetime, timezone
+
+import pytest
+
+import cache_service
+
+class FakeEntry:
+    def __init__(self, artist: str, rank: int):
+        self.title = f"Song {rank}"
+        self.artist = artist
+        self.rank = rank
+        self.peakPos = rank
+        self.weeks = 3
+        self.lastWeek = rank + 1
+
+class FakeChartData:
+    """Stands in for billboard.ChartData; tests set ``date`` to simulate a new release"""
+    date = "2026-10-17"
+    fetches = []
+
+    def __init__(self, name: str):
+        FakeChartData.fetches.append(name)
+        self.date = FakeChartData.date
+        self.entries = [FakeEntry("Drake", 1), FakeEntry("Taylor Swift", 2), FakeEntry("Drake featuring Future", 3)]
+
+    def __iter__(self):
+        return iter(self.entries)
+
+sys.modules.setdefault("billboard", types.SimpleNamespace(ChartData=FakeChartData))
+import billboard_service  # noqa: E402
+from billboard_service import ChartSnapshotStore  # noqa: E402
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(billboard_service, "ChartData", FakeChartData)
+    monkeypatch.setattr(FakeChartData, "date", "2026-10-17")
+    FakeChartData.fetches.clear()
+    snapshots = ChartSnapshotStore()
+    snapshots.cache.disk = None
+    return snapshots
+
+def set_week(monkeypatch, day: int):
+    monkeypatch.setattr(billboard_service, "current_chart_week_start",
+                        lambda now=None: datetime(2026, 10, day, 17, tzinfo=timezone.utc))
+    monkeypatch.setattr(billboard_service, "seconds_until_next_chart_week", lambda now=None: 7 * 24 * 3600)
+
+def expire(monkeypatch, seconds: float):
+    now = cache_service.time.time() + seconds
+    monkeypatch.setattr(cache_service.time, "time", lambda: now)
+
+def test_concurrent_lookups_fetch_chart_once(store):
+    async def run():
+        return await asyncio.gather(*[store.search("hot-100", lambda artist: "Drake" in artist) for _ in range(10)])
+
+    results = asyncio.run(run())
+    assert FakeChartData.fetches == ["hot-100"]
+    assert [entry["rank"] for entry in results[0]] == [1, 3]
+
+def test_returned_entries_do_not_share_the_snapshot(store):
+    async def run():
+        top = await store.top("hot-100", 2)
+        top[0]["artist"] = "Changed"
+        top.append({"artist": "Extra"})
+        return await store.top("hot-100", 10)
+
+    assert [entry["artist"] for entry in asyncio.run(run())] == ["Drake", "Taylor Swift", "Drake featuring Future"]
+
+def test_unpublished_chart_is_retried_until_date_changes(store, monkeypatch):
+    set_week(monkeypatch, 13)
+    asyncio.run(store.top("hot-100", 1))
+
+    # A new week starts, but Billboard still serves last week's chart
+    set_week(monkeypatch, 20)
+    expire(monkeypatch, 7 * 24 * 3600)
+
+    async def refresh():
+        await store.top("hot-100", 1)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(refresh())
+    assert len(FakeChartData.fetches) == 2
+    entry = store.cache.get_entry("hot-100")
+    assert entry.value["week_of"].startswith("2026-10-13")
+    assert entry.expires_at - cache_service.time.time() <= billboard_service.CHART_NOT_PUBLISHED_RETRY_SECONDS
+
+    monkeypatch.setattr(FakeChartData, "date", "2026-10-24")
+    expire(monkeypatch, billboard_service.CHART_NOT_PUBLISHED_RETRY_SECONDS)
+    asyncio.run(refresh())
+    assert len(FakeChartData.fetches) == 3
+    assert store.cache.get_entry("hot-100").value["week_of"].startswith("2026-10-20")
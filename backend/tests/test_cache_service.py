@@ -0,0 +1,283 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import cache_service
+from cache_service import DiskCache, TieredCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_service.time, "time", fake)
+    return fake
+
+@pytest.fixture
+def disk(tmp_path):
+    return DiskCache(str(tmp_path / "cache.sqlite3"))
+
+def make_cache(namespace: str, disk=None, **kwargs) -> TieredCache:
+    cache = TieredCache(namespace, persist=False, **kwargs)
+    cache.disk = disk
+    return cache
+
+def test_entry_expires_after_ttl(clock):
+    cache = make_cache("ttl", default_ttl=10)
+    cache.set("a", {"x": 1})
+    assert cache.get("a") == {"x": 1}
+
+    clock.now += 10
+    assert cache.get("a") is None
+    assert cache.get_entry("a") is None
+    assert len(cache) == 0
+
+def test_stale_entry_is_served_until_stale_window_ends(clock):
+    cache = make_cache("stale", default_ttl=10, stale_ttl=20)
+    cache.set("a", 1)
+
+    clock.now += 15
+    entry = cache.get_entry("a")
+    assert entry is not None and not entry.is_fresh
+    assert cache.get("a") is None
+    assert cache.stats.stale_hits == 2
+
+    clock.now += 15
+    assert cache.get_entry("a") is None
+
+def test_negative_entry_expires_without_stale_window(clock):
+    cache = make_cache("negative", default_ttl=10, stale_ttl=100)
+    cache.set("a", None, ttl=5, negative=True)
+    assert cache.get_entry("a").negative
+    assert cache.get("a", "default") == "default"
+
+    clock.now += 5
+    assert cache.get_entry("a") is None
+
+def test_lru_evicts_least_recently_used():
+    cache = make_cache("lru", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a becomes most recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats.evictions == 1
+
+def test_disk_round_trip(disk):
+    cache = make_cache("round_trip", disk=disk, max_entries=10)
+    cache.set("a", {"genres": ["pop"]})
+    disk.flush()
+
+    restarted = make_cache("round_trip", disk=disk, max_entries=10)
+    assert restarted.get("a") == {"genres": ["pop"]}
+    assert restarted.stats.disk_hits == 1
+
+def test_disk_reads_see_buffered_writes_and_deletes(disk):
+    cache = make_cache("buffered", disk=disk)
+    cache.set("a", 1)
+    assert disk.get("buffered", "a").value == 1
+
+    cache.delete("a")
+    assert disk.get("buffered", "a") is None
+    disk.flush()
+    assert disk.get("buffered", "a") is None
+
+def test_disk_writes_are_committed_in_batches(disk):
+    cache = make_cache("batched", disk=disk)
+    commits = disk.commits
+    for i in range(50):
+        cache.set(f"key{i}", i)
+    assert disk.flush() == 50
+    assert disk.commits == commits + 1
+
+def test_negative_entries_are_not_persisted(disk):
+    cache = make_cache("negative_disk", disk=disk)
+    cache.set("a", None, ttl=60, negative=True)
+    disk.flush()
+    assert disk.get("negative_disk", "a") is None
+
+def test_negative_entries_can_be_persisted(disk):
+    cache = make_cache("negative_kept", disk=disk, persist_negative=True)
+    cache.set("a", None, ttl=60, negative=True)
+    disk.flush()
+
+    restarted = make_cache("negative_kept", disk=disk, persist_negative=True)
+    entry = restarted.get_entry("a")
+    assert entry is not None and entry.negative
+    assert [key for key, entry in disk.items("negative_kept") if entry.negative] == ["a"]
+
+def test_disk_cache_adds_negative_column_to_old_databases(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE cache_entries (
+            namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, stored_at REAL NOT NULL,
+            expires_at REAL NOT NULL, stale_until REAL NOT NULL, PRIMARY KEY (namespace, key)
+        )
+    """)
+    conn.execute("INSERT INTO cache_entries VALUES ('old', 'a', '1', 0, 1e12, 1e12)")
+    conn.commit()
+    conn.close()
+
+    disk = DiskCache(path)
+    assert disk.get("old", "a").value == 1
+    assert not disk.get("old", "a").negative
+
+def test_load_from_disk_skips_unusable_entries(disk, clock):
+    cache = make_cache("warm", disk=disk, default_ttl=10)
+    cache.set("old", 1)
+    clock.now += 5
+    cache.set("new", 2)
+    clock.now += 6
+
+    restarted = make_cache("warm", disk=disk, default_ttl=10)
+    assert restarted.load_from_disk() == 1
+    assert restarted.get("new") == 2
+
+def test_async_lookup_reads_disk_in_worker_thread(disk):
+    cache = make_cache("async", disk=disk)
+    cache.set("a", [1, 2])
+    disk.flush()
+    restarted = make_cache("async", disk=disk)
+
+    assert asyncio.run(restarted.aget("a")) == [1, 2]
+
+def test_get_or_load_loads_once_and_returns_copies():
+    cache = make_cache("load")
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"items": [1]}
+
+    async def run():
+        first, second = await asyncio.gather(cache.get_or_load("k", loader), cache.get_or_load("k", loader))
+        first["items"].append(2)
+        return second, await cache.get_or_load("k", loader)
+
+    second, third = asyncio.run(run())
+    assert len(calls) == 1
+    assert second == {"items": [1]}
+    assert third == {"items": [1]}
+
+def test_get_or_load_caches_none_negatively():
+    cache = make_cache("load_negative")
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return None
+
+    async def run():
+        await cache.get_or_load("k", loader, negative_ttl=60)
+        return await cache.get_or_load("k", loader, negative_ttl=60)
+
+    assert asyncio.run(run()) is None
+    assert len(calls) == 1
+
+def test_stale_entry_is_served_while_refreshing(clock):
+    cache = make_cache("swr", default_ttl=10, stale_ttl=100)
+    cache.set("k", "old")
+    clock.now += 20
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return "new"
+
+    async def run():
+        served = await cache.get_or_load("k", loader)
+        await asyncio.gather(*cache._refreshing.values())
+        return served, await cache.get_or_load("k", loader)
+
+    assert asyncio.run(run()) == ("old", "new")
+    assert len(calls) == 1
+    assert cache.stats.background_refreshes == 1
+
+def test_failed_refresh_keeps_serving_stale_entry(clock):
+    cache = make_cache("swr_failure", default_ttl=10, stale_ttl=100)
+    cache.set("k", "old")
+    clock.now += 20
+
+    async def loader():
+        raise RuntimeError("upstream down")
+
+    async def run():
+        first = await cache.get_or_load("k", loader)
+        await asyncio.gather(*cache._refreshing.values())
+        return first, await cache.get_or_load("k", loader)
+
+    assert asyncio.run(run()) == ("old", "old")
+    assert cache.stats.refresh_failures >= 1
+
+# --- Google Places caches in main.py ---
+@pytest.fixture
+def places(monkeypatch):
+    """Points the places client at a mock; ``places.statuses`` maps place_id to the Details status returned"""
+    import httpx
+    import main
+    from http_clients import UpstreamConfig, upstream_clients
+
+    state = type("PlacesMock", (), {})()
+    state.main = main
+    state.requests = []
+    state.statuses = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state.requests.append((request.url.path, dict(request.url.params)))
+        if request.url.path.endswith("/details/json"):
+            status = state.statuses.get(request.url.params["place_id"], "OK")
+            if isinstance(status, int):
+                return httpx.Response(status)
+            return httpx.Response(200, json={"status": status, "result": {"name": "Venue"} if status == "OK" else {}})
+        return httpx.Response(200, json={"status": "OK", "results": [{"place_id": "p1", "name": "Venue"}]})
+
+    original = upstream_clients.configs["places"]
+    upstream_clients.register("places", UpstreamConfig("http://places.test", "PLACES"), transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(main, "venue_search_cache", make_cache("venue_searches_test", default_ttl=60))
+    monkeypatch.setattr(main, "place_details_cache", make_cache("place_details_test", default_ttl=60))
+    yield state
+    upstream_clients.register("places", original)
+
+def test_place_details_caches_only_missing_places_negatively(places):
+    places.statuses = {"gone": "NOT_FOUND", "busy": "OVER_QUERY_LIMIT", "down": 503}
+    get_details = places.main.get_place_details_cached
+
+    async def run():
+        assert await get_details("gone", "key") is None
+        assert await get_details("gone", "key") is None
+        for place_id in ("busy", "down"):
+            for _ in range(2):
+                with pytest.raises(places.main.HTTPException):
+                    await get_details(place_id, "key")
+        assert await get_details("ok", "key") == {"name": "Venue"}
+        assert await get_details("ok", "key") == {"name": "Venue"}
+
+    asyncio.run(run())
+    requested = [params["place_id"] for _, params in places.requests]
+    # Missing and found places are looked up once; quota and server errors are retried every time
+    assert requested == ["gone", "busy", "busy", "down", "down", "ok"]
+    assert places.main.place_details_cache.get_entry("gone").negative
+
+def test_venue_searches_are_keyed_by_normalized_location_and_types(places):
+    search = places.main.search_places_cached
+
+    async def run():
+        await search("Austin, TX", "", "key")
+        await search("austin tx", "", "key")
+        await search("Austin TX", "jazz", "key")
+
+    asyncio.run(run())
+    queries = [params["query"] for _, params in places.requests]
+    assert queries == ["music venues, concert halls, clubs in Austin, TX",
+                       "music venues, concert halls, clubs in Austin TX jazz"]
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import gemini_analysis_service as gemini
+from gemini_analysis_service import GeminiBatcher
+from gemini_schemas import ArtistGenres
+from http_clients import UpstreamConfig, upstream_clients
+from resilience import CircuitBreaker
+
+TEMPLATE = "List the genres of each of these artists: {artist_names}"
+
+@pytest.fixture
+def gemini_requests(monkeypatch):
+    """Serve batch prompts from a mock transport; returns the list of artist lists requested"""
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["contents"][0]["parts"][0]["text"]
+        names = json.loads(prompt[prompt.index("["):])
+        requests.append(names)
+        entries = [{"artist": name, "genres": [f"{name.lower()} core"]} for name in names]
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": json.dumps(entries)}]}}]})
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(gemini, "gemini_circuit_breaker", CircuitBreaker("gemini-test"))
+    original = upstream_clients.configs["gemini"]
+    upstream_clients.register("gemini", UpstreamConfig("http://gemini.test", "GEMINI"),
+                              transport=httpx.MockTransport(handler))
+    yield requests
+    upstream_clients.register("gemini", original)
+
+def test_concurrent_submits_share_one_request(gemini_requests):
+    batcher = GeminiBatcher("genres", TEMPLATE, ArtistGenres, tokens_per_artist=40, window_ms=20)
+    names = ["Batch Artist A", "Batch Artist B", "Batch Artist C"]
+
+    async def run():
+        return await asyncio.gather(*[batcher.submit(name) for name in names + ["batch artist a"]])
+
+    results = asyncio.run(run())
+    assert len(gemini_requests) == 1
+    assert sorted(gemini_requests[0]) == sorted(names)
+    assert results == [{"genres": [f"{name.lower()} core"]} for name in names] + [{"genres": ["batch artist a core"]}]
+    assert batcher.batches_sent == 1
+
+def test_full_batch_is_sent_without_waiting_for_window(gemini_requests):
+    batcher = GeminiBatcher("genres", TEMPLATE, ArtistGenres, tokens_per_artist=40, max_batch_size=2, window_ms=10_000)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.submit("Full Batch One"), batcher.submit("Full Batch Two")), timeout=2
+        )
+
+    assert asyncio.run(run()) == [{"genres": ["full batch one core"]}, {"genres": ["full batch two core"]}]
+    assert len(gemini_requests) == 1
+
+def test_failed_batch_resolves_every_waiter(gemini_requests, monkeypatch):
+    batcher = GeminiBatcher("genres", TEMPLATE, ArtistGenres, tokens_per_artist=40, window_ms=10)
+
+    async def broken_request(names):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(batcher, "_request", broken_request)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.submit("Broken One"), batcher.submit("Broken Two"), return_exceptions=True),
+            timeout=2
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert not batcher._tasks
+
+def test_entry_cut_off_by_token_limit_is_asked_for_again(gemini_requests, monkeypatch):
+    batcher = GeminiBatcher("genres", TEMPLATE, ArtistGenres, tokens_per_artist=40, window_ms=10)
+    replies = iter([
+        '[{"artist": "Cut One", "genres": ["one core"]}, {"artist": "Cut Two", "genres": ["two',
+        '[{"artist": "Cut Two", "genres": ["two core", "two wave"]}]'
+    ])
+
+    async def truncated_reply(prompt, generation_config=None):
+        gemini_requests.append(prompt)
+        return next(replies)
+
+    monkeypatch.setattr(gemini, "generate_content", truncated_reply)
+
+    async def run():
+        return await asyncio.gather(batcher.submit("Cut One"), batcher.submit("Cut Two"))
+
+    assert asyncio.run(run()) == [{"genres": ["one core"]}, {"genres": ["two core", "two wave"]}]
+    assert len(gemini_requests) == 2
@@ -0,0 +1,70 @@
+import asyncio
+
+import httpx
+import pytest
+
+import gemini_analysis_service as gemini
+from http_clients import UpstreamConfig, upstream_clients
+from resilience import CircuitBreaker
+
+@pytest.fixture
+def breaker(monkeypatch):
+    fresh = CircuitBreaker("gemini-test", failure_threshold=1, reset_timeout=0)
+    monkeypatch.setattr(gemini, "gemini_circuit_breaker", fresh)
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    original = upstream_clients.configs["gemini"]
+    yield fresh
+    upstream_clients.register("gemini", original)
+
+def hanging_transport() -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(60)
+        return httpx.Response(200, json={})
+
+    return httpx.MockTransport(handler)
+
+def test_cancelled_half_open_call_settles_breaker(breaker):
+    upstream_clients.register("gemini", UpstreamConfig("http://gemini.test", "GEMINI"), transport=hanging_transport())
+    breaker.record_failure()
+    breaker.reset_timeout = 30
+
+    async def run():
+        breaker.opened_at -= 30
+        task = asyncio.ensure_future(gemini.generate_content("prompt"))
+        await asyncio.sleep(0.05)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_dropped_stream_settles_breaker(breaker):
+    upstream_clients.register("gemini", UpstreamConfig("http://gemini.test", "GEMINI"), transport=hanging_transport())
+
+    async def run():
+        async def consume():
+            async for _ in gemini.stream_content("prompt"):
+                pass
+
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert breaker.failures == 1
+    assert breaker.state == CircuitBreaker.OPEN
+
+@pytest.mark.parametrize("body", [b"<html>proxy error</html>", b'{"candidates": []}', b'{"candidates": [{"content": {}}]}'])
+def test_unusable_success_body_raises_gemini_error(breaker, body):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=body)
+
+    upstream_clients.register("gemini", UpstreamConfig("http://gemini.test", "GEMINI"), transport=httpx.MockTransport(handler))
+    with pytest.raises(gemini.GeminiAPIError):
+        asyncio.run(gemini.generate_content("prompt"))
+    # Gemini answered, so the breaker counts the call as a success
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,30 @@
+import json
+from typing import List
+
+import pytest
+
+from gemini_schemas import ArtistProfileEntry, decode_json, gemini_response_schema, repair_json
+
+@pytest.mark.parametrize("truncated, expected", [
+    ('{"a": 1, "b": "unfinished', {"a": 1, "b": "unfinished"}),
+    ('{"a": 1, "b": tr', {"a": 1}),
+    ('{"a": 1, "b": nul', {"a": 1}),
+    ('{"a": 1, "b": 12', {"a": 1}),
+    ('{"a": 1, "b": -0.5e', {"a": 1}),
+    ('{"a": 1, "b": true', {"a": 1, "b": True}),
+    ('{"a": [1, 2, 3', {"a": [1, 2]}),
+    ('{"a": {"c": 2, "d": fal', {"a": {"c": 2}}),
+    ('{"a": 1, "b":', {"a": 1}),
+    ('{"a": 1, "b"', {"a": 1}),
+    ('{"a": 1,', {"a": 1}),
+    ('Here you go: [{"artist": "A"}, {"artist": "B", "net', [{"artist": "A"}, {"artist": "B"}]),
+])
+def test_repair_json_drops_incomplete_tail(truncated, expected):
+    assert json.loads(repair_json(truncated)) == expected
+
+def test_repair_json_ignores_text_after_complete_value():
+    assert decode_json('{"a": [1, 2]} trailing notes') == {"a": [1, 2]}
+
+def test_artist_is_first_in_profile_schema():
+    schema = gemini_response_schema(List[ArtistProfileEntry])
+    assert schema["items"]["propertyOrdering"][0] == "artist"
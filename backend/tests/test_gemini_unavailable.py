@@ -0,0 +1,47 @@
+"""
+main.py when gemini_analysis_service failed to import: Gemini features fall back instead of raising NameError
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+@pytest.fixture
+def without_gemini(monkeypatch):
+    monkeypatch.setattr(main, "GEMINI_AVAILABLE", False)
+    for name in ("generate_content", "call_gemini_api", "GeminiAPIError", "GeminiUnavailableError",
+                 "genre_batcher", "artist_profile_batcher", "gemini_service"):
+        monkeypatch.delattr(main, name, raising=False)
+
+def test_email_drafts_skip_gemini(without_gemini, monkeypatch):
+    monkeypatch.setattr(main, "SUPABASE_AVAILABLE", True)
+    monkeypatch.setattr(main, "gemini_api_key", "configured-key")
+    monkeypatch.setattr(main, "openai_api_key", "dummy_key")
+
+    response = TestClient(main.app).post("/api/agent/email-drafts", json={"artist_id": "a1", "draft_type": "venue"})
+    assert response.status_code == 500
+    assert response.json()["detail"] == "No AI API key available."
+
+def test_enhanced_artist_data_uses_defaults(without_gemini, monkeypatch):
+    async def youtube(artist_name):
+        return {"subscriber_count": 1234, "fallback_data": False}
+
+    monkeypatch.setattr(main, "get_youtube_channel_data", youtube)
+    data = asyncio.run(main.get_enhanced_artist_data_with_gemini("No Gemini Import Artist"))
+    assert data["youtube_subscribers"] == 1234
+    assert data["net_worth_millions"] == 0
+    assert data["fallback_data"] is True
+
+def test_genres_fall_back_without_gemini(without_gemini):
+    genres, sources = asyncio.run(main.resolve_genres_from_sources("Unknown Import Band", [], lastfm_data=None,
+                                                                   lastfm_prefetched=True))
+    assert sources == ["fallback"]
+    assert set(genres) == {"pop", "contemporary"}
+
+def test_venue_enhancement_without_gemini(without_gemini):
+    venues = [{"name": "Hall", "types": ["bar"], "rating": 4.2, "estimated_capacity": "100-300", "location": "Austin"}]
+    enhanced = asyncio.run(main.enhance_venues_with_gemini(venues, "indie", "100-300"))
+    assert enhanced[0]["genre_suitability"] == 7
@@ -0,0 +1,45 @@
+import asyncio
+
+from genre_store import GenreStore
+
+def make_store():
+    calls = []
+
+    async def resolver(artist_name, spotify_genres, **prefetched):
+        calls.append((artist_name, list(spotify_genres), prefetched))
+        if spotify_genres:
+            return list(spotify_genres) + ["indie"], ["spotify", "lastfm"]
+        return ["indie"], ["lastfm"]
+
+    return GenreStore(resolver), calls
+
+def test_stored_record_is_served_without_resolving():
+    store, calls = make_store()
+
+    async def run():
+        first = await store.get("Some Band", ["rock"])
+        second = await store.get("some  band", ["rock"])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == ["rock", "indie"]
+    assert len(calls) == 1
+
+def test_record_without_spotify_is_resolved_again_with_spotify_genres():
+    store, calls = make_store()
+
+    async def run():
+        without = await store.get("Late Spotify Band", [])
+        with_spotify = await store.get("Late Spotify Band", ["shoegaze"])
+        again = await store.get("Late Spotify Band", ["shoegaze"])
+        return without, with_spotify, again
+
+    without, with_spotify, again = asyncio.run(run())
+    assert without == ["indie"]
+    assert with_spotify == again == ["shoegaze", "indie"]
+    assert len(calls) == 2
+
+def test_prefetched_sources_are_passed_to_resolver():
+    store, calls = make_store()
+    asyncio.run(store.get("Prefetch Band", ["pop"], lastfm_data={"tags": []}, lastfm_prefetched=True))
+    assert calls[0][2] == {"lastfm_data": {"tags": []}, "lastfm_prefetched": True}
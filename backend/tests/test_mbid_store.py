@@ -0,0 +1,56 @@
+import asyncio
+
+import httpx
+import pytest
+
+from cache_service import DiskCache
+from http_clients import UpstreamConfig, upstream_clients
+from mbid_store import MBIDStore
+
+@pytest.fixture
+def musicbrainz():
+    """Mock MusicBrainz search; returns the list of queries made"""
+    queries = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        query = request.url.params["query"]
+        queries.append(query)
+        artists = [] if query.startswith("Unknown") else [{"id": f"mbid-{query.lower()}"}]
+        return httpx.Response(200, json={"artists": artists})
+
+    original = upstream_clients.configs["musicbrainz"]
+    upstream_clients.register("musicbrainz", UpstreamConfig("http://musicbrainz.test", "MUSICBRAINZ"),
+                              transport=httpx.MockTransport(handler))
+    yield queries
+    upstream_clients.register("musicbrainz", original)
+
+def make_store(disk=None) -> MBIDStore:
+    store = MBIDStore()
+    store.cache.disk = disk
+    store.limiter.capacity = store.limiter.tokens = 100
+    return store
+
+def test_not_found_names_survive_restart(musicbrainz, tmp_path):
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"))
+    store = make_store(disk)
+    assert asyncio.run(store.resolve("Unknown Band")) is None
+    disk.flush()
+
+    restarted = make_store(disk)
+    restarted.cache._memory.clear()
+    assert asyncio.run(restarted.resolve_many(["Unknown Band"]))["already_stored"] == 1
+    assert asyncio.run(restarted.resolve("Unknown Band")) is None
+    assert musicbrainz == ["Unknown Band"]
+
+def test_lookup_miss_resolves_in_background(musicbrainz):
+    store = make_store()
+
+    async def run():
+        assert await store.lookup("Known Band") is None
+        assert len(store._tasks) == 1
+        await asyncio.gather(*store._tasks)
+        return await store.lookup("Known Band")
+
+    assert asyncio.run(run()) == "mbid-known band"
+    assert not store._tasks
+    assert store.stats["background_resolutions"] == 1
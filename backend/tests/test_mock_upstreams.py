@@ -0,0 +1,145 @@
+"""
+Smoke and load tests that run the registry clients against mock_upstream_server.py over real HTTP
+"""
+
+import asyncio
+import importlib
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+
+import gemini_analysis_service as gemini
+import spotify_service
+import upstreams
+from gemini_analysis_service import GeminiAPIError, GeminiBatcher, GeminiUnavailableError
+from gemini_schemas import ArtistGenres
+from http_clients import UpstreamConfig, upstream_clients
+from mock_upstream_server import create_app
+from resilience import CircuitBreaker
+from spotify_service import SpotifyAPIError, SpotifyClient
+
+# Registry name -> (base URL setting in upstreams, env prefix)
+MOCKED_UPSTREAMS = {
+    "gemini": ("GEMINI_API_BASE_URL", "GEMINI"),
+    "spotify": ("SPOTIFY_API_BASE_URL", "SPOTIFY_HTTP"),
+    "spotify_accounts": ("SPOTIFY_ACCOUNTS_BASE_URL", "SPOTIFY_ACCOUNTS_HTTP")
+}
+
+@pytest.fixture(scope="module")
+def mock_server():
+    """mock_upstream_server.py on a free local port, with no latency or errors until a test configures them"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(create_app("fast", seed=7), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        assert time.monotonic() < deadline, "mock upstream server did not start"
+        time.sleep(0.02)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(timeout=5)
+
+@pytest.fixture
+def mock(mock_server, monkeypatch):
+    """
+    Points the registry clients at the mock through MOCK_UPSTREAMS_URL; returns a control client
+    """
+    monkeypatch.setenv("MOCK_UPSTREAMS_URL", mock_server)
+    monkeypatch.setenv("GEMINI_API_KEY", "mock-key")
+    importlib.reload(upstreams)
+    originals = {name: upstream_clients.configs[name] for name in MOCKED_UPSTREAMS}
+    for name, (setting, prefix) in MOCKED_UPSTREAMS.items():
+        upstream_clients.register(name, UpstreamConfig(getattr(upstreams, setting), prefix))
+    monkeypatch.setattr(gemini, "GEMINI_MODEL_URL",
+                        f"{upstreams.GEMINI_API_BASE_URL}/v1beta/models/gemini-2.0-flash:generateContent")
+    monkeypatch.setattr(gemini, "gemini_circuit_breaker", CircuitBreaker("gemini-mock", failure_threshold=2))
+    monkeypatch.setattr(gemini, "GEMINI_RETRY_MAX_DELAY", 0.01)
+    monkeypatch.setattr(spotify_service, "SPOTIFY_RETRY_MAX_DELAY", 0.01)
+
+    with httpx.Client(base_url=mock_server) as control:
+        control.post("/__mock__/reset")
+        yield control
+        control.post("/__mock__/config", json={name: {"median_ms": 0, "sigma": 0, "error_rate": 0}
+                                               for name in control.get("/__mock__/config").json()})
+
+    for name, config in originals.items():
+        upstream_clients.register(name, config)
+    monkeypatch.undo()
+    importlib.reload(upstreams)
+
+def configure(control: httpx.Client, **services):
+    control.post("/__mock__/config", json=services).raise_for_status()
+
+def mock_stats(control: httpx.Client, service: str) -> dict:
+    return control.get("/__mock__/stats").json()[service]
+
+def test_clients_are_served_from_fixtures(mock):
+    client = SpotifyClient("id", "secret")
+    batcher = GeminiBatcher("genres_mock", "List the genres of each of these artists: {artist_names}",
+                            ArtistGenres, tokens_per_artist=40)
+
+    async def run():
+        return await asyncio.gather(client.search_artist("Mock Smoke Artist"), batcher.submit("Mock Smoke Artist"))
+
+    artist, genres = asyncio.run(run())
+    assert artist["name"]
+    assert genres["genres"]
+    assert mock_stats(mock, "spotify")["requests"] == 2  # token + search
+    assert mock_stats(mock, "gemini")["requests"] == 1
+
+def test_spotify_retries_injected_errors_then_gives_up(mock):
+    client = SpotifyClient("id", "secret")
+
+    async def run():
+        await client.search_artist("Before Outage")
+        configure(mock, spotify={"error_rate": 1.0})
+        with pytest.raises(SpotifyAPIError) as raised:
+            await client.search_artist("During Outage")
+        return raised.value
+
+    error = asyncio.run(run())
+    assert error.status_code in (429, 503)
+    assert client.stats["retries"] == spotify_service.SPOTIFY_MAX_RETRIES
+    assert mock_stats(mock, "spotify")["errors"] == spotify_service.SPOTIFY_MAX_RETRIES + 1
+
+def test_gemini_breaker_opens_under_injected_errors(mock):
+    configure(mock, gemini={"error_rate": 1.0})
+
+    async def run():
+        with pytest.raises(GeminiAPIError):
+            await gemini.generate_content("prompt")
+        requests = mock_stats(mock, "gemini")["requests"]
+        with pytest.raises(GeminiUnavailableError):
+            await gemini.generate_content("prompt")
+        return requests
+
+    requests = asyncio.run(run())
+    # The breaker opened after two failures and the next call never reached the mock
+    assert requests == 2
+    assert mock_stats(mock, "gemini")["requests"] == 2
+    assert gemini.gemini_circuit_breaker.state == CircuitBreaker.OPEN
+
+def test_concurrent_lookups_survive_injected_errors(mock, monkeypatch):
+    monkeypatch.setattr(spotify_service, "SPOTIFY_MAX_RETRIES", 8)
+    client = SpotifyClient("id", "secret")
+    names = [f"Load Artist {i}" for i in range(40)]
+
+    async def run():
+        await client.search_artist("Warm Up")  # token before errors are injected
+        configure(mock, spotify={"median_ms": 5, "sigma": 0.5, "error_rate": 0.25})
+        return await asyncio.gather(*[client.search_artist(name) for name in names])
+
+    results = asyncio.run(run())
+    assert all(result is not None for result in results)
+    stats = mock_stats(mock, "spotify")
+    assert stats["errors"] > 0
+    assert stats["requests"] == 2 + len(names) + stats["errors"]
+    assert upstream_clients.stats["spotify"].as_dict()["latency_ms"]["p95"] is not None
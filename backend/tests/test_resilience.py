@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, TokenBucket, backoff_delay
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", fake)
+    return fake
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=10)
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.is_open
+    assert not breaker.allow_request()
+    assert breaker.rejected == 1
+    assert breaker.times_opened == 1
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_half_open_trial_success_closes(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one trial call at a time
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+def test_half_open_trial_failure_reopens(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 2
+    assert not breaker.allow_request()
+
+def test_lost_half_open_trial_is_retried_after_reset_timeout(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow_request()
+
+    # The trial call never reports back, e.g. because it was cancelled
+    clock.now += 5
+    assert not breaker.allow_request()
+    clock.now += 5
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+def test_stats_report_state(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.stats()["state"] == CircuitBreaker.OPEN
+    clock.now += 10
+    breaker.allow_request()
+    assert breaker.stats()["state"] == CircuitBreaker.HALF_OPEN
+
+def test_token_bucket_allows_burst_then_throttles():
+    async def run():
+        bucket = TokenBucket(rate_per_minute=600, burst=2)  # one token every 0.1s
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        return time.monotonic() - started, bucket.throttled
+
+    elapsed, throttled = asyncio.run(run())
+    assert 0.08 <= elapsed < 0.5
+    assert throttled == 1
+
+def test_token_bucket_default_burst_matches_rate():
+    assert TokenBucket(rate_per_minute=30).capacity == 30
+    assert TokenBucket(rate_per_minute=0.5).capacity == 1
+
+def test_backoff_honours_retry_after():
+    assert backoff_delay(0, 0.5, 10, retry_after="3") == 3
+    assert backoff_delay(0, 0.5, 10, retry_after="120") == 10
+
+def test_backoff_ignores_non_numeric_retry_after():
+    delay = backoff_delay(0, 0.5, 10, retry_after="Wed, 21 Oct 2015 07:28:00 GMT")
+    assert 0 <= delay <= 0.5
+
+def test_backoff_is_capped_full_jitter():
+    for attempt in range(10):
+        delay = backoff_delay(attempt, 0.5, 4)
+        assert 0 <= delay <= min(4, 0.5 * 2 ** attempt)
@@ -0,0 +1,94 @@
+"""
+/api/agent/similar-artists-samples: concurrency cap, per-artist failures and the overall deadline
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import main
+
+def spotify_artist(name):
+    return {"id": f"id-{name}", "name": name, "images": [], "popularity": 50, "genres": ["indie"]}
+
+def spotify_track(artist_id):
+    return {"id": f"{artist_id}-t1", "name": "Single", "album": {"name": "LP", "images": []},
+            "preview_url": None, "external_urls": {"spotify": "https://open.spotify.com/track/t1"},
+            "duration_ms": 200000, "popularity": 40, "explicit": False}
+
+class FakeSpotify:
+    """search_artist behaviour per name: "slow" never returns, "broken" raises, "missing" finds nothing"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cancelled = []
+
+    async def search_artist(self, name):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if name == "slow":
+                await asyncio.Event().wait()
+            await asyncio.sleep(self.delay)
+            if name == "broken":
+                raise RuntimeError("spotify 500")
+            return None if name == "missing" else spotify_artist(name)
+        except asyncio.CancelledError:
+            self.cancelled.append(name)
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def artist_top_tracks(self, artist_id, country="US"):
+        return [spotify_track(artist_id)]
+
+@pytest.fixture
+def spotify(monkeypatch):
+    fake = FakeSpotify()
+    monkeypatch.setattr(main, "spotify_client", fake)
+    monkeypatch.setattr(main, "SIMILAR_ARTISTS_DEADLINE_SECONDS", 0.3)
+    return fake
+
+def test_deadline_returns_partial_results(spotify):
+    result = asyncio.run(main.get_similar_artists_samples(artist_names="Alpha, slow, Beta"))
+
+    assert [artist["name"] for artist in result["similar_artists"]] == ["Alpha", "Beta"]
+    assert result["similar_artists"][0]["tracks"][0]["id"] == "id-Alpha-t1"
+    assert result["partial"] is True
+    assert result["timed_out_artists"] == ["slow"]
+    assert result["failed_artists"] == []
+    assert spotify.cancelled == ["slow"]
+
+def test_failed_and_missing_artists(spotify):
+    result = asyncio.run(main.get_similar_artists_samples(artist_names="broken,missing,Gamma"))
+
+    assert [artist["name"] for artist in result["similar_artists"]] == ["Gamma"]
+    assert result["total_artists"] == 1
+    assert result["failed_artists"] == ["broken"]
+    assert result["timed_out_artists"] == []
+    assert result["partial"] is True
+
+def test_complete_results_are_not_partial(spotify):
+    result = asyncio.run(main.get_similar_artists_samples(artist_names="One,Two"))
+    assert result["partial"] is False
+    assert result["total_artists"] == 2
+
+def test_concurrency_is_capped(spotify, monkeypatch):
+    spotify.delay = 0.02
+    monkeypatch.setattr(main, "SIMILAR_ARTISTS_MAX_CONCURRENCY", 2)
+    monkeypatch.setattr(main, "SIMILAR_ARTISTS_DEADLINE_SECONDS", 5)
+
+    names = ",".join(f"Artist {i}" for i in range(8))
+    result = asyncio.run(main.get_similar_artists_samples(artist_names=names))
+
+    # Only the first six artists are looked up, two at a time
+    assert result["total_artists"] == 6
+    assert spotify.max_in_flight == 2
+
+def test_empty_artist_list_is_a_400(spotify):
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main.get_similar_artists_samples(artist_names=" , "))
+    assert excinfo.value.status_code == 400
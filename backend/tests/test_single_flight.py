@@ -0,0 +1,87 @@
+import asyncio
+
+from single_flight import SingleFlight, single_flight
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    @single_flight("test_shared", normalize=("artist_name",))
+    async def lookup(artist_name: str):
+        calls.append(artist_name)
+        await asyncio.sleep(0.01)
+        return {"name": artist_name}
+
+    async def run():
+        return await asyncio.gather(lookup("Drake"), lookup("drake "), lookup(artist_name="DRAKE"))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result == {"name": "Drake"} for result in results)
+    assert lookup.single_flight.coalesced == 2
+
+def test_every_caller_gets_its_own_copy():
+    flight = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.01)
+        return {"tier": "Superstar", "items": []}
+
+    async def first():
+        result = await flight.do("key", load)
+        result["tier"] = "changed"
+        result["items"].append(1)
+        return result
+
+    async def run():
+        return await asyncio.gather(first(), flight.do("key", load), flight.do("key", load))
+
+    mutated, second, third = asyncio.run(run())
+    assert mutated == {"tier": "changed", "items": [1]}
+    assert second == third == {"tier": "Superstar", "items": []}
+
+def test_unnormalized_strings_are_compared_exactly():
+    calls = []
+
+    @single_flight("test_exact")
+    async def generate(prompt: str, max_tokens: int = 10):
+        calls.append(prompt)
+        await asyncio.sleep(0.01)
+        return prompt
+
+    async def run():
+        return await asyncio.gather(generate("Write IN CAPS"), generate("write in caps"), generate("Write IN CAPS", 10))
+
+    results = asyncio.run(run())
+    assert sorted(calls) == ["Write IN CAPS", "write in caps"]
+    assert results == ["Write IN CAPS", "write in caps", "Write IN CAPS"]
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        cancelled = asyncio.ensure_future(flight.do("key", load))
+        waiter = asyncio.ensure_future(flight.do("key", load))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        return await waiter
+
+    assert asyncio.run(run()) == "done"
+
+def test_sequential_calls_run_again():
+    calls = []
+
+    @single_flight("test_sequential")
+    async def lookup(key: str):
+        calls.append(key)
+        return key
+
+    async def run():
+        await lookup("a")
+        await lookup("a")
+
+    asyncio.run(run())
+    assert len(calls) == 2
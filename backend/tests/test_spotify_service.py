@@ -0,0 +1,136 @@
+import asyncio
+
+import httpx
+import pytest
+
+import spotify_service
+from http_clients import UpstreamConfig, upstream_clients
+from spotify_service import SpotifyAPIError, SpotifyClient
+
+class FakeSpotify:
+    """Mock Spotify API and accounts service; records every request"""
+
+    def __init__(self):
+        self.token_requests = 0
+        self.artist_requests = []
+        self.expires_in = 3600
+        self.reject_token = None
+        self.delay = 0.0
+
+    async def accounts(self, request: httpx.Request) -> httpx.Response:
+        self.token_requests += 1
+        return httpx.Response(200, json={"access_token": f"token-{self.token_requests}", "expires_in": self.expires_in})
+
+    async def api(self, request: httpx.Request) -> httpx.Response:
+        if request.headers["Authorization"] == f"Bearer {self.reject_token}":
+            return httpx.Response(401)
+        await asyncio.sleep(self.delay)
+        ids = request.url.params["ids"].split(",")
+        self.artist_requests.append(ids)
+        if any(not artist_id.isalnum() for artist_id in ids):
+            return httpx.Response(400)
+        return httpx.Response(200, json={"artists": [
+            None if artist_id.startswith("missing") else {"id": artist_id, "name": artist_id.upper()}
+            for artist_id in ids
+        ]})
+
+@pytest.fixture
+def spotify():
+    fake = FakeSpotify()
+    originals = {name: upstream_clients.configs[name] for name in ("spotify", "spotify_accounts")}
+    upstream_clients.register("spotify", UpstreamConfig("http://spotify.test", "SPOTIFY"),
+                              transport=httpx.MockTransport(fake.api))
+    upstream_clients.register("spotify_accounts", UpstreamConfig("http://accounts.test", "SPOTIFY_ACCOUNTS"),
+                              transport=httpx.MockTransport(fake.accounts))
+    yield fake
+    for name, config in originals.items():
+        upstream_clients.register(name, config)
+
+def test_token_is_fetched_once_and_reused(spotify):
+    client = SpotifyClient("id", "secret")
+
+    async def run():
+        await asyncio.gather(*[client.artists([f"a{i}"]) for i in range(5)])
+
+    asyncio.run(run())
+    assert spotify.token_requests == 1
+
+def test_token_is_refreshed_before_it_expires(spotify):
+    # Tokens that expire within the refresh margin are replaced on the next call
+    spotify.expires_in = spotify_service.TOKEN_REFRESH_MARGIN
+    client = SpotifyClient("id", "secret")
+
+    async def run():
+        await client.artists(["a1"])
+        await client.artists(["a2"])
+
+    asyncio.run(run())
+    assert spotify.token_requests == 2
+
+def test_unauthorized_response_refreshes_token_once(spotify):
+    spotify.reject_token = "token-1"
+    client = SpotifyClient("id", "secret")
+
+    assert asyncio.run(client.artists(["a1"])) == [{"id": "a1", "name": "A1"}]
+    assert spotify.token_requests == 2
+    assert client._token == "token-2"
+
+def test_lookups_in_one_window_share_a_request(spotify):
+    client = SpotifyClient("id", "secret")
+
+    async def run():
+        return await asyncio.gather(client.artist("a1"), client.artist("a2"), client.artist("a1"),
+                                    client.artist("missing1"))
+
+    first, second, again, missing = asyncio.run(run())
+    assert spotify.artist_requests == [["a1", "a2", "missing1"]]
+    assert first == again == {"id": "a1", "name": "A1"}
+    assert second["id"] == "a2"
+    assert missing is None
+
+def test_lookups_in_separate_windows_are_separate_requests(spotify):
+    client = SpotifyClient("id", "secret")
+
+    async def run():
+        await client.artist("a1")
+        await client.artist("a2")
+
+    asyncio.run(run())
+    assert spotify.artist_requests == [["a1"], ["a2"]]
+
+def test_full_batch_is_sent_without_waiting_for_window(spotify, monkeypatch):
+    monkeypatch.setattr(spotify_service, "SPOTIFY_BATCH_WINDOW_MS", 10_000)
+    client = SpotifyClient("id", "secret")
+    ids = [f"a{i}" for i in range(spotify_service.SPOTIFY_MAX_IDS_PER_REQUEST)]
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(*[client.artist(artist_id) for artist_id in ids]), timeout=2)
+
+    assert len(asyncio.run(run())) == len(ids)
+    assert spotify.artist_requests == [ids]
+
+def test_malformed_id_falls_back_to_single_lookups(spotify):
+    client = SpotifyClient("id", "secret")
+
+    async def run():
+        return await asyncio.gather(client.artist("a1"), client.artist("bad-id"), return_exceptions=True)
+
+    good, bad = asyncio.run(run())
+    assert good == {"id": "a1", "name": "A1"}
+    assert isinstance(bad, SpotifyAPIError) and bad.status_code == 400
+
+def test_cancelled_batch_cancels_waiters(spotify):
+    spotify.delay = 60
+    client = SpotifyClient("id", "secret")
+
+    async def run():
+        lookups = asyncio.gather(client.artist("a1"), client.artist("a2"), return_exceptions=True)
+        await asyncio.sleep(0.05)
+        assert len(client._batch_tasks) == 1
+        for task in client._batch_tasks:
+            task.cancel()
+        return await asyncio.wait_for(lookups, timeout=2)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert not client._batch_tasks
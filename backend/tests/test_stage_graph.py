@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from stage_graph import Stage, run_stages
+
+def run(stages, label="test"):
+    return asyncio.run(run_stages(stages, label=label))
+
+def sleeper(seconds: float, value):
+    async def fn(**_):
+        await asyncio.sleep(seconds)
+        return value
+    return fn
+
+def test_independent_stages_run_concurrently():
+    started = time.perf_counter()
+    results, report = run([
+        Stage("a", sleeper(0.2, 1), timeout=1),
+        Stage("b", sleeper(0.2, 2), timeout=1),
+        Stage("c", sleeper(0.2, 3), timeout=1)
+    ])
+    assert time.perf_counter() - started < 0.45
+    assert results == {"a": 1, "b": 2, "c": 3}
+    assert all(entry["status"] == "ok" for entry in report.values())
+
+def test_dependent_stage_receives_results():
+    async def combine(a, b):
+        return a + b
+
+    results, _ = run([
+        Stage("sum", combine, timeout=1, depends_on=["a", "b"]),
+        Stage("a", sleeper(0.05, 1), timeout=1),
+        Stage("b", sleeper(0.01, 2), timeout=1)
+    ])
+    assert results["sum"] == 3
+
+def test_timeout_uses_default_and_dependents_still_run():
+    async def after(slow):
+        return f"got {slow}"
+
+    started = time.perf_counter()
+    results, report = run([
+        Stage("slow", sleeper(5, "late"), timeout=0.1, default="fallback"),
+        Stage("after", after, timeout=1, depends_on=["slow"])
+    ])
+    assert time.perf_counter() - started < 1
+    assert results == {"slow": "fallback", "after": "got fallback"}
+    assert report["slow"]["status"] == "timeout"
+    assert report["after"]["status"] == "ok"
+
+def test_error_uses_default():
+    async def broken():
+        raise RuntimeError("boom")
+
+    results, report = run([Stage("broken", broken, timeout=1, default=[])])
+    assert results == {"broken": []}
+    assert report["broken"]["status"] == "error"
+
+def test_disabled_stage_is_skipped():
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        return "ran"
+
+    results, report = run([Stage("off", fn, timeout=1, default="default", enabled=False)])
+    assert results == {"off": "default"}
+    assert report["off"]["status"] == "skipped"
+    assert not calls
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError, match="unknown"):
+        run([Stage("a", sleeper(0, 1), timeout=1, depends_on=["missing"])])
+
+def test_cycle_is_rejected_instead_of_hanging():
+    with pytest.raises(ValueError, match="cycle"):
+        asyncio.run(asyncio.wait_for(run_stages([
+            Stage("a", sleeper(0, 1), timeout=1, depends_on=["c"]),
+            Stage("b", sleeper(0, 1), timeout=1, depends_on=["a"]),
+            Stage("c", sleeper(0, 1), timeout=1, depends_on=["b"])
+        ]), timeout=2))
+
+def test_self_dependency_is_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        run([Stage("a", sleeper(0, 1), timeout=1, depends_on=["a"])])
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import os
+import types
+
+import pytest
+from fastapi.testclient import TestClient
+
+import gemini_analysis_service as gemini
+import main
+from gemini_analysis_service import GeminiAPIError, GeminiAnalysisService
+from resilience import CircuitBreaker
+
+GEMINI_FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mock_fixtures", "gemini.json")
+FEATURES = {"duration": 180, "bpm": 120, "key": "C", "mode": "major", "energy": 0.7, "loudness": -8,
+            "commercial_score": 70, "valence": 0.6}
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+class FakeTable:
+    def __init__(self, inserted, fail):
+        self.inserted = inserted
+        self.fail = fail
+
+    def insert(self, row):
+        self.inserted.append(row)
+        return self
+
+    def execute(self):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        return types.SimpleNamespace(data=[{"id": 1}])
+
+@pytest.fixture
+def upload(monkeypatch):
+    """Stubs audio analysis, Supabase and the Gemini stream; returns the test client and inserted rows"""
+    state = types.SimpleNamespace(inserted=[], insert_fails=False)
+
+    async def features(path, filename):
+        return dict(FEATURES)
+
+    async def similarity(features, artist_id):
+        return dict(main.DEFAULT_SIMILARITY_DATA)
+
+    async def resonance(features, similarity_data):
+        return dict(main.DEFAULT_RESONANCE_DATA)
+
+    async def stream_audio_analysis(features, artist_profile, filename):
+        yield "chunk", '{"track_summary": '
+        yield "chunk", '{...}}'
+        yield "result", {"track_summary": {"overall_assessment": "Strong"}}
+
+    client = types.SimpleNamespace(table=lambda name: FakeTable(state.inserted, state.insert_fails))
+    monkeypatch.setattr(main, "SUPABASE_AVAILABLE", True)
+    monkeypatch.setattr(main, "supabase_manager", types.SimpleNamespace(client=client), raising=False)
+    monkeypatch.setattr(main, "AUDIO_FACTORY_AVAILABLE", False)
+    monkeypatch.setattr(main, "extract_comprehensive_audio_features", features)
+    monkeypatch.setattr(main, "calculate_track_similarity", similarity)
+    monkeypatch.setattr(main, "calculate_resonance_score", resonance)
+    monkeypatch.setattr(main, "GEMINI_AVAILABLE", True)
+    monkeypatch.setattr(main, "gemini_service", types.SimpleNamespace(stream_audio_analysis=stream_audio_analysis),
+                        raising=False)
+    state.client = TestClient(main.app)
+    return state
+
+def post_track(client: TestClient):
+    return client.post("/api/agent/upload-track/stream", data={"artist_id": "artist-1"},
+                       files={"file": ("stream-test.mp3", b"ID3 fake audio", "audio/mpeg")})
+
+def test_events_arrive_in_order(upload):
+    response = post_track(upload.client)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_events(response.text)
+    assert [name for name, _ in events] == [
+        "basic_info", "commercial_analysis", "similarity_analysis", "resonance_prediction",
+        "ai_insights_chunk", "ai_insights_chunk", "ai_insights", "complete"
+    ]
+    assert events[0][1]["bpm"] == 120
+    assert events[6][1] == {"track_summary": {"overall_assessment": "Strong"}}
+    assert len(upload.inserted) == 1
+    assert upload.inserted[0]["artist_id"] == "artist-1"
+
+def test_failed_insert_ends_stream_with_error_event(upload):
+    upload.insert_fails = True
+    events = parse_events(post_track(upload.client).text)
+
+    assert events[-1][0] == "error"
+    assert "database unavailable" in events[-1][1]["detail"]
+    assert "complete" not in [name for name, _ in events]
+    assert len(upload.inserted) == 1  # not written a second time on the way out
+
+def test_feature_extraction_failure_is_an_error_event(upload, monkeypatch):
+    async def broken(path, filename):
+        return {"error": "unreadable file"}
+
+    monkeypatch.setattr(main, "extract_comprehensive_audio_features", broken)
+    events = parse_events(post_track(upload.client).text)
+    assert events == [("error", {"detail": "Audio feature extraction failed: unreadable file"})]
+    assert upload.inserted == []
+
+def test_rejects_unsupported_file_before_streaming(upload):
+    response = upload.client.post("/api/agent/upload-track/stream", data={"artist_id": "artist-1"},
+                                  files={"file": ("notes.txt", b"text", "text/plain")})
+    assert response.status_code == 400
+
+@pytest.fixture
+def analysis_service(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(gemini, "gemini_circuit_breaker", CircuitBreaker("gemini-test"))
+    return GeminiAnalysisService()
+
+def collect(service: GeminiAnalysisService):
+    async def run():
+        return [event async for event in service.stream_audio_analysis(dict(FEATURES), None, "song.mp3")]
+
+    return asyncio.run(run())
+
+def test_stream_audio_analysis_yields_chunks_then_result(analysis_service, monkeypatch):
+    with open(GEMINI_FIXTURE) as f:
+        reply = json.dumps(json.load(f)["audio_analysis"])
+
+    async def stream_content(prompt, generation_config=None, api_key=None):
+        for start in range(0, len(reply), 200):
+            yield reply[start:start + 200]
+
+    monkeypatch.setattr(gemini, "stream_content", stream_content)
+    events = collect(analysis_service)
+
+    kinds = [kind for kind, _ in events]
+    assert kinds == ["chunk"] * (len(kinds) - 1) + ["result"]
+    assert "".join(text for kind, text in events if kind == "chunk") == reply
+    assert events[-1][1]["track_summary"] == json.loads(reply)["track_summary"]
+    assert events[-1][1]["original_metrics"]["bpm"] == 120
+
+def test_stream_audio_analysis_falls_back_when_stream_fails(analysis_service, monkeypatch):
+    async def stream_content(prompt, generation_config=None, api_key=None):
+        yield '{"track_summary": '
+        raise GeminiAPIError("stream dropped", 503)
+
+    monkeypatch.setattr(gemini, "stream_content", stream_content)
+    events = collect(analysis_service)
+
+    assert [kind for kind, _ in events] == ["chunk", "result"]
+    assert events[-1][1] == analysis_service._get_fallback_analysis()
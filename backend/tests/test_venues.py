@@ -0,0 +1,175 @@
+"""
+Venue discovery and recommendations in main.py, against a mock Google Places upstream
+"""
+
+import asyncio
+import os
+import re
+import types
+
+import httpx
+import pytest
+
+import main
+from cache_service import TieredCache
+from http_clients import UpstreamConfig, upstream_clients
+
+UNIQUE_KEY_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              "add-venue-recommendations-unique-key.sql")
+
+def search_result(place_id):
+    return {"place_id": place_id, "name": f"Venue {place_id}", "formatted_address": f"{place_id} Main St", "rating": 4.0}
+
+@pytest.fixture
+def places(monkeypatch):
+    """
+    Mock Places upstream; ``places.results`` is the text search result list and ``places.details``
+    maps place_id to "slow", "down" or a delay in seconds for the Details call
+    """
+    state = types.SimpleNamespace(results=[], details={}, requests=[], in_flight=0, max_in_flight=0)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state.requests.append((request.url.path, dict(request.url.params)))
+        if not request.url.path.endswith("/details/json"):
+            return httpx.Response(200, json={"status": "OK", "results": state.results})
+        place_id = request.url.params["place_id"]
+        behaviour = state.details.get(place_id, 0)
+        if behaviour == "down":
+            return httpx.Response(503)
+        state.in_flight += 1
+        state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        try:
+            await asyncio.sleep(60 if behaviour == "slow" else behaviour)
+        finally:
+            state.in_flight -= 1
+        return httpx.Response(200, json={"status": "OK", "result": {"name": f"Venue {place_id}", "types": ["bar"],
+                                                                     "rating": 4.5, "user_ratings_total": 120}})
+
+    original = upstream_clients.configs["places"]
+    upstream_clients.register("places", UpstreamConfig("http://places.test", "PLACES"), transport=httpx.MockTransport(handler))
+    monkeypatch.setenv("GOOGLE_MAPS_API_KEY", "maps-key")
+    for name, namespace in (("venue_search_cache", "venue_searches_test"), ("place_details_cache", "place_details_test")):
+        cache = TieredCache(namespace, persist=False, default_ttl=60)
+        cache.disk = None
+        monkeypatch.setattr(main, name, cache)
+    yield state
+    upstream_clients.register("places", original)
+
+@pytest.fixture
+def enrichment(monkeypatch):
+    """Records the venue ids in each Gemini enrichment chunk"""
+    chunks = []
+
+    async def enhance(venues, artist_genre, capacity_range):
+        chunks.append([venue["id"] for venue in venues])
+        for venue in venues:
+            venue["genre_suitability"] = 8
+        return venues
+
+    monkeypatch.setattr(main, "enhance_venues_with_gemini", enhance)
+    return chunks
+
+def discover(location="Austin"):
+    return asyncio.run(main.discover_venues(location=location, venue_types="", artist_genre="indie", capacity_range=""))
+
+def test_slow_and_failing_details_are_dropped_in_ranking_order(places, enrichment, monkeypatch):
+    monkeypatch.setattr(main, "PLACE_DETAILS_TIMEOUT_SECONDS", 0.2)
+    places.results = [search_result(place_id) for place_id in ("p1", "p2", "p3", "p4", "p5")]
+    places.details = {"p1": 0.05, "p2": "slow", "p4": "down", "p5": 0.01}
+
+    result = discover()
+
+    assert [venue["id"] for venue in result["venues"]] == ["p1", "p3", "p5"]
+    assert all(venue["genre_suitability"] == 8 for venue in result["venues"])
+
+def test_details_are_fetched_concurrently_under_the_cap(places, enrichment, monkeypatch):
+    monkeypatch.setattr(main, "PLACE_DETAILS_MAX_CONCURRENCY", 3)
+    places.results = [search_result(f"p{i}") for i in range(12)]
+    places.details = {f"p{i}": 0.02 for i in range(12)}
+
+    result = discover()
+
+    # Only the top 10 results are looked up
+    assert result["total_venues"] == 10
+    assert places.max_in_flight == 3
+
+def test_enrichment_runs_in_chunks(places, enrichment, monkeypatch):
+    monkeypatch.setattr(main, "VENUE_ENRICHMENT_CHUNK_SIZE", 2)
+    places.results = [search_result(f"p{i}") for i in range(5)]
+    # Finish in reverse order so chunks follow completion, not ranking
+    places.details = {f"p{i}": 0.03 * (5 - i) for i in range(5)}
+
+    result = discover()
+
+    assert enrichment == [["p4", "p3"], ["p2", "p1"], ["p0"]]
+    assert [venue["id"] for venue in result["venues"]] == ["p0", "p1", "p2", "p3", "p4"]
+
+class FakeQuery:
+    """Chainable stand-in for a supabase table query that records select filters and upserts"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.db.filters.append((column, value))
+        return self
+
+    def upsert(self, rows, **kwargs):
+        self.db.upserts.append((rows, kwargs))
+        return self
+
+    def execute(self):
+        return types.SimpleNamespace(data=[{"venue_name": name} for name in self.db.existing])
+
+@pytest.fixture
+def supabase(monkeypatch):
+    db = types.SimpleNamespace(existing=[], filters=[], upserts=[])
+    client = types.SimpleNamespace(table=lambda name: FakeQuery(db))
+    monkeypatch.setattr(main, "SUPABASE_AVAILABLE", True)
+    monkeypatch.setattr(main, "supabase_manager", types.SimpleNamespace(client=client))
+    return db
+
+def recommend(city="Austin"):
+    return asyncio.run(main.get_venue_recommendations(artist_id="a1", city=city))
+
+def test_upsert_conflict_target_matches_the_unique_key(places, supabase):
+    places.results = [search_result("p1")]
+    recommend()
+
+    with open(UNIQUE_KEY_SQL) as sql:
+        unique_columns = re.search(r"UNIQUE \(([^)]*)\)", sql.read()).group(1)
+    (rows, kwargs), = supabase.upserts
+    assert kwargs["on_conflict"].split(",") == [column.strip() for column in unique_columns.split(",")]
+    assert kwargs["ignore_duplicates"] is True
+    assert set(kwargs["on_conflict"].split(",")) <= set(rows[0])
+
+def test_new_venues_are_written_in_one_bulk_upsert(places, supabase):
+    supabase.existing = ["Venue p2"]
+    places.results = [search_result(place_id) for place_id in ("p1", "p2", "p3")] + [search_result("p1")]
+
+    result = recommend()
+
+    assert [venue["venue_name"] for venue in result["venues"]] == ["Venue p1", "Venue p3"]
+    (rows, _), = supabase.upserts
+    assert rows == result["venues"]
+    assert rows[0] == {"artist_id": "a1", "city": "Austin", "venue_name": "Venue p1", "address": "p1 Main St",
+                       "relevance_score": 4.0, "google_place_id": "p1"}
+    assert supabase.filters == [("artist_id", "a1"), ("city", "Austin")]
+
+def test_no_upsert_when_every_venue_is_known(places, supabase):
+    supabase.existing = ["Venue p1"]
+    places.results = [search_result("p1")]
+
+    assert recommend()["venues"] == []
+    assert supabase.upserts == []
+
+def test_recommendations_reuse_the_discovery_search(places, supabase, enrichment):
+    places.results = [search_result("p1")]
+    discover("Austin, TX")
+    recommend("austin tx")
+
+    searches = [path for path, _ in places.requests if path.endswith("/textsearch/json")]
+    assert len(searches) == 1
@@ -0,0 +1,26 @@
+"""
+Upstream API base URLs for MusiStash
+Each can be overridden from the environment, e.g. to point the backend at mock_upstream_server.py
+"""
+
+import os
+
+# Setting MOCK_UPSTREAMS_URL (e.g. http://localhost:8900) routes every upstream to the local
+# stand-in server; the per-service variables below still take precedence.
+MOCK_UPSTREAMS_URL = os.getenv("MOCK_UPSTREAMS_URL", "").rstrip("/")
+
+def _base_url(env_var: str, default: str, mock_prefix: str) -> str:
+    if os.getenv(env_var):
+        return os.getenv(env_var).rstrip("/")
+    if MOCK_UPSTREAMS_URL:
+        return f"{MOCK_UPSTREAMS_URL}/{mock_prefix}"
+    return default
+
+GEMINI_API_BASE_URL = _base_url("GEMINI_API_BASE_URL", "https://generativelanguage.googleapis.com", "gemini")
+SPOTIFY_API_BASE_URL = _base_url("SPOTIFY_API_BASE_URL", "https://api.spotify.com", "spotify")
+SPOTIFY_ACCOUNTS_BASE_URL = _base_url("SPOTIFY_ACCOUNTS_BASE_URL", "https://accounts.spotify.com", "spotify/accounts")
+GOOGLE_PLACES_BASE_URL = _base_url("GOOGLE_PLACES_BASE_URL", "https://maps.googleapis.com", "places")
+LASTFM_API_BASE_URL = _base_url("LASTFM_API_BASE_URL", "https://ws.audioscrobbler.com", "lastfm")
+YOUTUBE_API_BASE_URL = _base_url("YOUTUBE_API_BASE_URL", "https://www.googleapis.com", "youtube")
+MUSICBRAINZ_API_BASE_URL = _base_url("MUSICBRAINZ_API_BASE_URL", "https://musicbrainz.org", "musicbrainz")
+LISTENBRAINZ_API_BASE_URL = _base_url("LISTENBRAINZ_API_BASE_URL", "https://api.listenbrainz.org", "listenbrainz")
@@ -12,7 +12,7 @@ setup(
         "python-dotenv",
         "openai",
         "requests",
-        "httpx",
+        "httpx[http2]",
         "spotipy",
         "numpy",
         "scikit-learn",